@@ -6,12 +6,45 @@ A lightweight Streamlit front-end for the Skills Recommendation API.
 
 Features:
 - Submits a `RecommendRequest` to the backend API and renders ranked skill results
-- Lets users inspect skill details (reasoning, evidence, criteria) and build a selected list
-- Exports selected skills as CSV/XLSX, including query + generation_cache_id for traceability
+- Lets users inspect skill details (reasoning, evidence, criteria) and build a selected list,
+  one skill at a time or in bulk ("add all results with score >= X"), shown a page at a time
+- Named selections saved to SQLite and shared by all sessions: edits are written through, and the
+  name in the page URL (`?selection=...`) reopens the selection after a reload or from a shared link
+- Exports selected skills as CSV/XLSX/Parquet/JSON Lines, including query + generation_cache_id for traceability
+  (files are generated only when a download button is clicked)
+- Serves repeat requests from a process-wide response cache shared across sessions; queries are
+  canonicalized (case, punctuation, Unicode, whitespace) and near-duplicates of a recent query
+  ("data scientists" vs "data scientist") are answered from its cached response, with the match
+  shown and a way to force a fresh call
+- Coalesces concurrent identical requests from different sessions into one backend call
+- Admission control per instance: a cap on concurrent backend calls, a per-session rate limit and
+  a bounded wait queue (light requests first) whose place in line is shown while waiting; cached
+  answers bypass it, and searches that cannot be served in time are refused with a "busy" notice
+- Runs searches on a process-wide worker pool: the page stays usable while the backend generates,
+  progress (including streamed results) refreshes on its own, and a search can be cancelled;
+  clicking Search again for the same request keeps waiting on the running one
+- Streams results into the table as they arrive when the backend supports it
+- Persists responses in an on-disk store so restarted instances start warm
+- Optional fetch-once mode: one max-size request per query, then top_k / min_score / filters
+  are served by slicing that superset locally
+- Background health prober (one per process) keeps the backend warm during business hours and
+  shows backend status next to the API docs link; new sessions re-probe a stale backend
+- "Compare queries" view: several queries run concurrently on the worker pool, then an overlap
+  matrix (Jaccard or shared-skill counts) and side-by-side ranked lists keyed by `skill_id`; skills
+  found by every query can be added to the selection in one click
+- Sidebar quick lookup over a per-instance BM25 index of every skill received so far, so a skill
+  seen earlier can be re-found (and added to the selection) without a backend call
+- Raw API response viewer that renders only on demand: one collapsed page at a time, with a
+  JSONPath-style filter, so large debug payloads are not shipped to the browser on every rerun
+- Diagnostics panel with per-stage latency percentiles (API connect/TTFB/download/decode,
+  table builds, rendering, exports) and an optional Prometheus `/metrics` side port
 
 State model:
 - Uses `AppState` stored in `st.session_state["app_state"]`
-- Selected skills are deduped by `skill_id`
+- Selected skills are deduped by `skill_id` and kept in display order as they change
+- Skill catalog texts are interned process-wide; the raw response is kept compressed within
+  `session.max_raw_bytes` (spilled to disk beyond it), and sessions idle for
+  `session.idle_seconds` drop their results until the next search
 
 Run:
 - `streamlit run app.py`
@@ -20,15 +53,53 @@ Run:
 from __future__ import annotations
 
 import json
+import sqlite3
 import time
+import uuid
+from dataclasses import replace
 from datetime import datetime
 
-import pandas as pd
 import streamlit as st
 
-from functions.core.api_client import ApiError, RecommendRequest, recommend_skills
-from functions.core.state import AppState, add_selected, remove_selected, selected_list
-from functions.core.export import build_export_rows, export_csv_bytes, export_xlsx_bytes
+from functions.core.admission import CANCELLED as ADMISSION_CANCELLED
+from functions.core.admission import AdmissionController, AdmissionRejected
+from functions.core.api_client import ApiError, RecommendRequest, connection_stats, iter_recommend_skills, transfer_stats
+from functions.core.cache import ResponseCache, cache_key
+from functions.core.compare import CompareRun, compare_responses, overlap_frame, ranked_frame, shared_skill_ids
+from functions.core.export import (
+    build_export_frame,
+    export_csv_file,
+    export_jsonl_file,
+    export_parquet_file,
+    export_xlsx_file,
+)
+from functions.core.jobs import JobCancelled, JobQueue
+from functions.core.json_view import PathError, page_view
+from functions.core.metrics import REGISTRY, start_metrics_server
+from functions.core.prober import HealthProber
+from functions.core.queries import QueryIndex
+from functions.core.results import DISPLAY_COLUMNS, results_df, results_view
+from functions.core.routing import backend_status
+from functions.core.selections import SelectionStore
+from functions.core.sessions import SessionRegistry
+from functions.core.singleflight import SingleFlight, coalesce
+from functions.core.skill_index import SkillIndex, lookup_selection
+from functions.core.skillstore import SKILLS
+from functions.core.state import (
+    AppState,
+    add_selected_many,
+    clear_selected,
+    has_raw_response,
+    raw_response,
+    remove_selected_many,
+    selected_list,
+    selected_page,
+    set_raw_response,
+    set_results,
+    skill_score,
+)
+from functions.core.store import ResponseStore, warm_cache
+from functions.core.superset import can_derive, derive, superset_request
 from functions.utils.config import load_config
 from functions.utils.text import evidence_to_display, truncate
 
@@ -38,32 +109,814 @@ def _cfg():
     return load_config()
 
 
+@st.cache_resource
+def _response_store():
+    cfg = _cfg()
+    if not cfg.store.enabled:
+        return None
+    try:
+        return ResponseStore.from_config(cfg.store)
+    except (OSError, sqlite3.Error):
+        # read-only filesystem etc.: run without persistence rather than failing the app
+        return None
+
+
+@st.cache_resource
+def _selections():
+    cfg = _cfg()
+    if not cfg.selections.enabled:
+        return None
+    try:
+        return SelectionStore.from_config(cfg.selections)
+    except (OSError, sqlite3.Error):
+        return None
+
+
+@st.cache_resource
+def _response_cache():
+    cfg = _cfg()
+    if not cfg.cache.enabled:
+        return None
+    cache = ResponseCache.from_config(cfg.cache)
+    warm_cache(cache, _response_store(), cfg.store.warm_entries)
+    return cache
+
+
+@st.cache_resource
+def _inflight() -> SingleFlight:
+    return SingleFlight()
+
+
+@st.cache_resource
+def _metrics_server():
+    port = _cfg().metrics.port
+    if port <= 0:
+        return None
+    try:
+        return start_metrics_server(port)
+    except OSError:
+        # port taken (e.g. a second Streamlit process): the in-app panel still works
+        return None
+
+
+@st.cache_resource
+def _jobs() -> JobQueue:
+    return JobQueue(max_workers=_cfg().jobs.max_workers)
+
+
+@st.cache_resource
+def _admission():
+    cfg = _cfg().admission
+    if not cfg.enabled:
+        return None
+    return AdmissionController(
+        max_concurrent=cfg.max_concurrent,
+        max_queue=cfg.max_queue,
+        queue_timeout_seconds=cfg.queue_timeout_seconds,
+        session_rate_per_second=cfg.session_rate_per_minute / 60.0,
+        session_burst=cfg.session_burst,
+    )
+
+
+@st.cache_resource
+def _skill_index():
+    cfg = _cfg()
+    if not cfg.index.enabled:
+        return None
+    index = SkillIndex(max_skills=cfg.index.max_skills)
+    store = _response_store()
+    if store is not None and cfg.index.warm_responses > 0:
+        for _req, resp in reversed(store.recent(cfg.index.warm_responses)):  # oldest first: newest end up most recent
+            index.add_response(resp)
+    return index
+
+
+@st.cache_resource
+def _queries():
+    cfg = _cfg()
+    if not cfg.queries.enabled:
+        return None
+    return QueryIndex(max_queries=cfg.queries.max_recent)
+
+
+@st.cache_resource
+def _sessions() -> SessionRegistry:
+    return SessionRegistry(idle_seconds=_cfg().session.idle_seconds)
+
+
+@st.cache_resource
+def _prober():
+    cfg = _cfg()
+    if not cfg.prober.enabled:
+        return None
+    return HealthProber(cfg.api, cfg.prober).start()
+
+
+_STATUS_ICONS = {"warm": "🟢", "cold": "🟠", "down": "🔴", "unknown": "⚪"}
+
+
+def _backend_status_panel(prober: HealthProber) -> None:
+    rows = prober.status()
+    for row in rows:
+        text = f"{_STATUS_ICONS[row['state']]} Backend {row['state']}"
+        if len(rows) > 1:
+            text += f" · {row['url']}"
+        if row["last_checked"] is not None:
+            age = max(0, int(time.time() - row["last_checked"]))
+            text += f" · health {row['last_latency_ms']:.0f} ms, {age}s ago"
+        st.caption(text)
+        if row["state"] == "down":
+            st.warning(f"Backend unreachable: {row['message']}")
+    if any(row["state"] != "warm" for row in rows):
+        if st.button("Warm up backend", use_container_width=True):
+            prober.request_probe()
+            st.caption("Warm-up requested; the first search may still be slow while the backend starts.")
+
+
+def _quick_lookup(cfg, state: AppState, index: SkillIndex) -> None:
+    """
+    Find skills seen earlier on this instance in the local index, without a backend call.
+    """
+    q = st.text_input("Find a skill seen before", key="lookup_q", placeholder="name, keyword or skill_id")
+    if not q.strip():
+        st.caption(f"{len(index)} skills indexed on this instance.")
+        return
+    with REGISTRY.timer("ui_lookup_ms"):
+        hits = index.search(q, k=cfg.index.lookup_results)
+    if not hits:
+        st.caption("No match among the indexed skills; run a search instead.")
+        return
+    options = {f"{h.skill.get('skill_name', '')} ({h.skill.get('source', '')}) · {h.skill['skill_id']}": h.skill for h in hits}
+    label = st.selectbox(f"{len(hits)} match(es)", options=list(options.keys()), key="lookup_pick")
+    skill = options[label]
+    st.caption(truncate(str(skill.get("skill_text", "")), 240))
+    if st.button("Add to Selected Skills", key="lookup_add", use_container_width=True):
+        if skill["skill_id"] in state.selected:
+            st.info("Already in Selected Skills.")  # keep its ranked copy
+        else:
+            _select(state, [lookup_selection(skill)])
+            st.success("Added (deduped by skill_id).")
+
+
+def _select(state: AppState, skills) -> int:
+    """
+    Add skills to the selection and, when it is saved under a name, to the saved selection.
+    """
+    skills = list(skills)
+    n = add_selected_many(state, skills)
+    store = _selections()
+    if n and store is not None and state.selection_name:
+        store.add(state.selection_name, skills)
+    return n
+
+
+def _unselect(state: AppState, skill_ids) -> int:
+    skill_ids = list(skill_ids)
+    n = remove_selected_many(state, skill_ids)
+    store = _selections()
+    if n and store is not None and state.selection_name:
+        store.remove(state.selection_name, skill_ids)
+    return n
+
+
+def _remove_picked(state: AppState, skill_ids) -> None:
+    # button callback: runs before the rerun, so the table and the picker reflect the removal
+    _unselect(state, skill_ids)
+    st.session_state["sel_remove"] = []
+
+
+def _clear_selection(state: AppState) -> None:
+    clear_selected(state)
+    store = _selections()
+    if store is not None and state.selection_name:
+        store.save(state.selection_name, [])
+
+
+def _open_selection(state: AppState, store: SelectionStore, name: str) -> int:
+    """
+    Replace the session's selection with saved selection `name` and keep editing it.
+    """
+    clear_selected(state)
+    n = add_selected_many(state, store.load(name))
+    state.selection_name = name
+    st.query_params["selection"] = name
+    return n
+
+
+def _restore_selection(state: AppState) -> None:
+    """
+    A page URL naming a saved selection (reload, shared link) reopens it in this session.
+    """
+    store = _selections()
+    name = st.query_params.get("selection", "")
+    if store is None or not name or name == state.selection_name:
+        return
+    if store.exists(name):
+        _open_selection(state, store, name)
+    else:
+        del st.query_params["selection"]
+
+
+def _saved_selections(state: AppState, store: SelectionStore) -> None:
+    if state.selection_name:
+        st.caption(f"Saved as “{state.selection_name}”: changes are saved automatically; share this page's link to open it elsewhere.")
+    c1, c2 = st.columns(2)
+    with c1:
+        name = st.text_input("Save selection as", value=state.selection_name, key="sel_name").strip()
+        if st.button("Save", key="sel_save", disabled=not name, use_container_width=True):
+            n = store.save(name, selected_list(state))
+            state.selection_name = name
+            st.query_params["selection"] = name
+            st.success(f"Saved {n} skill(s) as “{name}”.")
+    with c2:
+        saved = {f"{s['name']} ({s['skills']} skills)": s["name"] for s in store.names()}
+        if not saved:
+            st.caption("No saved selections yet.")
+            return
+        label = st.selectbox("Saved selections", options=list(saved.keys()), key="sel_pick")
+        b1, b2 = st.columns(2)
+        if b1.button("Load", key="sel_load", use_container_width=True):
+            n = _open_selection(state, store, saved[label])
+            st.success(f"Loaded {n} skill(s) from “{saved[label]}”.")
+        if b2.button("Delete", key="sel_delete", use_container_width=True):
+            store.delete(saved[label])
+            if state.selection_name == saved[label]:
+                state.selection_name = ""
+                del st.query_params["selection"]
+            st.rerun()
+
+
+def _timed(name: str, fn):
+    def _call(*args, **kwargs):
+        with REGISTRY.timer(name):
+            return fn(*args, **kwargs)
+
+    return _call
+
+
+def _diagnostics_panel() -> None:
+    with st.expander("Diagnostics"):
+        # tables/charts pull in pandas + pyarrow: only build them when asked for
+        if not st.toggle("Show diagnostics", key="diag_show"):
+            return
+        snap = REGISTRY.snapshot()
+        if not snap:
+            st.caption("No measurements yet.")
+        else:
+            st.dataframe(
+                [{"metric": name, **{k: round(v, 1) for k, v in summary.items()}} for name, summary in snap.items()],
+                use_container_width=True,
+                hide_index=True,
+            )
+        st.write("**Backends**")
+        st.dataframe(backend_status(_cfg().api), use_container_width=True, hide_index=True)
+        prober = _prober()
+        history = [r for r in prober.history() if r.ok] if prober is not None else []
+        if history:
+            st.write("**Health latency (ms)**")
+            st.line_chart([r.latency_ms for r in history])
+        st.write("**Sessions**", _sessions().stats())
+        queries = _queries()
+        if queries is not None:
+            st.write("**Similar-query matching**", queries.stats())
+        st.write("**Search jobs**", _jobs().stats())
+        admission = _admission()
+        if admission is not None:
+            st.write("**Admission**", admission.stats())
+        st.write("**Interned skills**", SKILLS.stats())
+        selections = _selections()
+        if selections is not None:
+            st.write("**Saved selections**", selections.stats())
+        index = _skill_index()
+        if index is not None:
+            st.write("**Skill index**", index.stats())
+        st.write("**Connections**", connection_stats())
+        st.write("**Response transfer**", transfer_stats())
+        cache = _response_cache()
+        if cache is not None:
+            st.write("**Response cache**", cache.stats())
+        text = REGISTRY.render_prometheus()
+        if st.toggle("Show Prometheus text"):
+            st.code(text, language="text")
+        st.download_button("Download metrics", data=text, file_name="metrics.txt", mime="text/plain")
+
+
+_RAW_PAGE_SIZES = [10, 20, 50, 100]
+
+
+def _raw_response_viewer(state: AppState) -> None:
+    """
+    Renders only when toggled on, and then only one collapsed page of the filtered response.
+    """
+    if not st.toggle("Show response", key="raw_show"):
+        st.caption("Off: the response is not sent to the browser.")
+        return
+    c1, c2, c3 = st.columns([3, 1, 1])
+    with c1:
+        expr = st.text_input("Filter (JSONPath)", value="$", key="raw_path", help="e.g. $.payload.recommended_skills[*].skill_name, $..evidence, $.meta")
+    with c2:
+        page_size = st.selectbox("Page size", _RAW_PAGE_SIZES, index=1, key="raw_page_size")
+    with c3:
+        page = st.number_input("Page", min_value=1, value=1, step=1, key="raw_page")
+    try:
+        view = page_view(raw_response(state), expr, page=int(page) - 1, page_size=int(page_size))
+    except PathError as e:
+        st.error(str(e))
+        return
+    st.caption(f"Page {view.page + 1} of {view.pages} · {view.total} item(s)")
+    st.json(view.value, expanded=2)
+    st.download_button(
+        "Download full response (JSON)",
+        data=lambda: json.dumps(raw_response(state), ensure_ascii=False, indent=2).encode("utf-8"),
+        file_name="raw_response.json",
+        mime="application/json",
+    )
+
+
 def _init_state() -> AppState:
     if "app_state" not in st.session_state:
         st.session_state["app_state"] = AppState()
     return st.session_state["app_state"]
 
 
-def _results_df(results, preview_chars: int):
-    rows = []
-    for s in results:
-        rows.append(
-            {
-                "skill_id": s.get("skill_id", ""),
-                "skill_name": s.get("skill_name", ""),
-                "relevance_score": s.get("relevance_score", 0.0),
-                "source": s.get("source", ""),
-                "preview": truncate(s.get("skill_text", "") or "", preview_chars),
-            }
+_LIVE_RENDER_INTERVAL_S = 0.1
+
+
+def _streaming_fetch(cfg, on_skill, stop=None):
+    """
+    Fetch function that passes each streamed skill to `on_skill` until the full response arrives.
+    Raises `JobCancelled` when a live stream is closed early because `stop()` became true; a
+    response already received (e.g. a blocking answer) is always returned, so it gets kept.
+    """
+
+    def _fetch(req: RecommendRequest):
+        resp = None
+        for event, data in iter_recommend_skills(cfg.api, req, stop):
+            if event == "skill":
+                on_skill(data)
+            elif event == "response":
+                resp = data
+        if resp is None:
+            raise JobCancelled()
+        return resp
+
+    return _fetch
+
+
+def _priority(cfg, req: RecommendRequest) -> int:
+    # admission queue order: heavy requests wait behind light ones
+    return 1 if req.debug or req.top_k >= cfg.admission.heavy_top_k else 0
+
+
+def _search_runner(cfg):
+    """
+    Returns `run(fetch_req, on_skill, job=None) -> response`: a single-flight streaming fetch,
+    admitted by the admission controller, whose response is written to the store and the response
+    cache. Lookups happen before (`_lookup_cached()`). While the call waits for a backend slot,
+    `job.context["ticket"]` holds its place in the queue. Once `job` is cancelled and no other
+    caller is coalesced onto the call, it leaves the queue (or the stream is closed) and the
+    worker is freed. The process-wide
+    resources are resolved here, in the script thread, so `run` can execute on a job worker.
+    """
+    cache, flight, store, admission = _response_cache(), _inflight(), _response_store(), _admission()
+
+    def _run(fetch_req: RecommendRequest, on_skill, job=None):
+        key = cache_key(fetch_req)
+
+        def _cancelled() -> bool:
+            return job is not None and job.cancelled
+
+        def _abandoned() -> bool:
+            return _cancelled() and flight.waiters(key) == 0
+
+        def _on_queued(ticket):
+            job.context["ticket"] = ticket
+            job.on_cancel(lambda: _abandoned() and admission.withdraw(ticket))
+
+        def _fetch(req: RecommendRequest):
+            if admission is None:
+                return _streaming_fetch(cfg, on_skill, _abandoned)(req)
+            with admission.slot(_priority(cfg, req), _on_queued if job is not None else None, _abandoned):
+                return _streaming_fetch(cfg, on_skill, _abandoned)(req)
+
+        def _fetch_and_keep(req: RecommendRequest):
+            resp = _fetch(req)
+            if store is not None:
+                store.put(req, resp)
+            if cache is not None:
+                cache.put(req, resp)
+            return resp
+
+        while True:
+            try:
+                return coalesce(flight, _fetch_and_keep, _cancelled)(fetch_req)
+            except (JobCancelled, AdmissionRejected) as e:
+                if isinstance(e, AdmissionRejected) and e.reason != ADMISSION_CANCELLED or job is not None and job.cancelled:
+                    raise
+                # joined a call its cancelled leader was just giving up: run it again
+
+    return _run
+
+
+def _lookup_cached(req: RecommendRequest):
+    """
+    Response for `req` (canonical query) from the memory cache, else the store (refilling the cache).
+    """
+    cache, store = _response_cache(), _response_store()
+    resp = cache.get(req) if cache is not None else None
+    if resp is None and store is not None:
+        resp = store.get(req)
+        if resp is not None and cache is not None:
+            cache.put(req, resp)
+    return resp
+
+
+def _lookup_similar(cfg, req: RecommendRequest):
+    """
+    (QueryMatch, response) for a recent near-duplicate of `req` whose response is still kept, else None.
+    """
+    index = _queries()
+    if index is None:
+        return None
+    match = index.match(req, cfg.queries.similarity_threshold)
+    if match is None:
+        return None
+    resp = _lookup_cached(match.request)
+    if resp is None:
+        index.discard(match.request)  # expired from cache and store: stop offering it
+        return None
+    return match, resp
+
+
+def _render_partial(cfg, target, skills) -> None:
+    with REGISTRY.timer("ui_results_df_ms"):
+        df = results_df(skills, cfg.ui.preview_chars)
+    with REGISTRY.timer("ui_render_table_ms"):
+        target.dataframe(df[DISPLAY_COLUMNS], use_container_width=True, hide_index=True)
+
+
+def _live_table(cfg, live):
+    """
+    `on_skill` callback for blocking (in-script) searches: re-renders the skills streamed so far
+    into the `live` placeholder, throttled.
+    """
+    skills = []
+    last_render = 0.0
+
+    def _on_skill(skill) -> None:
+        nonlocal last_render
+        skills.append(skill)
+        now = time.perf_counter()
+        if now - last_render >= _LIVE_RENDER_INTERVAL_S:
+            _render_partial(cfg, live, skills)
+            last_render = now
+
+    return _on_skill
+
+
+def _apply_response(state: AppState, resp, q: str) -> None:
+    session_cfg = _cfg().session
+    set_raw_response(state, resp, session_cfg.max_raw_bytes, session_cfg.resolved_spill_dir())
+
+    payload = resp.get("payload") or {}
+    meta = resp.get("meta") or {}
+
+    state.last_query = payload.get("query", q)
+    state.generation_cache_id = (meta.get("generation_cache_id") or "") if isinstance(meta, dict) else ""
+    set_results(state, payload.get("recommended_skills") or [])
+
+
+def _derive_locally(state: AppState, req: RecommendRequest, min_score: float) -> bool:
+    """
+    Fetch-once mode: answer `req` from the session's superset. Returns False if a backend call is needed.
+    """
+    if not can_derive(state.superset_request, state.superset_resp, req):
+        return False
+    key = (req, min_score)
+    if state.derived_key != key:
+        _apply_response(state, derive(state.superset_request, state.superset_resp, req, min_score), req.query)
+        state.derived_key = key
+    return True
+
+
+def _keep_response(fetch_req: RecommendRequest, resp) -> None:
+    """
+    Index a received response: its skills for the quick lookup, its request for near-duplicate
+    matching (only when the cache or store keeps the response to answer it).
+    """
+    index = _skill_index()
+    if index is not None:
+        index.add_response(resp)
+    queries = _queries()
+    if queries is not None and (_response_cache() is not None or _response_store() is not None):
+        queries.add(fetch_req)
+
+
+def _finish_search(cfg, state: AppState, req: RecommendRequest, fetch_req: RecommendRequest, min_score: float, resp, hit: bool, elapsed_ms: float) -> None:
+    _keep_response(fetch_req, resp)
+    if cfg.fetch_once.enabled:
+        state.superset_request, state.superset_resp, state.derived_key = fetch_req, resp, None
+        _derive_locally(state, req, min_score)
+    else:
+        _apply_response(state, resp, req.query)
+    state.last_resp_time_ms = elapsed_ms
+    state.last_resp_cached = hit
+
+
+def _session_token() -> str:
+    # stable per-session key (an object id can be reused by a later session once freed)
+    return st.session_state.setdefault("session_token", uuid.uuid4().hex)
+
+
+def _admit() -> None:
+    """
+    Per-session rate limit for a search (or comparison) that needs the backend; raises
+    `AdmissionRejected` when the session is over its rate.
+    """
+    admission = _admission()
+    if admission is not None:
+        admission.allow(_session_token())
+
+
+def _show_search_error(e: BaseException) -> None:
+    if isinstance(e, AdmissionRejected):
+        st.warning(str(e))
+    elif isinstance(e, ApiError):
+        st.error(str(e))
+        if e.detail is not None:
+            st.code(json.dumps(e.detail, ensure_ascii=False, indent=2))
+    else:
+        st.error("Unexpected error")
+        st.exception(e)
+
+
+def _search(cfg, state: AppState, req: RecommendRequest, min_score: float, fresh: bool = False, similar: bool = True) -> None:
+    """
+    Answer `req` from, in order: the fetch-once superset, the cache/store (canonical query), a
+    similar recent query, else the backend (background job, or inline when jobs are disabled).
+    `fresh` skips everything but the backend; `similar=False` only skips the similar-query match.
+    """
+    fetch_req = superset_request(req, cfg.fetch_once.max_top_k) if cfg.fetch_once.enabled else req
+    state.similar_match = None
+    try:
+        t0 = time.perf_counter()
+        if not fresh and cfg.fetch_once.enabled and _derive_locally(state, req, min_score):
+            state.last_resp_time_ms = (time.perf_counter() - t0) * 1000
+            state.last_resp_cached = True
+            st.success(f"Got {len(state.last_results)} skills in {state.last_resp_time_ms:.0f} ms (local).")
+            return
+        resp = None if fresh else _lookup_cached(fetch_req)
+        if resp is not None:
+            _finish_search(cfg, state, req, fetch_req, min_score, resp, True, (time.perf_counter() - t0) * 1000)
+            st.success(f"Got {len(state.last_results)} skills in {state.last_resp_time_ms:.0f} ms (cached).")
+            return
+        near = None if fresh or not similar else _lookup_similar(cfg, fetch_req)
+        if near is not None:
+            match, resp = near
+            _finish_search(cfg, state, replace(req, query=match.request.query), match.request, min_score, resp, True, (time.perf_counter() - t0) * 1000)
+            state.similar_match = (req.query, match.request.query, match.similarity)
+            return
+        if cfg.jobs.enabled:
+            if _submit_search(cfg, state, req, fetch_req, min_score):
+                state.job.wait(cfg.jobs.inline_wait_seconds)
+            else:
+                st.caption("This search is already running.")
+            return
+        _admit()
+        resp = _search_runner(cfg)(fetch_req, _live_table(cfg, st.empty()))
+        _finish_search(cfg, state, req, fetch_req, min_score, resp, False, (time.perf_counter() - t0) * 1000)
+        st.success(f"Got {len(state.last_results)} skills in {state.last_resp_time_ms:.0f} ms.")
+    except Exception as e:
+        _show_search_error(e)
+
+
+def _similar_notice(cfg, state: AppState, req: RecommendRequest, min_score: float) -> None:
+    """
+    Explains that a near-duplicate query answered the search; the button re-runs `req` as typed
+    (still answered from the cache or store when that exact query is there).
+    """
+    asked, matched, similarity = state.similar_match
+    c1, c2 = st.columns([5, 1])
+    with c1:
+        st.info(f"Showing cached results for “{matched}” ({similarity:.0%} similar to “{asked}”).")
+    with c2:
+        if st.button("Search as typed", key="search_fresh", use_container_width=True):
+            _search(cfg, state, req, min_score, similar=False)
+
+
+def _submit_search(cfg, state: AppState, req: RecommendRequest, fetch_req: RecommendRequest, min_score: float) -> bool:
+    """
+    Start `fetch_req` on the job queue. Returns False when the same search is already running for
+    this session (a repeated click keeps waiting on it instead of starting another, and is not
+    counted against the session's rate limit).
+    """
+    key = cache_key(fetch_req)
+    job = state.job
+    running = job is not None and not job.done
+    if running and job.key == key:
+        return False
+    _admit()
+    if running:
+        job.cancel()  # a different search replaces the running one
+    run = _search_runner(cfg)
+    state.job = _jobs().submit(
+        lambda j: run(fetch_req, j.report, j),
+        key=key,
+        label=req.query,
+        context={"req": req, "fetch_req": fetch_req, "min_score": min_score},
+    )
+    return True
+
+
+def _collect_search(cfg, state: AppState) -> None:
+    """
+    Apply the result of a finished background search, once.
+    """
+    job = state.job
+    if job is None or not job.done:
+        return
+    state.job = None
+    if job.cancelled:
+        return
+    if job.error is not None:
+        _show_search_error(job.error)
+        return
+    ctx = job.context
+    _finish_search(cfg, state, ctx["req"], ctx["fetch_req"], ctx["min_score"], job.result, False, job.elapsed_seconds() * 1000)
+    st.success(f"Got {len(state.last_results)} skills in {state.last_resp_time_ms:.0f} ms.")
+
+
+def _search_progress(cfg, state: AppState) -> None:
+    """
+    Progress of the running search; re-run on its own every `jobs.poll_seconds` (fragment) until
+    the job finishes, then the whole page reruns to show the result.
+    """
+    job = state.job
+    if job is None:
+        return
+    if job.done:
+        st.rerun()
+    admission = _admission()
+    ticket = job.context.get("ticket")
+    position = admission.position(ticket) if admission is not None and ticket is not None else 0
+    c1, c2 = st.columns([5, 1])
+    with c1:
+        if job.status == "queued":
+            st.info(f"Search for “{job.label}” is queued ({job.elapsed_seconds():.0f}s)…")
+        elif position:
+            st.info(f"Search for “{job.label}” is waiting for a free backend slot: number {position} in line ({job.elapsed_seconds():.0f}s)…")
+        else:
+            st.info(f"Searching “{job.label}” · {job.elapsed_seconds():.0f}s · {len(job.partial)} skill(s) so far")
+    with c2:
+        if st.button("Cancel", key="cancel_search", use_container_width=True):
+            job.cancel()
+            state.job = None
+            st.rerun()
+    if job.partial:
+        _render_partial(cfg, st, list(job.partial))
+    st.caption("You can keep browsing the previous results and your selection while this runs.")
+
+
+def _start_compare(cfg, state: AppState, requests) -> None:
+    """
+    Answer each request from the cache/store, else start it on the job queue; misses run
+    concurrently, so a comparison takes about as long as its slowest query.
+    """
+    if state.compare is not None:
+        state.compare.cancel()
+    run = CompareRun(queries=[r.query for r in requests])
+    misses = []
+    for req in requests:
+        fetch_req = superset_request(req, cfg.fetch_once.max_top_k) if cfg.fetch_once.enabled else req
+        run.requests[req.query] = fetch_req
+        resp = _lookup_cached(fetch_req)
+        if resp is not None:
+            run.responses[req.query] = resp
+            _keep_response(fetch_req, resp)
+        else:
+            misses.append((req.query, fetch_req))
+    if misses:
+        try:
+            _admit()  # a comparison counts as one search
+        except AdmissionRejected as e:
+            run.errors.update({query: str(e) for query, _ in misses})
+            misses = []
+    fetch = _search_runner(cfg)
+    for query, fetch_req in misses:
+        run.jobs[query] = _jobs().submit(lambda j, r=fetch_req: fetch(r, j.report, j), key=cache_key(fetch_req), label=query)
+    if not cfg.jobs.enabled:
+        for job in list(run.jobs.values()):
+            job.wait()  # blocking mode: the queries still run concurrently
+    state.compare = run
+
+
+def _collect_compare(state: AppState) -> None:
+    run = state.compare
+    if run is None:
+        return
+    for query in run.collect():
+        _keep_response(run.requests[query], run.responses[query])
+
+
+def _compare_progress(cfg, state: AppState) -> None:
+    """
+    Progress of the running comparison (fragment, like `_search_progress()`); the page reruns once
+    every query has finished.
+    """
+    run = state.compare
+    if run is None:
+        return
+    pending = [q for q, job in run.jobs.items() if not job.done]
+    if not pending:
+        st.rerun()
+    total = len(run.queries)
+    st.progress((total - len(pending)) / total, text=f"{total - len(pending)}/{total} queries done · waiting for " + ", ".join(f"“{q}”" for q in pending))
+    if st.button("Cancel comparison", key="cancel_compare"):
+        run.cancel()
+        st.rerun()
+
+
+def _compare_response(cfg, run: CompareRun, query: str, req: RecommendRequest, min_score: float):
+    """
+    Fetch-once mode: the query's superset sliced to the current settings (like a normal search).
+    """
+    resp = run.responses[query]
+    fetch_req = run.requests[query]
+    if cfg.fetch_once.enabled and can_derive(fetch_req, resp, req):
+        return derive(fetch_req, resp, req, min_score)
+    return resp
+
+
+def _compare_view(cfg, state: AppState, request_for, min_score: float) -> None:
+    max_queries = max(2, cfg.compare.max_queries)
+    with st.form("compare_form"):
+        text = st.text_area(
+            "Queries (one per line)",
+            placeholder="data scientist\nML engineer\ndata analyst",
+            help=f"Up to {max_queries} queries; they run at the same time with the sidebar settings.",
         )
-    return pd.DataFrame(rows)
+        compare = st.form_submit_button("Compare")
+    if compare:
+        queries = list(dict.fromkeys(q.strip() for q in (text or "").splitlines() if q.strip()))
+        if len(queries) < 2:
+            st.error("Enter at least two queries, one per line.")
+        else:
+            if len(queries) > max_queries:
+                st.warning(f"Comparing the first {max_queries} queries.")
+            _start_compare(cfg, state, [request_for(q) for q in queries[:max_queries]])
+
+    _collect_compare(state)
+    run = state.compare
+    if run is None:
+        return
+    if not run.done:
+        st.fragment(_compare_progress, run_every=cfg.jobs.poll_seconds)(cfg, state)
+        return
+    for query, error in run.errors.items():
+        st.warning(f"“{query}”: {error}")
+    responses = {q: _compare_response(cfg, run, q, request_for(q), min_score) for q in run.queries if q in run.responses}
+    if not responses:
+        return
+
+    with REGISTRY.timer("ui_compare_ms"):
+        cmp = compare_responses(responses)
+        metric = st.radio("Overlap", ["Jaccard (%)", "Shared skills"], horizontal=True, key="compare_metric")
+        if metric == "Shared skills":
+            st.dataframe(overlap_frame(cmp, metric="count"), use_container_width=True)
+        else:
+            st.dataframe((overlap_frame(cmp) * 100).round().astype(int), use_container_width=True)
+
+        min_queries = 1
+        if len(cmp.queries) > 1:
+            min_queries = st.slider("Found by at least … queries", min_value=1, max_value=len(cmp.queries), value=1, key="compare_min_queries")
+        st.caption("Rank of each skill per query (blank = not recommended for that query).")
+        st.dataframe(ranked_frame(cmp, min_queries), use_container_width=True, hide_index=True)
+
+    shared = shared_skill_ids(cmp)
+    if shared and st.button(f"Add the {len(shared)} skill(s) found by every query to Selected", key="compare_add_shared"):
+        skills = {}
+        for resp in responses.values():
+            for skill in (resp.get("payload") or {}).get("recommended_skills") or []:
+                skills.setdefault(str(skill.get("skill_id", "")).strip(), skill)
+        _select(state, [skills[skill_id] for skill_id in shared])
+        st.success(f"Added {len(shared)} skill(s) (deduped by skill_id).")
 
 
 def main():
+    with REGISTRY.timer("ui_script_run_ms"):
+        _main()
+
+
+def _main():
     cfg = _cfg()
+    _metrics_server()
     st.set_page_config(page_title=cfg.ui.page_title, page_icon=cfg.ui.page_icon, layout="wide")
 
     state = _init_state()
+    _restore_selection(state)
+    sessions = _sessions()
+    sessions.touch(state)
+    sessions.sweep()
 
     st.title(cfg.ui.page_title)
 
@@ -72,6 +925,13 @@ def main():
         st.subheader("API")
         docs_url = cfg.api.base_url.rstrip("/") + "/docs"
         st.markdown(f"[API Docs]({docs_url})")
+        prober = _prober()
+        if prober is not None:
+            if not state.prewarm_requested:
+                # first render of this session: warm the backend before the user submits
+                prober.request_probe_if_stale()
+                state.prewarm_requested = True
+            _backend_status_panel(prober)
 
         st.subheader("Request settings")
         top_k = st.slider("top_k", min_value=1, max_value=100, value=int(cfg.defaults.top_k))
@@ -80,12 +940,26 @@ def main():
         require_judge_pass = st.toggle("require_judge_pass", value=bool(cfg.defaults.require_judge_pass))
         require_all_meta = st.toggle("require_all_meta", value=bool(cfg.defaults.require_all_meta))
         debug = st.toggle("debug", value=bool(cfg.defaults.debug))
+        min_score = 0.0
+        if cfg.fetch_once.enabled:
+            min_score = st.slider("min_score (local filter)", min_value=0.0, max_value=1.0, value=0.0, step=0.01)
+            st.caption(f"Fetch-once mode: up to {cfg.fetch_once.max_top_k} results are fetched per query; other settings apply locally when possible.")
+
+        index = _skill_index()
+        if index is not None:
+            st.divider()
+            st.subheader("Quick lookup")
+            _quick_lookup(cfg, state, index)
 
         st.divider()
         st.subheader("Selected Skills")
         st.write(f"{len(state.selected)} selected")
         if st.button("Clear selected", use_container_width=True):
-            state.selected = {}
+            _clear_selection(state)
+
+        if cfg.metrics.show_diagnostics:
+            st.divider()
+            _diagnostics_panel()
 
     # --- Main search input ---
     # Use st.form so that pressing Enter in the text box submits the search
@@ -97,43 +971,37 @@ def main():
             value=state.last_query,
             placeholder="e.g., data scientist / PCR / account executive",
         )
+        fresh = st.checkbox("Force fresh call", help="Skip cached and similar-query results and ask the API again.")
         submitted = st.form_submit_button("Search", type="primary")
 
+    def _request(q: str) -> RecommendRequest:
+        return RecommendRequest(
+            query=q,
+            top_k=top_k,
+            debug=debug,
+            require_judge_pass=require_judge_pass,
+            top_k_vector=top_k_vector,
+            top_k_bm25=top_k_bm25,
+            require_all_meta=require_all_meta,
+        )
+
     if submitted:
         q = (query or "").strip()
         if not q:
             st.error("Query cannot be empty.")
         else:
-            req = RecommendRequest(
-                query=q,
-                top_k=top_k,
-                debug=debug,
-                require_judge_pass=require_judge_pass,
-                top_k_vector=top_k_vector,
-                top_k_bm25=top_k_bm25,
-                require_all_meta=require_all_meta,
-            )
-            try:
-                t0 = time.perf_counter()
-                resp = recommend_skills(cfg.api, req)
-                state.last_resp_time_ms = (time.perf_counter() - t0) * 1000
-                state.last_resp_raw = resp
-
-                payload = resp.get("payload") or {}
-                meta = resp.get("meta") or {}
-
-                state.last_query = payload.get("query", q)
-                state.generation_cache_id = (meta.get("generation_cache_id") or "") if isinstance(meta, dict) else ""
-                state.last_results = payload.get("recommended_skills") or []
-
-                st.success(f"Got {len(state.last_results)} skills in {state.last_resp_time_ms:.0f} ms.")
-            except ApiError as e:
-                st.error(str(e))
-                if e.detail is not None:
-                    st.code(json.dumps(e.detail, ensure_ascii=False, indent=2))
-            except Exception as e:
-                st.error("Unexpected error")
-                st.exception(e)
+            _search(cfg, state, _request(q), min_score, fresh=fresh)
+
+    elif cfg.fetch_once.enabled and state.superset_request is not None:
+        # slider/toggle changes for the current query are applied locally without a search click
+        _derive_locally(state, _request(state.superset_request.query), min_score)
+
+    if state.similar_match is not None:
+        _similar_notice(cfg, state, _request(state.similar_match[0]), min_score)
+
+    _collect_search(cfg, state)
+    if state.job is not None:
+        st.fragment(_search_progress, run_every=cfg.jobs.poll_seconds)(cfg, state)
 
     colA, colB = st.columns([1, 2], gap="large")
 
@@ -146,24 +1014,28 @@ def main():
     with colB:
         st.subheader("Results")
         if not state.last_results:
-            st.info("No results yet. Enter a query and click Search.")
+            if state.evicted:
+                st.info("Results were cleared after a period of inactivity to free memory. Search again to reload them.")
+                state.evicted = False
+            else:
+                st.info("No results yet. Enter a query and click Search.")
         else:
-            df = _results_df(state.last_results, cfg.ui.preview_chars)
-            df = df.head(cfg.ui.max_display_rows)
+            with REGISTRY.timer("ui_results_view_ms"):
+                view = results_view(state, cfg.ui.preview_chars, cfg.ui.max_display_rows)
 
-            st.dataframe(
-                df[["skill_name", "relevance_score", "source", "preview"]],
-                use_container_width=True,
-                hide_index=True,
-            )
+            with REGISTRY.timer("ui_render_table_ms"):
+                st.dataframe(
+                    view.df[DISPLAY_COLUMNS],
+                    use_container_width=True,
+                    hide_index=True,
+                )
 
             # select a skill to view details
-            options = {f"{row['skill_name']} ({row['source']}, {row['relevance_score']:.2f})": row["skill_id"] for _, row in df.iterrows()}
-            selected_label = st.selectbox("Select a skill to view details", options=list(options.keys()))
-            selected_skill_id = options[selected_label]
+            selected_label = st.selectbox("Select a skill to view details", options=list(view.options.keys()))
+            selected_skill_id = view.options[selected_label]
 
             # find full object
-            skill_obj = next((s for s in state.last_results if str(s.get("skill_id")) == str(selected_skill_id)), None)
+            skill_obj = view.by_id.get(str(selected_skill_id))
             if skill_obj:
                 st.markdown("### Details")
                 st.write("**Skill name:**", skill_obj.get("skill_name", ""))
@@ -189,51 +1061,90 @@ def main():
                     st.write(skill_obj.get("Advanced_Criteria", ""))
 
                 if st.button("Add to Selected Skills", use_container_width=True):
-                    add_selected(state, skill_obj)
+                    _select(state, [skill_obj])
                     st.success("Added (deduped by skill_id).")
 
+            # bulk add
+            b1, b2 = st.columns([3, 1], vertical_alignment="bottom")
+            with b1:
+                bulk_min = st.slider("Add all results with score ≥", min_value=0.0, max_value=1.0, value=0.5, step=0.01, key="bulk_min_score")
+            with b2:
+                if st.button("Add all", key="bulk_add", use_container_width=True):
+                    picks = [s for s in state.last_results if skill_score(s) >= bulk_min]
+                    st.success(f"Added {_select(state, picks)} skill(s) (deduped by skill_id).")
+
+    # --- Multi-query comparison ---
+    if cfg.compare.enabled:
+        with st.expander("Compare queries", expanded=state.compare is not None):
+            _compare_view(cfg, state, _request, min_score)
+
     # --- Raw response expander ---
-    if state.last_resp_raw is not None:
+    if has_raw_response(state):
         label = f"Raw API response  ·  {state.last_resp_time_ms:.0f} ms" if state.last_resp_time_ms is not None else "Raw API response"
+        cache = _response_cache()
+        if cache is not None:
+            cs = cache.stats()
+            hit_txt = "cache hit" if state.last_resp_cached else "cache miss"
+            label += f"  ·  {hit_txt} ({cs['hits']} hits / {cs['misses']} misses)"
+        label += f"  ·  {state.raw_bytes / 1024:.0f} KB"
         with st.expander(label):
-            st.json(state.last_resp_raw)
+            _raw_response_viewer(state)
 
     # --- Selected section + export ---
     st.divider()
     st.subheader("Selected Skills")
 
-    sel = selected_list(state)
-    if not sel:
+    store = _selections()
+    if store is not None:
+        _saved_selections(state, store)
+
+    total = len(state.selected)
+    if not total:
         st.info("No selected skills yet.")
         return
 
-    sel_df = _results_df(sel, cfg.ui.preview_chars)
-    st.dataframe(sel_df[["skill_name", "relevance_score", "source", "preview"]], use_container_width=True, hide_index=True)
-
-    # remove control
-    rm_options = {f"{s.get('skill_name','')} ({s.get('source','')})": s.get("skill_id", "") for s in sel}
-    rm_label = st.selectbox("Remove a selected skill", options=["(none)"] + list(rm_options.keys()))
-    if rm_label != "(none)":
-        if st.button("Remove", use_container_width=True):
-            remove_selected(state, rm_options[rm_label])
-            st.success("Removed.")
-
-    # exports
-    export_rows = build_export_rows(
-        selected_skills=sel,
-        query=state.last_query,
-        generation_cache_id=state.generation_cache_id,
-        evidence_mode="pipe",
-    )
+    # one page at a time: the order is maintained by the state helpers, so this is a slice
+    page_size = max(1, cfg.selections.page_size)
+    pages = (total + page_size - 1) // page_size
+    page = 1
+    if pages > 1:
+        page = int(st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key="sel_page"))
+    page_items = selected_page(state, min(page, pages) - 1, page_size)
+    start = (min(page, pages) - 1) * page_size
+    st.caption(f"Showing {start + 1}–{start + len(page_items)} of {total} selected skill(s).")
+
+    with REGISTRY.timer("ui_results_df_ms"):
+        sel_df = results_df(page_items, cfg.ui.preview_chars)
+    with REGISTRY.timer("ui_render_table_ms"):
+        st.dataframe(sel_df[DISPLAY_COLUMNS], use_container_width=True, hide_index=True)
+
+    # remove control (skills on this page)
+    rm_options = {f"{s.get('skill_name','')} ({s.get('source','')}) · {s.get('skill_id', '')}": s.get("skill_id", "") for s in page_items}
+    rm_labels = st.multiselect("Remove selected skills", options=list(rm_options.keys()), key="sel_remove")
+    if rm_labels:
+        st.button(f"Remove {len(rm_labels)}", on_click=_remove_picked, args=(state, [rm_options[l] for l in rm_labels]), use_container_width=True)
+
+    sel = selected_list(state)
+
+    # exports: built lazily, only when a download button is clicked
+    export_query, export_cache_id = state.last_query, state.generation_cache_id
+
+    def _export_frame(evidence_mode: str = "pipe"):
+        return build_export_frame(
+            selected_skills=sel,
+            query=export_query,
+            generation_cache_id=export_cache_id,
+            evidence_mode=evidence_mode,
+        )
 
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     base = f"selected_skills_{ts}"
 
-    c1, c2 = st.columns(2)
+    c1, c2, c3, c4 = st.columns(4)
     with c1:
         st.download_button(
             "Download CSV",
-            data=export_csv_bytes(export_rows),
+            data=_timed("export_csv_ms", lambda: export_csv_file(_export_frame())),
             file_name=f"{base}.csv",
             mime="text/csv",
             use_container_width=True,
@@ -241,11 +1152,27 @@ def main():
     with c2:
         st.download_button(
             "Download XLSX",
-            data=export_xlsx_bytes(export_rows),
+            data=_timed("export_xlsx_ms", lambda: export_xlsx_file(_export_frame())),
             file_name=f"{base}.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             use_container_width=True,
         )
+    with c3:
+        st.download_button(
+            "Download Parquet",
+            data=_timed("export_parquet_ms", lambda: export_parquet_file(_export_frame("list"))),
+            file_name=f"{base}.parquet",
+            mime="application/vnd.apache.parquet",
+            use_container_width=True,
+        )
+    with c4:
+        st.download_button(
+            "Download JSON Lines",
+            data=_timed("export_jsonl_ms", lambda: export_jsonl_file(_export_frame("list"))),
+            file_name=f"{base}.jsonl",
+            mime="application/x-ndjson",
+            use_container_width=True,
+        )
 
     st.caption(f"Query: {state.last_query} | generation_cache_id: {state.generation_cache_id}")
 
@@ -0,0 +1,4 @@
+# benchmarks/__init__.py
+"""
+Benchmarks and the local stand-in API (`benchmarks.fake_api`) shared with the test suite.
+"""
@@ -0,0 +1,225 @@
+# benchmarks/fake_api.py
+"""
+Local stand-in for the Skills Recommendation API, used by the test suite and the benchmarks.
+
+`FakeApi` runs a threaded HTTP/1.1 (keep-alive) server on 127.0.0.1 that serves
+`/healthz`, `/v1/recommend-skills` and the streaming `/v1/recommend-skills/stream`
+(NDJSON by default, SSE when `stream_format="sse"`; disabled with `streaming=False`).
+
+Knobs:
+- `script`: queued status codes, consumed one per recommend call before falling back to 200
+- `latency_ms` / `jitter_ms`: server-side delay per recommend call (uniform +/- jitter)
+- `error_rate`: fraction of recommend calls answered with a random 429/503/500
+- `realistic=True`: production-sized skills (paragraph-length reasoning/criteria, several
+  evidence snippets) instead of the tiny default payload
+- `seed`: makes jitter and injected errors reproducible
+- `compression="gzip"`: gzip blocking responses when the client's `Accept-Encoding` offers gzip
+- `msgpack=True`: answer in MessagePack when the client's `Accept` offers it (needs `msgpack`)
+- `stream_done=False`: end streams without the final `done` event (a truncated stream)
+
+Stream events are UTF-8 JSON (non-ASCII text is not escaped) and SSE streams carry no charset
+parameter, like typical SSE servers.
+
+Request headers of recommend calls are kept in `headers`. Every recommend response carries a `Server-Timing: app;dur=...` header with the simulated delay.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+_SENTENCE = (
+    "Applies {name} in day-to-day work, interpreting requirements, choosing appropriate methods "
+    "and communicating trade-offs to stakeholders with clear, evidence-based reasoning."
+)
+
+
+def make_skill(i: int, realistic: bool = False) -> Dict[str, Any]:
+    if realistic:
+        name = f"Skill {i}"
+        return {
+            "skill_id": f"KS{i:06d}",
+            "skill_name": name,
+            "source": ("lightcast", "esco", "onet")[i % 3],
+            "relevance_score": round(1.0 - (i % 1000) * 0.001, 4),
+            "reasoning": " ".join([_SENTENCE.format(name=name)] * 3),
+            "evidence": [f"Job posting {i}-{j}: requires hands-on {name.lower()} experience." for j in range(4)],
+            "skill_text": " ".join([_SENTENCE.format(name=name)] * 4),
+            "Foundational_Criteria": " ".join([_SENTENCE.format(name=name)] * 2),
+            "Intermediate_Criteria": " ".join([_SENTENCE.format(name=name)] * 2),
+            "Advanced_Criteria": " ".join([_SENTENCE.format(name=name)] * 2),
+        }
+    return {
+        "skill_id": f"S{i}",
+        "skill_name": f"Skill {i}",
+        "source": "lightcast",
+        "relevance_score": round(1.0 - i * 0.01, 4),
+        "reasoning": f"reason {i}",
+        "evidence": [f"e{i}a", f"e{i}b"],
+        "skill_text": f"text for skill {i}",
+        "Foundational_Criteria": "f",
+        "Intermediate_Criteria": "i",
+        "Advanced_Criteria": "a",
+    }
+
+
+class FakeApi:
+    def __init__(
+        self,
+        streaming: bool = True,
+        stream_format: str = "ndjson",
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        realistic: bool = False,
+        seed: Optional[int] = None,
+        compression: Optional[str] = None,
+        msgpack: bool = False,
+        stream_done: bool = True,
+    ):
+        self.streaming = streaming
+        self.stream_format = stream_format
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.realistic = realistic
+        self.rng = random.Random(seed)
+        self.compression = compression
+        self.msgpack = msgpack
+        self.stream_done = stream_done
+        self.script: List[int] = []
+        self.paths: List[str] = []
+        self.requests: List[Dict[str, Any]] = []
+        self.headers: List[Dict[str, str]] = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeApi":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def respond(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        top_k = int(body.get("top_k", 5))
+        return {
+            "payload": {
+                "query": body.get("query", ""),
+                "recommended_skills": [make_skill(i, self.realistic) for i in range(top_k)],
+            },
+            "meta": {"generation_cache_id": f"gen-{body.get('query', '')}"},
+        }
+
+    def _delay_ms(self) -> float:
+        with self.lock:
+            jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter)
+
+    def _injected_status(self) -> int:
+        with self.lock:
+            if self.script:
+                return self.script.pop(0)
+            if self.error_rate and self.rng.random() < self.error_rate:
+                return self.rng.choice((429, 503, 500))
+        return 200
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body are separate writes; avoid 40 ms delayed-ACK stalls
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send(self, status: int, body: Any, headers: Dict[str, str] = None, negotiate: bool = False) -> None:
+                content_type, data = "application/json", None
+                if negotiate and api.msgpack and "application/msgpack" in self.headers.get("Accept", ""):
+                    import msgpack
+
+                    content_type, data = "application/msgpack", msgpack.packb(body)
+                if data is None:
+                    data = json.dumps(body).encode("utf-8")
+                headers = dict(headers or {})
+                if negotiate and api.compression == "gzip" and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    data = gzip.compress(data, 6)
+                    headers["Content-Encoding"] = "gzip"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                if self.path == "/healthz":
+                    self._send(200, {"status": "ok"})
+                else:
+                    self._send(404, {"detail": "Not Found"})
+
+            def _chunk(self, data: bytes) -> None:
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _stream(self, resp: Dict[str, Any], headers: Dict[str, str]) -> None:
+                payload = resp["payload"]
+                events = [("meta", resp["meta"]), ("payload", {"query": payload["query"]})]
+                events += [("skill", s) for s in payload["recommended_skills"]]
+                if api.stream_done:
+                    events.append(("done", None))
+                sse = api.stream_format == "sse"
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream" if sse else "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                for event, data in events:
+                    if sse:
+                        self._chunk(f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    else:
+                        self._chunk((json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n").encode("utf-8"))
+                self._chunk(b"")
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", "0"))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                streamed = self.path == "/v1/recommend-skills/stream"
+                if self.path != "/v1/recommend-skills" and not (streamed and api.streaming):
+                    self._send(404, {"detail": "Not Found"})
+                    return
+                with api.lock:
+                    api.requests.append(body)
+                    api.paths.append(self.path)
+                    api.headers.append(dict(self.headers.items()))
+                status = api._injected_status()
+                if status != 200:
+                    self._send(status, {"detail": f"scripted {status}"}, {"Retry-After": "0"})
+                    return
+                delay_ms = api._delay_ms()
+                if delay_ms:
+                    time.sleep(delay_ms / 1000)
+                timing = {"Server-Timing": f"app;dur={delay_ms:.1f}"}
+                if streamed:
+                    self._stream(api.respond(body), timing)
+                else:
+                    self._send(200, api.respond(body), timing, negotiate=True)
+
+        return Handler
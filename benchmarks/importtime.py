@@ -0,0 +1,120 @@
+# benchmarks/importtime.py
+"""
+Import-time profile of the app's cold start.
+
+This module provides:
+- `profile_imports()`: run `python -X importtime -c "import <module>"` in a fresh interpreter and
+  parse the per-module self/cumulative times
+- `import_wall_seconds()`: median wall time of importing a module in fresh interpreters
+- `main()`: CLI report (`python -m benchmarks.importtime [module] [--top N] [--json out.json]`)
+
+The report lists the slowest modules by cumulative time and which known-heavy libraries the import
+pulls in eagerly (`HEAVY_MODULES`). The app is expected to import none of pandas / numpy / pyarrow /
+openpyxl / yaml at startup; they are loaded on first use.
+
+`python -m benchmarks.run --only startup` records the same numbers with the other benchmarks so
+startup regressions are flagged against the baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Sequence
+
+from functions.utils.config import PROJECT_ROOT
+
+
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "openpyxl", "yaml")  # requests/orjson are eager on purpose
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    total_us: int
+    records: List[ImportRecord] = field(default_factory=list)
+    heavy: List[str] = field(default_factory=list)  # entries of HEAVY_MODULES imported eagerly
+
+    def top(self, n: int = 20) -> List[ImportRecord]:
+        return sorted(self.records, key=lambda r: r.cumulative_us, reverse=True)[:n]
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    """
+    Parses `-X importtime` lines: "import time: <self us> | <cumulative us> | <indented module>".
+    """
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2]
+        records.append(
+            ImportRecord(
+                module=name.strip(),
+                self_us=int(parts[0]),
+                cumulative_us=int(parts[1]),
+                depth=(len(name) - len(name.lstrip(" ")) - 1) // 2,
+            )
+        )
+    return records
+
+
+def _run(code: str, extra_args: Sequence[str] = ()) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *extra_args, "-c", code],
+        cwd=str(PROJECT_ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def profile_imports(module: str = "app") -> ImportProfile:
+    proc = _run(f"import {module}", ["-X", "importtime"])
+    records = parse_importtime(proc.stderr)
+    total = sum(r.cumulative_us for r in records if r.depth == 0)
+    imported = {r.module for r in records}
+    return ImportProfile(module=module, total_us=total, records=records, heavy=[m for m in HEAVY_MODULES if m in imported])
+
+
+def import_wall_seconds(module: str = "app", repeat: int = 5) -> float:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    return statistics.median(float(_run(code).stdout.strip()) for _ in range(max(1, repeat)))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report import-time costs of a module in a fresh interpreter.")
+    parser.add_argument("module", nargs="?", default="app", help="module to import (default: app)")
+    parser.add_argument("--top", type=int, default=20, help="slowest modules to list (default: 20)")
+    parser.add_argument("--json", help="also write the full profile as JSON")
+    args = parser.parse_args(argv)
+
+    profile = profile_imports(args.module)
+    print(f"import {profile.module}: {profile.total_us / 1000:.1f} ms (sum of top-level imports)")
+    print(f"eager heavy modules: {', '.join(profile.heavy) or 'none'}")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for r in profile.top(args.top):
+        print(f"{r.cumulative_us / 1000:>10.1f}ms {r.self_us / 1000:>8.1f}ms  {'  ' * r.depth}{r.module}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(asdict(profile), f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
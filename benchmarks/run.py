@@ -0,0 +1,296 @@
+# benchmarks/run.py
+"""
+Benchmark / load-test runner.
+
+This module measures:
+- `api_recommend[sessions=N]`: `recommend_skills()` throughput and latency with N concurrent
+  sessions (threads, each with its own keep-alive connection) against a local `FakeApi` with
+  realistic payloads and configurable latency/jitter/error rate
+- `results_df[rows=N]`, `export_frame[rows=N]`, `export_{csv,xlsx,parquet,jsonl}[rows=N]`:
+  table building and exports at each size in `--sizes`
+- `selected_list[rows=N]`: reading a selection of N skills in display order
+- `selected_add_many[rows=N]`: bulk-adding N skills to an empty selection (interning + ordering)
+- `decode_json[rows=N]`: decoding a response body of N skills with the client's JSON decoder
+  (orjson when installed)
+- `startup_import_app`: wall time of `import app` in a fresh interpreter (plus the heavy modules
+  it pulled in eagerly), and `config_load[yaml]` / `config_load[json]`: parsing the YAML config vs
+  its precompiled JSON form
+
+Results are written as JSON (`--output`). With `--save-baseline` they also become the baseline;
+otherwise they are compared against the baseline (if one exists) and any benchmark slower than
+`baseline * (1 + tolerance)` is reported as a regression (exit code 1).
+
+Usage:
+- `python -m benchmarks.run`                      (full run, compare against the baseline)
+- `python -m benchmarks.run --save-baseline`      (record a new baseline on this machine)
+- `python -m benchmarks.run --only api --sessions 1,8,32,80 --latency-ms 800`
+  (size Cloud Run `--concurrency`: look for where req/s stops scaling and p95 climbs)
+
+Notes:
+- Baselines are machine-specific; compare runs from the same machine type only.
+- XLSX is skipped above `XLSX_MAX_ROWS` rows (openpyxl is pure Python and dominates the run).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from benchmarks.fake_api import FakeApi, make_skill
+from benchmarks.importtime import import_wall_seconds, profile_imports
+from functions.core.api_client import ApiError, RecommendRequest, recommend_skills
+from functions.core.codecs import json_loads
+from functions.core.export import build_export_frame, write_csv, write_jsonl, write_parquet, write_xlsx
+from functions.core.metrics import percentile
+from functions.core.results import results_df
+from functions.core.state import AppState, add_selected, add_selected_many, selected_list
+from functions.utils.config import DEFAULT_CONFIG_PATH, PROJECT_ROOT, ApiConfig, UiConfig, compile_config, load_config
+
+
+DEFAULT_OUTPUT = PROJECT_ROOT / "artifacts" / "benchmarks" / "latest.json"
+DEFAULT_BASELINE = PROJECT_ROOT / "benchmarks" / "baseline.json"
+XLSX_MAX_ROWS = 10000
+# differences below this are timer noise, never regressions
+MIN_REGRESSION_SECONDS = 0.002
+
+
+def time_it(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return {"seconds": statistics.median(samples), "min_seconds": min(samples), "repeat": len(samples)}
+
+
+def _request(i: int, top_k: int) -> RecommendRequest:
+    return RecommendRequest(
+        query=f"benchmark query {i}",
+        top_k=top_k,
+        debug=False,
+        require_judge_pass=True,
+        top_k_vector=20,
+        top_k_bm25=20,
+        require_all_meta=False,
+    )
+
+
+def bench_api(
+    sessions: int,
+    requests_per_session: int,
+    top_k: int = 20,
+    latency_ms: float = 50.0,
+    jitter_ms: float = 20.0,
+    error_rate: float = 0.0,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    with FakeApi(latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate, realistic=True, seed=seed) as fake:
+        api = ApiConfig(
+            base_url=fake.base_url,
+            endpoint_recommend="/v1/recommend-skills",
+            endpoint_health="/healthz",
+            pool_size=max(16, sessions),
+            backoff_base_seconds=0.0,
+        )
+
+        def _session(n: int) -> None:
+            nonlocal errors
+            for i in range(requests_per_session):
+                t0 = time.perf_counter()
+                try:
+                    recommend_skills(api, _request(n * requests_per_session + i, top_k))
+                except ApiError:
+                    with lock:
+                        errors += 1
+                    continue
+                with lock:
+                    latencies.append((time.perf_counter() - t0) * 1000)
+
+        threads = [threading.Thread(target=_session, args=(n,)) for n in range(sessions)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - t0
+
+    latencies.sort()
+    total = sessions * requests_per_session
+    return {
+        "seconds": wall,
+        "requests": total,
+        "errors": errors,
+        "requests_per_second": total / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def _export_to_memory(writer: Callable[[Any, Any], None], frame: pd.DataFrame) -> Callable[[], None]:
+    return lambda: writer(frame, BytesIO())
+
+
+def bench_tables(sizes: Sequence[int], repeat: int, preview_chars: int) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    skills = [make_skill(i, realistic=True) for i in range(max(sizes))]
+    for n in sizes:
+        rows = skills[:n]
+        out[f"results_df[rows={n}]"] = time_it(lambda: results_df(rows, preview_chars), repeat)
+        out[f"export_frame[rows={n}]"] = time_it(lambda: build_export_frame(rows, "q", "gen"), repeat)
+
+        frame = build_export_frame(rows, "q", "gen")
+        list_frame = build_export_frame(rows, "q", "gen", evidence_mode="list")
+        out[f"export_csv[rows={n}]"] = time_it(_export_to_memory(write_csv, frame), repeat)
+        if n <= XLSX_MAX_ROWS:
+            out[f"export_xlsx[rows={n}]"] = time_it(_export_to_memory(write_xlsx, frame), repeat)
+        out[f"export_parquet[rows={n}]"] = time_it(_export_to_memory(write_parquet, list_frame), repeat)
+        out[f"export_jsonl[rows={n}]"] = time_it(_export_to_memory(write_jsonl, list_frame), repeat)
+
+        state = AppState()
+        shuffled = list(rows)
+        random.Random(n).shuffle(shuffled)
+        for s in shuffled:
+            add_selected(state, s)
+        out[f"selected_list[rows={n}]"] = time_it(lambda: selected_list(state), repeat)
+        out[f"selected_add_many[rows={n}]"] = time_it(lambda: add_selected_many(AppState(), shuffled), repeat)
+
+        body = json.dumps({"payload": {"recommended_skills": rows}}).encode("utf-8")
+        out[f"decode_json[rows={n}]"] = time_it(lambda: json_loads(body), repeat)
+    return out
+
+
+def bench_startup(repeat: int) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {
+        "startup_import_app": {
+            "seconds": import_wall_seconds("app", repeat),
+            "heavy_modules": profile_imports("app").heavy,
+        }
+    }
+    compiled = PROJECT_ROOT / "artifacts" / "benchmarks" / "parameters.json"
+    compiled.parent.mkdir(parents=True, exist_ok=True)
+    compile_config(DEFAULT_CONFIG_PATH, compiled)
+    out["config_load[yaml]"] = time_it(lambda: load_config(DEFAULT_CONFIG_PATH, environ={}), repeat)
+    out["config_load[json]"] = time_it(lambda: load_config(compiled, environ={}), repeat)
+    return out
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+    }
+
+
+def compare(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float = 0.25,
+) -> List[str]:
+    """
+    Names (with a short explanation) of benchmarks slower than `baseline * (1 + tolerance)`.
+    Benchmarks missing from either side are ignored.
+    """
+    regressions = []
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        limit = base["seconds"] * (1.0 + tolerance)
+        if cur["seconds"] > limit and cur["seconds"] - base["seconds"] > MIN_REGRESSION_SECONDS:
+            ratio = cur["seconds"] / base["seconds"] if base["seconds"] else float("inf")
+            regressions.append(f"{name}: {cur['seconds'] * 1000:.1f} ms vs {base['seconds'] * 1000:.1f} ms baseline ({ratio:.2f}x)")
+    return regressions
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _format(name: str, r: Dict[str, Any]) -> str:
+    line = f"{name:<36} {r['seconds'] * 1000:>10.1f} ms"
+    if "requests_per_second" in r:
+        line += f"  {r['requests_per_second']:>7.1f} req/s  p50 {r['p50_ms']:.0f} ms  p95 {r['p95_ms']:.0f} ms  errors {r['errors']}"
+    return line
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the performance benchmarks and flag regressions.")
+    parser.add_argument("--only", choices=["api", "tables", "startup"], help="run one group only")
+    parser.add_argument("--sizes", type=_ints, default=[100, 10000, 100000], help="row counts (default: 100,10000,100000)")
+    parser.add_argument("--sessions", type=_ints, default=[1, 4, 16], help="concurrent sessions (default: 1,4,16)")
+    parser.add_argument("--requests", type=int, default=20, help="requests per session (default: 20)")
+    parser.add_argument("--top-k", type=int, default=20, help="skills per response (default: 20)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fake API latency (default: 50)")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="fake API latency jitter (default: 20)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake API error rate (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per table benchmark; the median is kept")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="where to write the results JSON")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="also write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    if args.only in (None, "api"):
+        for n in args.sessions:
+            name = f"api_recommend[sessions={n}]"
+            results[name] = bench_api(n, args.requests, args.top_k, args.latency_ms, args.jitter_ms, args.error_rate)
+            print(_format(name, results[name]), file=sys.stderr)
+    if args.only in (None, "tables"):
+        for name, r in bench_tables(args.sizes, args.repeat, UiConfig().preview_chars).items():
+            results[name] = r
+            print(_format(name, r), file=sys.stderr)
+    if args.only in (None, "startup"):
+        for name, r in bench_startup(args.repeat).items():
+            results[name] = r
+            print(_format(name, r), file=sys.stderr)
+
+    report = {"environment": environment(), "results": results}
+    out = Path(args.output)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Wrote {out}", file=sys.stderr)
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved baseline {baseline_path}", file=sys.stderr)
+        return 0
+    if not baseline_path.exists():
+        print("No baseline to compare against; run with --save-baseline first.", file=sys.stderr)
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    regressions = compare(results, baseline.get("results", {}), args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r}", file=sys.stderr)
+    if regressions:
+        return 1
+    print(f"No regressions vs {baseline_path} (tolerance {args.tolerance:.0%}).", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
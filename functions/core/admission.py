@@ -0,0 +1,235 @@
+# functions/core/admission.py
+"""
+Per-instance admission control for backend recommendation calls.
+
+Every Streamlit session runs in the same process, so a few users repeating heavy searches
+(`top_k=100`, `debug=true`) can occupy every thread and backend slot and push everyone towards
+the 120 s timeout. The controller bounds that: searches beyond a per-session rate are refused
+up front, at most `max_concurrent` backend calls run at once, and the rest wait in a bounded,
+prioritized queue (shed when it is full or a wait takes too long).
+
+This module provides:
+- `AdmissionRejected`: raised when a call is shed (`reason`: "rate_limited" / "queue_full" /
+  "timeout" / "cancelled"), with a `retry_after` hint in seconds when one is known
+- `Ticket`: one call waiting for (or holding) a slot; `AdmissionController.position()` gives its
+  place in the queue for progress feedback
+- `AdmissionController`:
+  - `allow(session)`: take a token from the session's `functions.utils.ratelimit.TokenBucket`
+  - `slot(priority, on_queued, cancelled)`: context manager holding one of the `max_concurrent`
+    slots for the duration of a backend call, waiting in the queue when all are taken
+  - `withdraw(ticket)`: take a waiting call out of the queue (e.g. its search was cancelled)
+  - `position()` / `stats()`
+
+Ordering and priority:
+- Requests answered from the cache, the store or a near-duplicate never reach the controller:
+  they are served before any rate check or queueing, so they always go first.
+- Waiting calls are granted slots by `priority` (lower first), then arrival order; the app
+  queues heavy requests (large `top_k`, `debug`) behind light ones.
+- A cancelled call gives up its place: `withdraw()` wakes it, and `slot()` checks `cancelled()`
+  before queueing and again once granted (handing the slot straight back), so it never reaches
+  the backend.
+
+Metrics (`functions.core.metrics.REGISTRY`):
+- counters `admission_admitted_total`, `admission_queued_total` and
+  `admission_shed_<reason>_total`
+- histogram `admission_wait_ms` (time from queueing to getting a slot)
+
+Notes:
+- Per-session buckets are keyed by any hashable session key and dropped once fully refilled
+  (a refilled bucket is indistinguishable from a new one), so the map stays small.
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from bisect import insort
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from functions.core.metrics import REGISTRY
+from functions.utils.ratelimit import TokenBucket
+
+
+RATE_LIMITED = "rate_limited"
+QUEUE_FULL = "queue_full"
+TIMEOUT = "timeout"
+CANCELLED = "cancelled"
+
+_MESSAGES = {
+    RATE_LIMITED: "Too many searches from this session",
+    QUEUE_FULL: "The service is busy (too many searches waiting)",
+    TIMEOUT: "The service is busy (no backend slot became free in time)",
+    CANCELLED: "The search was cancelled",
+}
+_PRUNE_AT = 256  # buckets kept before refilled ones are dropped
+
+
+class AdmissionRejected(RuntimeError):
+    def __init__(self, reason: str, retry_after: Optional[float] = None):
+        self.reason = reason
+        self.retry_after = retry_after
+        msg = _MESSAGES.get(reason, reason)
+        if retry_after is not None:
+            msg += f"; try again in {max(1, round(retry_after))}s"
+        super().__init__(msg + ".")
+
+
+class Ticket:
+    def __init__(self, seq: int, priority: int, clock: Callable[[], float]):
+        self.seq = seq
+        self.priority = int(priority)
+        self.enqueued_at = clock()
+        self.granted = False
+        self.withdrawn = False
+        self._event = threading.Event()
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return (self.priority, self.seq)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queue: int = 16,
+        queue_timeout_seconds: float = 60.0,
+        session_rate_per_second: float = 0.0,
+        session_burst: float = 3.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout_seconds = float(queue_timeout_seconds)
+        self.session_rate_per_second = float(session_rate_per_second)
+        self.session_burst = max(1.0, float(session_burst))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self._running = 0
+        self._queue: List[Tuple[Tuple[int, int], Ticket]] = []  # sorted by (priority, seq)
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self.admitted = 0
+        self.shed: Dict[str, int] = {RATE_LIMITED: 0, QUEUE_FULL: 0, TIMEOUT: 0, CANCELLED: 0}
+
+    def _shed(self, reason: str, retry_after: Optional[float] = None) -> AdmissionRejected:
+        with self._lock:
+            self.shed[reason] += 1
+        REGISTRY.inc(f"admission_shed_{reason}_total")
+        return AdmissionRejected(reason, retry_after)
+
+    def allow(self, session: Hashable) -> None:
+        """
+        Take one token from `session`'s bucket; raises `AdmissionRejected` ("rate_limited") when empty.
+        """
+        if self.session_rate_per_second <= 0:
+            return
+        with self._lock:
+            bucket = self._buckets.get(session)
+            if bucket is None:
+                if len(self._buckets) >= _PRUNE_AT:
+                    for key in [k for k, b in self._buckets.items() if b.available() >= b.capacity]:
+                        del self._buckets[key]
+                bucket = self._buckets[session] = TokenBucket(self.session_rate_per_second, self.session_burst, clock=self._clock)
+        if not bucket.acquire(block=False):
+            raise self._shed(RATE_LIMITED, (1.0 - bucket.available()) / bucket.rate)
+
+    def _enter(self, priority: int) -> Ticket:
+        ticket = Ticket(next(self._seq), priority, self._clock)
+        with self._lock:
+            if self._running < self.max_concurrent and not self._queue:
+                self._running += 1
+                ticket.granted = True
+                self.admitted += 1
+            elif len(self._queue) < self.max_queue:
+                insort(self._queue, (ticket.key, ticket), key=lambda e: e[0])
+            else:
+                ticket = None
+        if ticket is None:
+            raise self._shed(QUEUE_FULL)
+        return ticket
+
+    def _leave(self) -> None:
+        with self._lock:
+            self._running -= 1
+            while self._running < self.max_concurrent and self._queue:
+                _, ticket = self._queue.pop(0)
+                ticket.granted = True
+                self._running += 1
+                self.admitted += 1
+                ticket._event.set()
+
+    def withdraw(self, ticket: Ticket) -> bool:
+        """
+        Remove a waiting `ticket` from the queue; its `slot()` raises `AdmissionRejected`
+        ("cancelled"). Returns False if it already holds a slot or is no longer waiting.
+        """
+        with self._lock:
+            if ticket.granted or not any(t is ticket for _, t in self._queue):
+                return False
+            self._queue = [e for e in self._queue if e[1] is not ticket]
+            ticket.withdrawn = True
+        ticket._event.set()
+        return True
+
+    @contextmanager
+    def slot(
+        self,
+        priority: int = 0,
+        on_queued: Optional[Callable[[Ticket], Any]] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[Ticket]:
+        """
+        Hold a backend slot for the body of the `with` block. When all slots are taken the caller
+        waits in the queue (`on_queued(ticket)` is called first, e.g. to show its position);
+        raises `AdmissionRejected` if the queue is full, no slot frees up within
+        `queue_timeout_seconds`, or the ticket is withdrawn or `cancelled()` is true before the
+        body runs.
+        """
+        if cancelled is not None and cancelled():
+            raise self._shed(CANCELLED)
+        ticket = self._enter(priority)
+        if not ticket.granted:
+            REGISTRY.inc("admission_queued_total")
+            if on_queued is not None:
+                on_queued(ticket)
+            timeout = self.queue_timeout_seconds if self.queue_timeout_seconds > 0 else None
+            ticket._event.wait(timeout)
+            with self._lock:
+                if not ticket.granted:
+                    self._queue = [e for e in self._queue if e[1] is not ticket]
+            if not ticket.granted:
+                raise self._shed(CANCELLED if ticket.withdrawn else TIMEOUT)
+            REGISTRY.observe("admission_wait_ms", (self._clock() - ticket.enqueued_at) * 1000)
+        if cancelled is not None and cancelled():
+            self._leave()  # cancelled while waiting: pass the slot on instead of calling the backend
+            raise self._shed(CANCELLED)
+        REGISTRY.inc("admission_admitted_total")
+        try:
+            yield ticket
+        finally:
+            self._leave()
+
+    def position(self, ticket: Ticket) -> int:
+        """
+        1-based place of `ticket` in the queue (1 = next to get a slot); 0 once it holds a slot
+        or is no longer waiting.
+        """
+        with self._lock:
+            for i, (_, t) in enumerate(self._queue):
+                if t is ticket:
+                    return i + 1
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": len(self._queue),
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                **{f"shed_{reason}": n for reason, n in self.shed.items()},
+            }
@@ -6,25 +6,87 @@ This module provides:
 - `RecommendRequest`: typed request payload builder for `/v1/recommend-skills`
 - `health_check()`: basic connectivity check to `/healthz`
 - `recommend_skills()`: POST wrapper with consistent error handling
+- `iter_recommend_skills()`: streaming variant yielding skills as they arrive (NDJSON or SSE),
+  falling back to the blocking POST when the backend has no streaming endpoint
+- `get_session()` / `connection_stats()`: pooled keep-alive transport and reuse counters
+- `transfer_stats()`: response bytes on the wire vs decoded, by content coding and format
+
+Backends:
+- Requests go through `functions.core.routing` (weighted choice across `ApiConfig.backend_list()`,
+  failover, optional hedging, per-backend circuit breakers). `health_check()` results feed the
+  breakers too. With one backend and hedging off, requests are sent inline as before.
+
+Transport:
+- One `HTTPAdapter` (urllib3 connection pool) is shared per (base_url, pool_size) across the
+  whole process; each thread gets its own `requests.Session` mounted on that adapter, so
+  connections are reused across Streamlit sessions without sharing Session state between threads.
+- Timeouts are split into connect vs read (`ApiConfig.connect_timeout_seconds` /
+  `ApiConfig.read_timeout()`).
+- 429/503 responses (Cloud Run cold starts / throttling) and connection errors are retried up to
+  `ApiConfig.max_retries` times with full-jitter exponential backoff, honoring `Retry-After`.
+  Timeouts are never retried (a timed-out POST may still be generating on the server).
+- Blocking requests negotiate the body encoding (`functions.core.codecs`): compression per
+  `ApiConfig.compression` (decoded by urllib3 as the body is read) and, with `ApiConfig.msgpack`
+  and the msgpack package installed, MessagePack ahead of JSON. The server's `Content-Type`
+  decides the decoder; JSON goes through orjson when installed. Streamed events keep the default
+  encodings so each event is delivered as soon as it is written.
+
+Instrumentation (recorded in `functions.core.metrics.REGISTRY`, milliseconds):
+- `api_connect_ms` (DNS + TCP, new connections only), `api_tls_ms` (TLS handshake)
+- `api_ttfb_ms`: request sent -> response headers (`Response.elapsed`, includes connect on new connections)
+- `api_server_ms`: backend-reported time from a `Server-Timing` header, when present
+- `api_download_ms` / `api_decode_ms`: body download (incl. decompression) and JSON/MessagePack
+  decode for `recommend_skills()`; `api_response_wire_bytes_total` / `api_response_body_bytes_total`
+  counters (see `transfer_stats()` for the per-coding breakdown)
+- `api_recommend_ms` / `api_health_ms`: end-to-end per call; `api_stream_first_skill_ms` /
+  `api_stream_total_ms` for the streaming path
+
+Streaming protocol:
+- POST `ApiConfig.endpoint_recommend_stream` with `Accept: application/x-ndjson, text/event-stream`.
+- Each NDJSON line (or SSE `data:` block, with the SSE `event:` name used as default) is an object
+  `{"event": "meta" | "payload" | "skill" | "error" | "done", "data": ...}`. `skill` carries one
+  recommended skill, `payload` carries payload fields other than `recommended_skills`.
+- Streams are decoded as UTF-8 unless the response names another charset.
+- The stream must end with `done`; one that closes earlier raises `ApiError` (after the skills
+  already yielded), so a partial result is never returned as the full response.
+- 404/405/406/415/501 or a non-streaming content type mean "not supported": the base URL is
+  remembered and the blocking endpoint is used from then on.
+- `stop()`, when given, is checked between streamed skills: once true the stream is closed and
+  the generator ends without a "response". A blocking answer is already complete (and paid
+  for), so it is always yielded in full.
 
 Error handling:
 - Raises `ApiError` for timeouts, network errors, non-200 responses, and non-JSON bodies.
 - `ApiError.detail` contains best-effort server error payload (JSON if possible, else raw text).
 
 Config:
-- Uses `ApiConfig` (base_url, endpoints, timeout_seconds). URL joining is normalized by `_url()`.
+- Uses `ApiConfig` (base_url, endpoints, timeouts, pool/retry settings). URL joining is normalized by `_url()`.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
+from functions.core.codecs import accept, accept_encoding, decode_body, json_loads
+from functions.core.metrics import REGISTRY
+from functions.core.routing import get_router
 from functions.utils.config import ApiConfig
 
 
+RETRY_STATUS_CODES = (429, 503)
+STREAM_UNSUPPORTED_STATUS_CODES = (404, 405, 406, 415, 501)
+STREAM_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "text/event-stream")
+
+
 class ApiError(RuntimeError):
     def __init__(self, message: str, status_code: Optional[int] = None, detail: Any = None):
         super().__init__(message)
@@ -58,26 +120,246 @@ def _url(base: str, path: str) -> str:
     return f"{base.rstrip('/')}/{path.lstrip('/')}"
 
 
-def health_check(api: ApiConfig) -> Tuple[bool, str]:
-    url = _url(api.base_url, api.endpoint_health)
+class _TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        t0 = time.perf_counter()
+        sock = super()._new_conn()
+        self._connect_ms = (time.perf_counter() - t0) * 1000
+        REGISTRY.observe("api_connect_ms", self._connect_ms)
+        return sock
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self):
+        t0 = time.perf_counter()
+        sock = super()._new_conn()
+        self._connect_ms = (time.perf_counter() - t0) * 1000
+        REGISTRY.observe("api_connect_ms", self._connect_ms)
+        return sock
+
+    def connect(self) -> None:
+        t0 = time.perf_counter()
+        self._connect_ms = 0.0
+        super().connect()
+        REGISTRY.observe("api_tls_ms", max(0.0, (time.perf_counter() - t0) * 1000 - self._connect_ms))
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _InstrumentedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+
+
+def _server_timing_ms(header: str) -> Optional[float]:
+    """
+    Largest `dur=` value in a `Server-Timing` header (e.g. "app;dur=812.5, db;dur=40"), if any.
+    """
+    durations = []
+    for entry in header.split(","):
+        for param in entry.split(";")[1:]:
+            k, _, v = param.strip().partition("=")
+            if k == "dur":
+                try:
+                    durations.append(float(v.strip('"')))
+                except ValueError:
+                    pass
+    return max(durations) if durations else None
+
+
+_ADAPTERS: Dict[Tuple[str, int], HTTPAdapter] = {}
+_ADAPTERS_LOCK = threading.Lock()
+_LOCAL = threading.local()
+_STATS_LOCK = threading.Lock()
+_STATS = {"requests": 0, "retries": 0}
+_TRANSFER: Dict[str, Any] = {"responses": 0, "wire_bytes": 0, "body_bytes": 0, "decode_ms": 0.0, "by_encoding": {}, "by_format": {}, "last": None}
+
+
+def _adapter(api: ApiConfig) -> HTTPAdapter:
+    key = (api.base_url, api.pool_size)
+    with _ADAPTERS_LOCK:
+        adapter = _ADAPTERS.get(key)
+        if adapter is None:
+            # retries are handled by `_send()` so they can be counted and jittered
+            adapter = _InstrumentedAdapter(pool_connections=4, pool_maxsize=api.pool_size, max_retries=0)
+            _ADAPTERS[key] = adapter
+        return adapter
+
+
+def get_session(api: ApiConfig) -> requests.Session:
+    """
+    Thread-local `requests.Session` backed by the process-wide connection pool for `api`.
+    """
+    sessions = getattr(_LOCAL, "sessions", None)
+    if sessions is None:
+        sessions = _LOCAL.sessions = {}
+    key = (api.base_url, api.pool_size)
+    session = sessions.get(key)
+    if session is None:
+        session = requests.Session()
+        session.headers["Connection"] = "keep-alive"
+        adapter = _adapter(api)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        sessions[key] = session
+    return session
+
+
+def connection_stats() -> Dict[str, int]:
+    """
+    Process-wide transport counters: requests sent, retries, and connections opened vs reused.
+    """
+    new_connections = 0
+    with _ADAPTERS_LOCK:
+        adapters = list(_ADAPTERS.values())
+    for adapter in adapters:
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                new_connections += int(getattr(pool, "num_connections", 0))
+    with _STATS_LOCK:
+        sent = _STATS["requests"]
+        retries = _STATS["retries"]
+    return {
+        "requests": sent,
+        "retries": retries,
+        "new_connections": new_connections,
+        "reused_connections": max(0, sent - new_connections),
+    }
+
+
+def transfer_stats() -> Dict[str, Any]:
+    """
+    Process-wide body transfer counters for blocking responses: bytes on the wire vs decoded,
+    decode time, responses per content coding / format, and the last response's numbers.
+    """
+    with _STATS_LOCK:
+        out = {k: (dict(v) if isinstance(v, dict) else v) for k, v in _TRANSFER.items()}
+    out["compression_ratio"] = (out["body_bytes"] / out["wire_bytes"]) if out["wire_bytes"] else 0.0
+    return out
+
+
+def _record_transfer(encoding: str, fmt: str, wire_bytes: int, body_bytes: int, decode_ms: float) -> None:
+    with _STATS_LOCK:
+        _TRANSFER["responses"] += 1
+        _TRANSFER["wire_bytes"] += wire_bytes
+        _TRANSFER["body_bytes"] += body_bytes
+        _TRANSFER["decode_ms"] += decode_ms
+        _TRANSFER["by_encoding"][encoding] = _TRANSFER["by_encoding"].get(encoding, 0) + 1
+        _TRANSFER["by_format"][fmt] = _TRANSFER["by_format"].get(fmt, 0) + 1
+        _TRANSFER["last"] = {
+            "encoding": encoding,
+            "format": fmt,
+            "wire_bytes": wire_bytes,
+            "body_bytes": body_bytes,
+            "decode_ms": round(decode_ms, 3),
+        }
+    REGISTRY.inc("api_response_wire_bytes_total", wire_bytes)
+    REGISTRY.inc("api_response_body_bytes_total", body_bytes)
+
+
+def _wire_bytes(r: requests.Response, body_bytes: int) -> int:
+    """
+    Bytes read from the socket for the body (before decompression), best effort.
+    """
     try:
-        r = requests.get(url, timeout=api.timeout_seconds)
+        n = int(r.raw.tell())
+    except Exception:
+        n = 0
+    if n <= 0:
+        try:
+            n = int(r.headers.get("Content-Length", ""))
+        except ValueError:
+            n = body_bytes
+    return n
+
+
+def _count(name: str) -> None:
+    with _STATS_LOCK:
+        _STATS[name] += 1
+
+
+def _backoff_seconds(api: ApiConfig, attempt: int, retry_after: Optional[str] = None) -> float:
+    cap = float(api.backoff_max_seconds)
+    if retry_after:
+        try:
+            return min(cap, max(0.0, float(retry_after)))
+        except ValueError:
+            pass  # HTTP-date form: fall back to jittered backoff
+    return random.uniform(0.0, min(cap, float(api.backoff_base_seconds) * (2 ** attempt)))
+
+
+def _send(api: ApiConfig, method: str, url: str, retries: Optional[int] = None, **kwargs: Any) -> requests.Response:
+    """
+    Send through the pooled session, retrying 429/503 and connection errors with jittered backoff.
+    """
+    session = get_session(api)
+    max_retries = api.max_retries if retries is None else retries
+    attempt = 0
+    while True:
+        _count("requests")
+        try:
+            r = session.request(method, url, timeout=(api.connect_timeout_seconds, api.read_timeout()), **kwargs)
+        except requests.Timeout:
+            raise  # ConnectTimeout is also a ConnectionError; don't retry it below
+        except requests.ConnectionError:
+            if attempt >= max_retries:
+                raise
+            time.sleep(_backoff_seconds(api, attempt))
+        else:
+            REGISTRY.observe("api_ttfb_ms", r.elapsed.total_seconds() * 1000)
+            server_ms = _server_timing_ms(r.headers.get("Server-Timing", ""))
+            if server_ms is not None:
+                REGISTRY.observe("api_server_ms", server_ms)
+            if r.status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+                return r
+            delay = _backoff_seconds(api, attempt, r.headers.get("Retry-After"))
+            r.close()
+            time.sleep(delay)
+        attempt += 1
+        _count("retries")
+
+
+def health_check(api: ApiConfig, base_url: Optional[str] = None) -> Tuple[bool, str]:
+    """
+    Checks `base_url` (default: `api.base_url`) and records the result in its circuit breaker.
+    """
+    base = (base_url or api.base_url).rstrip("/")
+    target = api if base == api.base_url else replace(api, base_url=base)
+    ok, msg = False, ""
+    try:
+        with REGISTRY.timer("api_health_ms"):
+            r = _send(target, "GET", _url(base, api.endpoint_health), retries=0)
         if r.status_code == 200:
-            return True, "ok"
-        return False, f"HTTP {r.status_code}: {r.text}"
+            ok, msg = True, "ok"
+        else:
+            msg = f"HTTP {r.status_code}: {r.text}"
     except requests.RequestException as e:
-        return False, str(e)
+        msg = str(e)
+    get_router(api).record_health(base, ok)
+    return ok, msg
 
 
-def recommend_skills(api: ApiConfig, req: RecommendRequest) -> Dict[str, Any]:
-    url = _url(api.base_url, api.endpoint_recommend)
+def _post(api: ApiConfig, url: str, req: RecommendRequest, **kwargs: Any) -> requests.Response:
     try:
-        r = requests.post(url, json=req.to_json(), timeout=api.timeout_seconds)
+        return _send(api, "POST", url, json=req.to_json(), **kwargs)
+    except requests.ConnectTimeout as e:
+        raise ApiError(f"Connection timed out after {api.connect_timeout_seconds}s", detail=str(e)) from e
     except requests.Timeout as e:
-        raise ApiError(f"Request timed out after {api.timeout_seconds}s", detail=str(e)) from e
+        raise ApiError(f"Request timed out after {api.read_timeout()}s", detail=str(e)) from e
     except requests.RequestException as e:
         raise ApiError("Network error calling API", detail=str(e)) from e
 
+
+def _raise_for_status(r: requests.Response) -> None:
     if r.status_code != 200:
         # best-effort parse FastAPI error shape
         detail: Any
@@ -87,7 +369,152 @@ def recommend_skills(api: ApiConfig, req: RecommendRequest) -> Dict[str, Any]:
             detail = r.text
         raise ApiError(f"API error: HTTP {r.status_code}", status_code=r.status_code, detail=detail)
 
-    try:
-        return r.json()
-    except Exception as e:
-        raise ApiError("API returned non-JSON response", status_code=r.status_code, detail=r.text) from e
\ No newline at end of file
+
+def _read_json(r: requests.Response) -> Dict[str, Any]:
+    with r:
+        try:
+            with REGISTRY.timer("api_download_ms"):
+                body = r.content
+        except requests.RequestException as e:
+            raise ApiError("Network error while reading API response", detail=str(e)) from e
+        _raise_for_status(r)
+
+        t0 = time.perf_counter()
+        try:
+            obj, fmt = decode_body(body, r.headers.get("Content-Type", ""))
+        except Exception as e:
+            raise ApiError("API returned non-JSON response", status_code=r.status_code, detail=r.text) from e
+        decode_ms = (time.perf_counter() - t0) * 1000
+        REGISTRY.observe("api_decode_ms", decode_ms)
+        encoding = r.headers.get("Content-Encoding", "").strip().lower() or "identity"
+        _record_transfer(encoding, fmt, _wire_bytes(r, len(body)), len(body), decode_ms)
+        return obj
+
+
+def _recommend_headers(api: ApiConfig) -> Dict[str, str]:
+    return {"Accept": accept(api.msgpack), "Accept-Encoding": accept_encoding(api.compression)}
+
+
+def _post_blocking(api: ApiConfig, req: RecommendRequest) -> requests.Response:
+    return _post(api, _url(api.base_url, api.endpoint_recommend), req, stream=True, headers=_recommend_headers(api))
+
+
+def recommend_skills(api: ApiConfig, req: RecommendRequest) -> Dict[str, Any]:
+    with REGISTRY.timer("api_recommend_ms"):
+        _, r = get_router(api).send(lambda b: _post_blocking(b, req))
+        return _read_json(r)
+
+
+_STREAM_UNSUPPORTED: set = set()
+
+
+def _iter_stream_events(r: requests.Response) -> Iterator[Tuple[str, Any]]:
+    content_type = r.headers.get("Content-Type", "")
+    sse = content_type.startswith("text/event-stream")
+    if "charset" not in content_type.lower():
+        r.encoding = "utf-8"  # requests would default text/* to ISO-8859-1; SSE is always UTF-8
+    sse_event, sse_data = "", []
+    for raw in r.iter_lines(decode_unicode=True):
+        line = raw or ""
+        if sse:
+            if line.startswith("event:"):
+                sse_event = line[len("event:"):].strip()
+                continue
+            if line.startswith("data:"):
+                sse_data.append(line[len("data:"):].strip())
+                continue
+            if line or not sse_data:
+                continue  # comments / ids / keep-alives
+            text, default_event = "\n".join(sse_data), sse_event
+            sse_event, sse_data = "", []
+        else:
+            if not line.strip():
+                continue
+            text, default_event = line, ""
+        try:
+            obj = json_loads(text)
+        except ValueError as e:
+            raise ApiError("API stream returned a non-JSON event", status_code=r.status_code, detail=text) from e
+        if isinstance(obj, dict) and "event" in obj:
+            yield str(obj["event"]), obj.get("data")
+        else:
+            yield default_event or "skill", obj
+
+
+def iter_recommend_skills(
+    api: ApiConfig,
+    req: RecommendRequest,
+    stop: Optional[Callable[[], bool]] = None,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Yields ("skill", skill_dict) for each recommended skill as it arrives, then a final
+    ("response", full_response) with the same shape `recommend_skills()` returns (not yielded
+    when a live stream is abandoned because `stop()` became true).
+    """
+    if not api.streaming or all(b.url in _STREAM_UNSUPPORTED for b in api.backend_list()):
+        resp = recommend_skills(api, req)
+        for skill in (resp.get("payload") or {}).get("recommended_skills") or []:
+            yield "skill", skill
+        yield "response", resp
+        return
+
+    def _send_stream(b: ApiConfig) -> requests.Response:
+        if b.base_url in _STREAM_UNSUPPORTED:
+            return _post_blocking(b, req)
+        url = _url(b.base_url, b.endpoint_recommend_stream)
+        return _post(b, url, req, stream=True, headers={"Accept": "application/x-ndjson, text/event-stream"})
+
+    t0 = time.perf_counter()
+    target, r = get_router(api).send(_send_stream)
+    content_type = r.headers.get("Content-Type", "")
+    if target.base_url not in _STREAM_UNSUPPORTED and r.status_code in STREAM_UNSUPPORTED_STATUS_CODES:
+        r.close()
+        _STREAM_UNSUPPORTED.add(target.base_url)
+        yield from iter_recommend_skills(api, req, stop)
+        return
+    if r.status_code != 200 or not content_type.startswith(STREAM_CONTENT_TYPES):
+        if r.status_code == 200:
+            _STREAM_UNSUPPORTED.add(target.base_url)
+        # blocking answer from a backend without streaming (or an error to report)
+        resp = _read_json(r)
+        for skill in (resp.get("payload") or {}).get("recommended_skills") or []:
+            yield "skill", skill
+        yield "response", resp
+        return
+
+    first_skill = True
+    done = False
+    with r:
+        _raise_for_status(r)
+        payload: Dict[str, Any] = {}
+        meta: Dict[str, Any] = {}
+        skills = []
+        try:
+            for event, data in _iter_stream_events(r):
+                if event == "skill":
+                    if first_skill:
+                        REGISTRY.observe("api_stream_first_skill_ms", (time.perf_counter() - t0) * 1000)
+                        first_skill = False
+                    skills.append(data)
+                    yield "skill", data
+                    if stop is not None and stop():
+                        return  # closes the stream
+                elif event == "payload" and isinstance(data, dict):
+                    payload.update({k: v for k, v in data.items() if k != "recommended_skills"})
+                elif event == "meta" and isinstance(data, dict):
+                    meta.update(data)
+                elif event == "error":
+                    raise ApiError("API stream reported an error", status_code=r.status_code, detail=data)
+                elif event == "done":
+                    done = True
+                    break
+        except requests.RequestException as e:
+            raise ApiError("Network error while streaming API response", detail=str(e)) from e
+        if not done:
+            # a truncated stream must not be cached or stored as a complete response
+            raise ApiError("API stream ended before it was complete", status_code=r.status_code, detail={"skills_received": len(skills)})
+
+    REGISTRY.observe("api_stream_total_ms", (time.perf_counter() - t0) * 1000)
+    payload.setdefault("query", req.query)
+    payload["recommended_skills"] = skills
+    yield "response", {"payload": payload, "meta": meta}
@@ -0,0 +1,302 @@
+# functions/core/batch.py
+"""
+Batch recommendation engine for bulk query files.
+
+This module runs many `RecommendRequest`s concurrently and writes the combined results through
+the regular export schema (`build_export_frame()` / `EXPORT_COLUMNS`).
+
+This module provides:
+- `read_queries()`: load queries from a `.csv` (its `query` column; a CSV without one is rejected
+  rather than guessing whether the first row is a header) or a text file (one query per line);
+  blanks and duplicates are dropped, order is kept
+- `run_batch()`: bounded-concurrency, rate-limited execution with progress callbacks and a JSONL
+  checkpoint so interrupted runs resume where they stopped
+- `batch_export_frame()`: combine successful results into one export DataFrame
+- `write_batch_export()`: stream successful results to CSV/XLSX/Parquet/JSONL (by output extension) one query
+  at a time, without building the combined table in memory
+- `main()`: CLI entry point (`python -m functions.core.batch queries.csv -o results.csv`); reads
+  and writes the persistent response store when `store.enabled`, so repeated queries are reused
+
+Checkpoint format:
+- One JSON object per line: `{"query", "ok", "response", "error", "elapsed_ms"}`.
+- On resume, queries with an `ok` record are skipped; failed queries are retried.
+- Queries are submitted as workers free up (at most `max_concurrency` in flight). When the run is
+  interrupted (Ctrl-C, or an error in the progress callback) nothing new starts, and the calls
+  already in flight are still checkpointed before the exception propagates.
+
+Notes:
+- The HTTP client is synchronous, so concurrency comes from a thread pool. Keep
+  `api.pool_size` >= `max_concurrency` so every worker gets a keep-alive connection.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+from functions.core.api_client import ApiError, RecommendRequest, recommend_skills
+from functions.core.export import EXPORT_COLUMNS, build_export_frame, write_csv, write_jsonl, write_parquet, write_xlsx
+from functions.core.store import ResponseStore, through_store
+from functions.utils.config import AppConfig, DefaultsConfig, load_config
+from functions.utils.ratelimit import TokenBucket
+
+
+@dataclass
+class BatchResult:
+    query: str
+    ok: bool
+    response: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "query": self.query,
+            "ok": self.ok,
+            "response": self.response,
+            "error": self.error,
+            "elapsed_ms": self.elapsed_ms,
+        }
+
+
+def read_queries(path: str) -> List[str]:
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"Missing query file: {p}")
+    with p.open("r", encoding="utf-8-sig", newline="") as f:
+        if p.suffix.lower() == ".csv":
+            reader = csv.reader(f)
+            cols = [c.strip().lower() for c in next(reader, [])]
+            if "query" not in cols:
+                raise ValueError(f"{p} has no 'query' column (use a text file for one query per line)")
+            idx = cols.index("query")
+            raw = [row[idx] for row in reader if len(row) > idx]
+        else:
+            raw = f.read().splitlines()
+
+    seen = set()
+    queries: List[str] = []
+    for q in raw:
+        q = q.strip()
+        if q and q not in seen:
+            seen.add(q)
+            queries.append(q)
+    return queries
+
+
+def request_for(query: str, defaults: DefaultsConfig) -> RecommendRequest:
+    return RecommendRequest(
+        query=query,
+        top_k=int(defaults.top_k),
+        debug=bool(defaults.debug),
+        require_judge_pass=bool(defaults.require_judge_pass),
+        top_k_vector=int(defaults.top_k_vector),
+        top_k_bm25=int(defaults.top_k_bm25),
+        require_all_meta=bool(defaults.require_all_meta),
+    )
+
+
+def load_checkpoint(path: Optional[str]) -> Dict[str, BatchResult]:
+    """
+    Returns the latest successful result per query recorded in a checkpoint file.
+    """
+    done: Dict[str, BatchResult] = {}
+    if not path or not Path(path).exists():
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                d = json.loads(line)
+            except ValueError:
+                continue  # truncated last line after a crash
+            if isinstance(d, dict) and d.get("ok"):
+                done[str(d.get("query", ""))] = BatchResult(
+                    query=str(d.get("query", "")),
+                    ok=True,
+                    response=d.get("response"),
+                    elapsed_ms=float(d.get("elapsed_ms") or 0.0),
+                )
+    return done
+
+
+def run_batch(
+    queries: Sequence[str],
+    make_request: Callable[[str], RecommendRequest],
+    fetch: Callable[[RecommendRequest], Dict[str, Any]],
+    max_concurrency: int = 8,
+    rate_per_second: Optional[float] = None,
+    checkpoint_path: Optional[str] = None,
+    progress: Optional[Callable[[int, int, BatchResult], None]] = None,
+) -> List[BatchResult]:
+    """
+    Runs `fetch(make_request(q))` for every query and returns results in input order.
+    """
+    done = load_checkpoint(checkpoint_path)
+    results: Dict[str, BatchResult] = {q: done[q] for q in queries if q in done}
+    pending = [q for q in queries if q not in results]
+    total = len(queries)
+    completed = len(results)
+
+    bucket = TokenBucket(rate_per_second) if rate_per_second else None
+    lock = threading.Lock()
+    stopping = threading.Event()
+    ckpt = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+
+    def _one(q: str) -> Optional[BatchResult]:
+        if bucket is not None:
+            bucket.acquire()
+        if stopping.is_set():
+            return None  # interrupted while waiting for the rate limit
+        t0 = time.perf_counter()
+        try:
+            resp = fetch(make_request(q))
+            return BatchResult(query=q, ok=True, response=resp, elapsed_ms=(time.perf_counter() - t0) * 1000)
+        except ApiError as e:
+            err = f"{e} (HTTP {e.status_code})" if e.status_code else str(e)
+        except Exception as e:
+            err = f"{type(e).__name__}: {e}"
+        return BatchResult(query=q, ok=False, error=err, elapsed_ms=(time.perf_counter() - t0) * 1000)
+
+    def _record(res: BatchResult) -> int:
+        nonlocal completed
+        with lock:
+            results[res.query] = res
+            completed += 1
+            if ckpt is not None:
+                ckpt.write(json.dumps(res.to_json(), ensure_ascii=False) + "\n")
+                ckpt.flush()
+            return completed
+
+    limit = max(1, int(max_concurrency))
+    todo = iter(pending)
+    ex = ThreadPoolExecutor(max_workers=limit)
+    in_flight = {ex.submit(_one, q) for q in itertools.islice(todo, limit)}
+    try:
+        while in_flight:
+            for fut in wait(in_flight, return_when=FIRST_COMPLETED).done:
+                in_flight.discard(fut)
+                res = fut.result()
+                n = _record(res)
+                in_flight.update(ex.submit(_one, q) for q in itertools.islice(todo, 1))
+                if progress is not None:
+                    progress(n, total, res)
+    except BaseException:
+        # interrupted: start nothing new, but keep what the calls already running return
+        stopping.set()
+        for fut in as_completed(in_flight):
+            if fut.result() is not None:
+                _record(fut.result())
+        raise
+    finally:
+        ex.shutdown(wait=True)
+        if ckpt is not None:
+            ckpt.close()
+
+    return [results[q] for q in queries if q in results]
+
+
+def _export_frames(results: Sequence[BatchResult], evidence_mode: str) -> Iterator[pd.DataFrame]:
+    for res in results:
+        if not res.ok or not res.response:
+            continue
+        payload = res.response.get("payload") or {}
+        meta = res.response.get("meta") or {}
+        yield build_export_frame(
+            selected_skills=payload.get("recommended_skills") or [],
+            query=payload.get("query", res.query),
+            generation_cache_id=(meta.get("generation_cache_id") or "") if isinstance(meta, dict) else "",
+            evidence_mode=evidence_mode,
+        )
+
+
+def batch_export_frame(results: Sequence[BatchResult], evidence_mode: str = "pipe") -> pd.DataFrame:
+    frames = list(_export_frames(results, evidence_mode))
+    if not frames:
+        return pd.DataFrame(columns=EXPORT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_batch_export(results: Sequence[BatchResult], output_path: str, evidence_mode: str = "pipe") -> int:
+    """
+    Streams export rows to `output_path` (.csv, .xlsx, .parquet or .jsonl) one query at a time.
+    Returns the number of rows written. Parquet/JSON Lines keep evidence as a list.
+    """
+    writers = {".csv": write_csv, ".xlsx": write_xlsx, ".parquet": write_parquet, ".jsonl": write_jsonl}
+    suffix = Path(output_path).suffix.lower()
+    if suffix not in writers:
+        raise ValueError(f"Unsupported export format: {suffix!r} (expected one of {', '.join(writers)})")
+    if suffix in (".parquet", ".jsonl"):
+        evidence_mode = "list"
+    n_rows = [0]
+
+    def _counted() -> Iterator[pd.DataFrame]:
+        for frame in _export_frames(results, evidence_mode):
+            n_rows[0] += len(frame)
+            yield frame
+
+    writers[suffix](_counted(), output_path)
+    return n_rows[0]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run skill recommendations for a file of queries.")
+    parser.add_argument("queries", help="CSV (with a 'query' column) or text file with one query per line")
+    parser.add_argument("-o", "--output", required=True, help="output file (.csv, .xlsx, .parquet or .jsonl)")
+    parser.add_argument("--checkpoint", help="JSONL checkpoint for resuming (default: <output>.checkpoint.jsonl)")
+    parser.add_argument("--config", help="path to parameters.yaml")
+    parser.add_argument("--concurrency", type=int, help="max concurrent requests (default: batch.max_concurrency)")
+    parser.add_argument("--rate", type=float, help="max requests per second (default: batch.rate_per_second)")
+    args = parser.parse_args(argv)
+
+    cfg: AppConfig = load_config(args.config)
+    try:
+        queries = read_queries(args.queries)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    checkpoint = args.checkpoint or f"{args.output}.checkpoint.jsonl"
+    concurrency = args.concurrency or cfg.batch.max_concurrency
+    rate = args.rate if args.rate is not None else cfg.batch.rate_per_second
+
+    def _progress(n: int, total: int, res: BatchResult) -> None:
+        status = "ok" if res.ok else f"error: {res.error}"
+        print(f"[{n}/{total}] {res.query} ({res.elapsed_ms:.0f} ms) {status}", file=sys.stderr)
+
+    store = ResponseStore.from_config(cfg.store) if cfg.store.enabled else None
+    try:
+        results = run_batch(
+            queries,
+            make_request=lambda q: request_for(q, cfg.defaults),
+            fetch=through_store(store, lambda r: recommend_skills(cfg.api, r)),
+            max_concurrency=concurrency,
+            rate_per_second=rate or None,
+            checkpoint_path=checkpoint,
+            progress=_progress,
+        )
+    except KeyboardInterrupt:
+        print(f"Interrupted; finished queries are in {checkpoint}, re-run the same command to resume.", file=sys.stderr)
+        return 130
+    finally:
+        if store is not None:
+            store.close()
+    n_rows = write_batch_export(results, args.output)
+    failed = [r.query for r in results if not r.ok]
+    print(f"Wrote {n_rows} rows for {len(results) - len(failed)}/{len(queries)} queries to {args.output}", file=sys.stderr)
+    if failed:
+        print(f"{len(failed)} queries failed; re-run the same command to retry them.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# functions/core/cache.py
+"""
+Process-wide response cache for `/v1/recommend-skills` calls.
+
+This module provides:
+- `cache_key()`: normalized, deterministic key derived from `RecommendRequest.to_json()`
+- `ResponseCache`: thread-safe TTL + LRU cache with an entry limit and a byte budget
+- `cached_call()`: look up a request in the cache, falling back to a fetch function on miss
+
+Key behaviors:
+- Keys are the request JSON with sorted keys and the canonical query
+  (`functions.core.queries.canonical_query()`), so requests that only differ in case,
+  punctuation, Unicode form or whitespace share one entry.
+- Entry size is estimated from the compact JSON encoding of the response; entries larger
+  than the whole byte budget are never stored.
+- Eviction is least-recently-used once either `max_entries` or `max_bytes` is exceeded;
+  expired entries are dropped lazily on access.
+- Hit/miss/eviction counters are kept for display in the UI (`stats()`).
+
+Notes:
+- The cache is meant to be created once per process (e.g. via `st.cache_resource`) so it
+  is shared across Streamlit sessions. Cached responses are shared objects: treat them as
+  read-only.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from functions.core.api_client import RecommendRequest
+from functions.core.queries import canonical_query
+from functions.utils.config import CacheConfig
+
+
+def cache_key(req: RecommendRequest) -> str:
+    d = req.to_json()
+    d["query"] = canonical_query(d.get("query", ""))
+    return json.dumps(d, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def _estimate_bytes(value: Any) -> int:
+    try:
+        return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(repr(value).encode("utf-8"))
+
+
+@dataclass
+class _Entry:
+    value: Dict[str, Any]
+    size: int
+    expires_at: float
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        ttl_seconds: float = 600,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, cfg: CacheConfig) -> "ResponseCache":
+        return cls(ttl_seconds=cfg.ttl_seconds, max_entries=cfg.max_entries, max_bytes=cfg.max_bytes)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def get(self, req: RecommendRequest) -> Optional[Dict[str, Any]]:
+        key = cache_key(req)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= self._clock():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, req: RecommendRequest, value: Dict[str, Any]) -> bool:
+        """
+        Store a response. Returns False when the response does not fit the byte budget.
+        """
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return False
+        size = _estimate_bytes(value)
+        if size > self.max_bytes:
+            return False
+        key = cache_key(req)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = _Entry(value=value, size=size, expires_at=self._clock() + self.ttl_seconds)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+def cached_call(
+    cache: Optional[ResponseCache],
+    req: RecommendRequest,
+    fetch: Callable[[RecommendRequest], Dict[str, Any]],
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Returns (response, cache_hit). With `cache=None` this is a plain `fetch(req)`.
+    Errors from `fetch` are propagated and never cached.
+    """
+    if cache is None:
+        return fetch(req), False
+    resp = cache.get(req)
+    if resp is not None:
+        return resp, True
+    resp = fetch(req)
+    cache.put(req, resp)
+    return resp, False
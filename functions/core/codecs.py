@@ -0,0 +1,81 @@
+# functions/core/codecs.py
+"""
+Content negotiation and decoding for API response bodies.
+
+This module provides:
+- `available_encodings()`: content codings urllib3 can decode here (gzip/deflate always; br with
+  `brotli`/`brotlicffi`, zstd with `zstandard` installed)
+- `accept_encoding()`: `Accept-Encoding` value for the configured preference order
+- `accept()`: `Accept` value offering MessagePack (when enabled and `msgpack` is installed)
+  ahead of JSON
+- `json_loads()`: `orjson.loads` when orjson is installed, else `json.loads`
+- `decode_body()`: decode a (decompressed) body by its `Content-Type`
+
+Notes:
+- Decompression itself is done by urllib3 while the body is read; this module only decides what
+  to offer. The server picks: a response without `Content-Encoding` or in JSON is always accepted.
+- The optional packages are looked up once at import time and never required.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+from typing import Any, Callable, Sequence, Tuple
+
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+_HAS_BROTLI = any(importlib.util.find_spec(m) is not None for m in ("brotli", "brotlicffi"))
+_HAS_ZSTD = importlib.util.find_spec("zstandard") is not None
+HAS_MSGPACK = importlib.util.find_spec("msgpack") is not None
+HAS_ORJSON = importlib.util.find_spec("orjson") is not None
+
+
+def available_encodings() -> Tuple[str, ...]:
+    out = ["gzip", "deflate"]
+    if _HAS_BROTLI:
+        out.append("br")
+    if _HAS_ZSTD:
+        out.append("zstd")
+    return tuple(out)
+
+
+def accept_encoding(preferred: Sequence[str]) -> str:
+    """
+    `preferred` codings this process can decode, in order; "identity" when none are left.
+    """
+    available = available_encodings()
+    offered = [e for e in (p.strip().lower() for p in preferred) if e in available]
+    return ", ".join(dict.fromkeys(offered)) or "identity"
+
+
+def accept(msgpack: bool) -> str:
+    if msgpack and HAS_MSGPACK:
+        return f"{MSGPACK_TYPES[0]}, application/json;q=0.9"
+    return "application/json"
+
+
+def _json_loads() -> Callable[[Any], Any]:
+    if HAS_ORJSON:
+        import orjson
+
+        return orjson.loads
+    return json.loads
+
+
+json_loads = _json_loads()
+
+
+def decode_body(body: bytes, content_type: str) -> Tuple[Any, str]:
+    """
+    Returns (object, format) with format "msgpack" or "json". Raises ValueError on undecodable bodies.
+    """
+    media = content_type.split(";", 1)[0].strip().lower()
+    if media in MSGPACK_TYPES:
+        if not HAS_MSGPACK:
+            raise ValueError(f"{media} response but msgpack is not installed")
+        import msgpack
+
+        return msgpack.unpackb(body, raw=False), "msgpack"
+    return json_loads(body), "json"
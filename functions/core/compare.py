@@ -0,0 +1,158 @@
+# functions/core/compare.py
+"""
+Multi-query comparison: run several queries at once and compare their recommended skills.
+
+This module provides:
+- `CompareRun`: one comparison in progress: the request sent per query, per-query job handles
+  (`functions.core.jobs.Job`) and the responses/errors collected from them (`collect()`, `done`,
+  `cancel()`)
+- `Comparison` / `compare_responses()`: queries x skills membership and rank matrices (numpy)
+  over the union of recommended `skill_id`s, with `overlap()` (shared skill counts) and
+  `jaccard()` matrices computed as matrix products
+- `overlap_frame()` / `ranked_frame()`: DataFrames for the overlap matrix and the side-by-side
+  ranked lists (one rank column per query, skills found by most queries first)
+- `shared_skill_ids()`: skills recommended for every one of a set of queries
+
+Notes:
+- numpy / pandas are imported on first use, like the other table builders.
+- Ranks count distinct skills: a skill repeated within one response keeps its first position.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
+@dataclass
+class CompareRun:
+    queries: List[str]
+    requests: Dict[str, Any] = field(default_factory=dict)  # query -> request sent (`RecommendRequest`)
+    jobs: Dict[str, Any] = field(default_factory=dict)  # query -> pending Job
+    responses: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def done(self) -> bool:
+        return not self.jobs
+
+    def collect(self) -> List[str]:
+        """
+        Move finished jobs into `responses` / `errors`. Returns the queries answered by this call.
+        """
+        answered = []
+        for query, job in list(self.jobs.items()):
+            if not job.done:
+                continue
+            del self.jobs[query]
+            if job.cancelled:
+                self.errors[query] = "cancelled"
+            elif job.error is not None:
+                self.errors[query] = str(job.error)
+            else:
+                self.responses[query] = job.result
+                answered.append(query)
+        return answered
+
+    def cancel(self) -> None:
+        for job in self.jobs.values():
+            job.cancel()
+        self.collect()
+
+
+def _skills(resp: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return list(((resp or {}).get("payload") or {}).get("recommended_skills") or [])
+
+
+@dataclass
+class Comparison:
+    queries: List[str]
+    skill_ids: List[str]  # union over all queries, in first-seen order
+    names: List[str]  # skill_name per skill_id
+    ranks: "np.ndarray"  # float (queries x skills), 1-based rank, NaN where absent
+
+    @property
+    def membership(self) -> "np.ndarray":
+        import numpy as np
+
+        return ~np.isnan(self.ranks)
+
+    def overlap(self) -> "np.ndarray":
+        """
+        (queries x queries) number of skills recommended for both queries.
+        """
+        m = self.membership.astype("int64")
+        return m @ m.T
+
+    def jaccard(self) -> "np.ndarray":
+        import numpy as np
+
+        inter = self.overlap().astype(float)
+        sizes = np.diag(inter)
+        union = sizes[:, None] + sizes[None, :] - inter
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(union > 0, inter / union, 0.0)
+
+
+def compare_responses(responses: Dict[str, Dict[str, Any]]) -> Comparison:
+    import numpy as np
+
+    queries = list(responses)
+    # distinct ids per query, first occurrence kept (rank among distinct skills)
+    per_query = [list(dict.fromkeys(str(s.get("skill_id", "")).strip() for s in _skills(responses[q]))) for q in queries]
+    names: Dict[str, str] = {}
+    for q in queries:
+        for s in _skills(responses[q]):
+            names.setdefault(str(s.get("skill_id", "")).strip(), str(s.get("skill_name", "")))
+    names.pop("", None)
+    skill_ids = list(names)
+    position = {skill_id: j for j, skill_id in enumerate(skill_ids)}
+
+    ranks = np.full((len(queries), len(skill_ids)), np.nan)
+    for i, ids in enumerate(per_query):
+        cols = np.array([position[s] for s in ids if s], dtype="int64")
+        ranks[i, cols] = np.arange(1, len(cols) + 1, dtype=float)
+    return Comparison(queries=queries, skill_ids=skill_ids, names=[names[s] for s in skill_ids], ranks=ranks)
+
+
+def overlap_frame(cmp: Comparison, metric: str = "jaccard") -> "pd.DataFrame":
+    """
+    (queries x queries) Jaccard similarity (`metric="jaccard"`) or shared skill counts ("count").
+    """
+    import pandas as pd
+
+    values = cmp.jaccard() if metric == "jaccard" else cmp.overlap()
+    return pd.DataFrame(values, index=cmp.queries, columns=cmp.queries)
+
+
+def ranked_frame(cmp: Comparison, min_queries: int = 1) -> "pd.DataFrame":
+    """
+    One row per skill: name, id, number of queries recommending it, and its rank per query
+    (empty where absent). Sorted by that number (desc), then mean rank.
+    """
+    import numpy as np
+    import pandas as pd
+
+    found = cmp.membership.sum(axis=0)
+    # every skill is ranked by at least one query, so no column is all-NaN
+    mean_rank = np.nanmean(cmp.ranks, axis=0) if cmp.queries else np.zeros(len(cmp.skill_ids))
+    df = pd.DataFrame({"skill_name": cmp.names, "skill_id": cmp.skill_ids, "queries": found, "mean_rank": mean_rank})
+    for i, q in enumerate(cmp.queries):
+        df[q] = pd.array(cmp.ranks[i], dtype="Int64")  # NaN -> <NA>
+    df = df[df["queries"] >= int(min_queries)]
+    return df.sort_values(["queries", "mean_rank", "skill_name"], ascending=[False, True, True], kind="stable").reset_index(drop=True)
+
+
+def shared_skill_ids(cmp: Comparison, queries: Sequence[str] = ()) -> List[str]:
+    """
+    skill_ids recommended for every one of `queries` (default: all compared queries).
+    """
+    rows = [cmp.queries.index(q) for q in queries] if queries else list(range(len(cmp.queries)))
+    if not rows:
+        return []
+    mask = cmp.membership[rows].all(axis=0)
+    return [s for s, keep in zip(cmp.skill_ids, mask) if keep]
@@ -1,27 +1,56 @@
 # functions/core/export.py
 """
-Export utilities for selected skills (CSV/XLSX).
+Export utilities for selected skills (CSV/XLSX/Parquet/JSON Lines).
 
 This module converts selected skill objects (dicts) into a normalized tabular shape,
-then exports as bytes for Streamlit download buttons.
+then exports as bytes for Streamlit download buttons, or streams it to files for large
+selections and batch jobs.
 
 Key behaviors:
 - `build_export_rows()` enriches each selected skill with `query` and `generation_cache_id`
   for traceability, and formats `evidence` via `evidence_to_export(mode=...)`.
+- `build_export_frame()` is the columnar equivalent of `build_export_rows()` + `_to_df()`: it
+  builds the export DataFrame straight from the skill dicts with column-wise operations and
+  produces byte-identical CSV/XLSX output.
 - `_to_df()` enforces a stable column order defined by `EXPORT_COLUMNS` (missing columns
   are created as None), ensuring consistent output schemas across runs.
 - `export_csv_bytes()` returns UTF-8 encoded CSV bytes.
 - `export_xlsx_bytes()` writes a single-sheet XLSX ("selected_skills") and returns bytes.
+- Both exporters accept either export rows or an export DataFrame.
+
+Streaming writers:
+- `iter_csv_chunks()` / `write_csv()` encode CSV `chunk_rows` rows at a time (same bytes as
+  `export_csv_bytes()`), and `write_xlsx()` uses openpyxl write-only mode, so neither holds a
+  second full copy of the file in memory. Both accept rows, a DataFrame, or an iterable of
+  DataFrame chunks (e.g. one per batch query) and write to a path or binary file object.
+- `export_csv_file()` / `export_xlsx_file()` write into a spooled temp file (spilling to disk
+  past `SPOOL_MAX_BYTES` while the file is built) and return its bytes, for lazy Streamlit
+  downloads (`st.download_button` accepts bytes / `BytesIO`, not file objects).
+
+Columnar formats:
+- `write_parquet()` / `write_jsonl()` (plus `export_*_bytes()` / `export_*_file()`) keep
+  `evidence` as a native list of strings; build their input with `evidence_mode="list"`
+  (string evidence is wrapped as a one-item list). Parquet uses the fixed `parquet_schema()`
+  (`relevance_score` float64, everything else string) and writes one row group per chunk.
+- Parquet is written with `pyarrow` (a requirement, which Streamlit needs as well); like pandas it
+  is imported on first use rather than at startup.
+- pandas is imported when an export is first built, and openpyxl only when XLSX is written, so
+  importing this module stays cheap on cold start.
 """
 
 from __future__ import annotations
 
+import json
+import tempfile
+from contextlib import contextmanager
 from io import BytesIO
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Union
 
-import pandas as pd
+from functions.utils.text import evidence_series_to_export, evidence_to_export, evidence_to_list, safe_str, safe_str_series
 
-from functions.utils.text import evidence_to_export, safe_str
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 EXPORT_COLUMNS = [
@@ -39,6 +68,9 @@ EXPORT_COLUMNS = [
     "generation_cache_id",
 ]
 
+XLSX_SHEET_NAME = "selected_skills"
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
 
 def build_export_rows(
     selected_skills: List[Dict[str, Any]],
@@ -66,8 +98,39 @@ def build_export_rows(
     return rows
 
 
-def _to_df(rows: List[Dict[str, Any]]) -> pd.DataFrame:
-    df = pd.DataFrame(rows)
+_SKILL_COLUMNS = [c for c in EXPORT_COLUMNS if c not in ("query", "generation_cache_id")]
+
+
+def build_export_frame(
+    selected_skills: List[Dict[str, Any]],
+    query: str,
+    generation_cache_id: str,
+    evidence_mode: str = "pipe",
+) -> pd.DataFrame:
+    import pandas as pd
+
+    raw = pd.DataFrame(list(selected_skills), columns=_SKILL_COLUMNS, dtype=object)
+    df = pd.DataFrame(index=raw.index)
+    for c in _SKILL_COLUMNS:
+        if c == "relevance_score":
+            # same dtype inference as DataFrame(rows) on the raw values
+            df[c] = raw[c].infer_objects()
+        elif c == "evidence":
+            df[c] = evidence_series_to_export(raw[c], mode=evidence_mode)
+        else:
+            df[c] = safe_str_series(raw[c])
+    df["query"] = safe_str(query)
+    df["generation_cache_id"] = safe_str(generation_cache_id)
+    return df[EXPORT_COLUMNS]
+
+
+ExportData = Union[List[Dict[str, Any]], "pd.DataFrame"]
+
+
+def _to_df(rows: ExportData) -> pd.DataFrame:
+    import pandas as pd
+
+    df = rows.copy() if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
     # enforce column order (missing columns get created)
     for c in EXPORT_COLUMNS:
         if c not in df.columns:
@@ -76,14 +139,172 @@ def _to_df(rows: List[Dict[str, Any]]) -> pd.DataFrame:
     return df
 
 
-def export_csv_bytes(rows: List[Dict[str, Any]]) -> bytes:
+def export_csv_bytes(rows: ExportData) -> bytes:
     df = _to_df(rows)
     return df.to_csv(index=False).encode("utf-8")
 
 
-def export_xlsx_bytes(rows: List[Dict[str, Any]]) -> bytes:
+def export_xlsx_bytes(rows: ExportData) -> bytes:
+    import pandas as pd
+
     df = _to_df(rows)
     bio = BytesIO()
     with pd.ExcelWriter(bio, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="selected_skills")
-    return bio.getvalue()
\ No newline at end of file
+        df.to_excel(writer, index=False, sheet_name=XLSX_SHEET_NAME)
+    return bio.getvalue()
+
+
+StreamData = Union[ExportData, Iterable["pd.DataFrame"]]
+Destination = Union[str, Path, IO[bytes]]
+
+
+def _iter_frames(data: StreamData, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    import pandas as pd
+
+    if isinstance(data, (list, pd.DataFrame)):
+        df = _to_df(data)
+        if df.empty:
+            yield df
+        for start in range(0, len(df), max(1, chunk_rows)):
+            yield df.iloc[start : start + chunk_rows]
+        return
+    empty = True
+    for frame in data:
+        empty = False
+        yield _to_df(frame)
+    if empty:
+        yield _to_df([])
+
+
+@contextmanager
+def _open_dest(dest: Destination) -> Iterator[IO[bytes]]:
+    if isinstance(dest, (str, Path)):
+        with open(dest, "wb") as f:
+            yield f
+    else:
+        yield dest
+
+
+def iter_csv_chunks(data: StreamData, chunk_rows: int = 5000) -> Iterator[bytes]:
+    header = True
+    for frame in _iter_frames(data, chunk_rows):
+        if frame.empty and not header:
+            continue
+        yield frame.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+
+
+def write_csv(data: StreamData, dest: Destination, chunk_rows: int = 5000) -> None:
+    with _open_dest(dest) as f:
+        for chunk in iter_csv_chunks(data, chunk_rows=chunk_rows):
+            f.write(chunk)
+
+
+def write_xlsx(data: StreamData, dest: Destination, chunk_rows: int = 5000) -> None:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(XLSX_SHEET_NAME)
+    ws.append(EXPORT_COLUMNS)
+    for frame in _iter_frames(data, chunk_rows):
+        values = frame.astype(object).where(frame.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            ws.append(row)
+    with _open_dest(dest) as f:
+        wb.save(f)
+
+
+def _spooled(writer, data: StreamData) -> bytes:
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as f:
+        writer(data, f)
+        f.seek(0)
+        return f.read()
+
+
+def export_csv_file(data: StreamData) -> bytes:
+    return _spooled(write_csv, data)
+
+
+def export_xlsx_file(data: StreamData) -> bytes:
+    return _spooled(write_xlsx, data)
+
+
+def _records(frame: pd.DataFrame) -> Iterator[Dict[str, Any]]:
+    values = frame.astype(object).where(frame.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        rec = dict(zip(EXPORT_COLUMNS, row))
+        ev = rec["evidence"]
+        rec["evidence"] = ev if isinstance(ev, list) else evidence_to_list(ev)
+        yield rec
+
+
+def iter_jsonl_chunks(data: StreamData, chunk_rows: int = 5000) -> Iterator[bytes]:
+    for frame in _iter_frames(data, chunk_rows):
+        lines = [json.dumps(rec, ensure_ascii=False) + "\n" for rec in _records(frame)]
+        if lines:
+            yield "".join(lines).encode("utf-8")
+
+
+def write_jsonl(data: StreamData, dest: Destination, chunk_rows: int = 5000) -> None:
+    with _open_dest(dest) as f:
+        for chunk in iter_jsonl_chunks(data, chunk_rows=chunk_rows):
+            f.write(chunk)
+
+
+def _pyarrow():
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    return pa, pq
+
+
+def parquet_schema():
+    pa, _ = _pyarrow()
+    fields = []
+    for c in EXPORT_COLUMNS:
+        if c == "relevance_score":
+            fields.append(pa.field(c, pa.float64()))
+        elif c == "evidence":
+            fields.append(pa.field(c, pa.list_(pa.string())))
+        else:
+            fields.append(pa.field(c, pa.string()))
+    return pa.schema(fields)
+
+
+def write_parquet(data: StreamData, dest: Destination, chunk_rows: int = 50000) -> None:
+    import pandas as pd
+
+    pa, pq = _pyarrow()
+    schema = parquet_schema()
+    with _open_dest(dest) as f:
+        with pq.ParquetWriter(f, schema, compression="zstd") as writer:
+            for frame in _iter_frames(data, chunk_rows):
+                records = list(_records(frame))
+                columns = {c: [r[c] for r in records] for c in EXPORT_COLUMNS}
+                columns["relevance_score"] = pd.to_numeric(pd.Series(columns["relevance_score"], dtype=object), errors="coerce")
+                for c in EXPORT_COLUMNS:
+                    if c not in ("relevance_score", "evidence"):
+                        columns[c] = [None if v is None else safe_str(v) for v in columns[c]]
+                writer.write_table(pa.table(columns, schema=schema))
+
+
+def _to_bytes(writer, data: StreamData) -> bytes:
+    bio = BytesIO()
+    writer(data, bio)
+    return bio.getvalue()
+
+
+def export_jsonl_bytes(data: StreamData) -> bytes:
+    return _to_bytes(write_jsonl, data)
+
+
+def export_parquet_bytes(data: StreamData) -> bytes:
+    return _to_bytes(write_parquet, data)
+
+
+def export_jsonl_file(data: StreamData) -> bytes:
+    return _spooled(write_jsonl, data)
+
+
+def export_parquet_file(data: StreamData) -> bytes:
+    return _spooled(write_parquet, data)
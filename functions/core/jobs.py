@@ -0,0 +1,194 @@
+# functions/core/jobs.py
+"""
+Process-wide background job queue for long-running searches.
+
+A recommendation can take 30-120 s to generate. Running it inside the Streamlit script run freezes
+the page, and any widget interaction reruns the script and abandons the call. Instead, the script
+submits the search here, keeps the returned `Job` handle in the session state, and polls it.
+
+This module provides:
+- `JobCancelled`: raised by `fn` to stop early once its job is cancelled
+- `Job`: handle for one submitted call: status, streamed partial items (`report()` / `partial`),
+  result or error, timings, `cancel()` and `on_cancel()`
+- `JobQueue`: a bounded thread pool; `submit(fn, key, label, context)` runs `fn(job)` on a worker
+  and returns the job immediately; `stats()` counts jobs by status for the diagnostics panel
+
+Job lifecycle:
+- "queued" -> "running" -> "done" | "failed"; "cancelled" from either of the first two.
+- `fn` reports progress by calling `job.report(item)` (e.g. for each streamed skill).
+- `cancel()` detaches the job: a queued job never starts, a running one is marked cancelled at once
+  and its result is discarded. The call itself runs to completion on its worker, so whatever it
+  writes on the way (response cache, store) still serves the next identical search, and other
+  sessions coalesced onto the same backend call are unaffected. `fn` may check `job.cancelled` to
+  stop early when that is safe (nobody else needs the result) by raising `JobCancelled`, which
+  frees the worker, and register `job.on_cancel(callback)` to be told at once (e.g. to leave a
+  queue it is blocked in).
+
+Notes:
+- Create one queue per process (e.g. via `st.cache_resource`); its workers serve every session.
+- Workers have no Streamlit script context: `fn` must not call `st.*`. The script renders
+  `job.partial` / `job.result` on its next run.
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from functions.core.metrics import REGISTRY
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_ids = itertools.count(1)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, key: Hashable = None, label: str = "", context: Optional[Dict[str, Any]] = None):
+        self.id = next(_ids)
+        self.key = key  # identifies equivalent submissions (e.g. the request's cache key)
+        self.label = label
+        self.context: Dict[str, Any] = dict(context or {})  # caller data needed to apply the result
+        self.status = QUEUED
+        self.partial: List[Any] = []
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._future: Optional[Future] = None
+        self._on_cancel: List[Callable[[], Any]] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.status == CANCELLED
+
+    def report(self, item: Any) -> None:
+        if not self.cancelled:
+            self.partial.append(item)
+
+    def elapsed_seconds(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.submitted_at
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the job is done (or `timeout` elapses). Returns `done`.
+        """
+        self._finished.wait(timeout)
+        return self.done
+
+    def on_cancel(self, callback: Callable[[], Any]) -> None:
+        """
+        Call `callback()` when the job is cancelled (at once if it already is).
+        """
+        with self._lock:
+            if not self.cancelled:
+                self._on_cancel.append(callback)
+                return
+        callback()
+
+    def cancel(self) -> bool:
+        """
+        Returns False if the job had already finished.
+        """
+        with self._lock:
+            if self.done:
+                return False
+            self.status = CANCELLED
+            self.finished_at = time.monotonic()
+            callbacks, self._on_cancel = self._on_cancel, []
+        if self._future is not None:
+            self._future.cancel()  # only succeeds while still queued
+        for callback in callbacks:
+            callback()
+        self._finished.set()
+        REGISTRY.inc("jobs_cancelled_total")
+        return True
+
+    def _start(self) -> bool:
+        with self._lock:
+            if self.status != QUEUED:
+                return False
+            self.status = RUNNING
+            self.started_at = time.monotonic()
+        REGISTRY.observe("job_queue_wait_ms", (self.started_at - self.submitted_at) * 1000)
+        return True
+
+    def _finish(self, status: str, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self.status != RUNNING:
+                return  # cancelled while running: keep the cancellation, drop the outcome
+            self.result, self.error, self.status = result, error, status
+            self.finished_at = time.monotonic()
+        REGISTRY.observe("job_run_ms", (self.finished_at - self.started_at) * 1000)
+        self._finished.set()
+
+
+class JobQueue:
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max(1, int(max_workers))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._active: Dict[int, Job] = {}
+        self.finished: Dict[str, int] = {DONE: 0, FAILED: 0, CANCELLED: 0}
+
+    def submit(
+        self,
+        fn: Callable[[Job], Any],
+        key: Hashable = None,
+        label: str = "",
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Job:
+        job = Job(key=key, label=label, context=context)
+        with self._lock:
+            self._active[job.id] = job
+        job._future = self._executor.submit(self._run, job, fn)
+        job._future.add_done_callback(lambda _f: self._retire(job))
+        REGISTRY.inc("jobs_submitted_total")
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]) -> None:
+        if not job._start():
+            return
+        try:
+            result = fn(job)
+        except Exception as e:
+            job._finish(FAILED, error=e)
+        else:
+            job._finish(DONE, result=result)
+
+    def _retire(self, job: Job) -> None:
+        with self._lock:
+            if self._active.pop(job.id, None) is not None and job.status in self.finished:
+                self.finished[job.status] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            active = list(self._active.values())
+            out = dict(self.finished)
+        out[QUEUED] = sum(1 for j in active if j.status == QUEUED)
+        out[RUNNING] = sum(1 for j in active if j.status == RUNNING)
+        out["detached"] = sum(1 for j in active if j.status == CANCELLED)  # cancelled, call still finishing
+        out["workers"] = self.max_workers
+        return out
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,185 @@
+# functions/core/json_view.py
+"""
+Paginated, filtered views of large JSON documents for the raw-response viewer.
+
+This module provides:
+- `parse_path()`: compile a JSONPath-style expression into steps
+- `select()`: evaluate an expression against a document -> list of (path, value) matches
+- `preview()`: copy of a value with long arrays/strings/objects collapsed into short placeholders
+- `JsonPage` / `page_view()`: one page of matches, already collapsed, plus paging totals
+
+Supported expression syntax (a pragmatic JSONPath subset):
+- `$` root (optional), `.key` / `['key']` / `["key"]` child, `[3]` / `[-1]` index,
+  `[1:10]` / `[:5]` slice, `[*]` / `.*` every child, `..key` recursive descent
+- e.g. `$.payload.recommended_skills[*].skill_name`, `$..evidence`, `meta`
+
+Notes:
+- Only the selected page is materialized and collapsed, so the UI ships a bounded amount of JSON
+  to the browser regardless of document size.
+- A single match that is an array is paginated over its items; otherwise the matches are.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Tuple
+
+
+class PathError(ValueError):
+    pass
+
+
+_TOKEN = re.compile(
+    r"""
+    \.\.(?P<desc>[A-Za-z_][\w-]*|\*)           # ..key / ..*
+    | \.(?P<key>[A-Za-z_][\w-]*|\*)            # .key / .*
+    | \[\s*(?P<q>'[^']*'|"[^"]*")\s*\]         # ['key'] / ["key"]
+    | \[\s*(?P<slice>-?\d*\s*:\s*-?\d*)\s*\]   # [a:b]
+    | \[\s*(?P<idx>-?\d+)\s*\]                 # [n]
+    | \[\s*\*\s*\]                             # [*]
+    """,
+    re.VERBOSE,
+)
+
+Step = Tuple[str, Any]  # ("key", name) | ("index", n) | ("slice", slice) | ("all", None) | ("desc", name)
+
+
+def parse_path(expr: str) -> List[Step]:
+    text = (expr or "").strip()
+    if text.startswith("$"):
+        text = text[1:]
+    elif text and not text.startswith((".", "[")):
+        text = "." + text
+    steps: List[Step] = []
+    pos = 0
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if m is None:
+            raise PathError(f"Cannot parse path at {text[pos:]!r}")
+        if m.group("desc") is not None:
+            steps.append(("desc", m.group("desc")))
+        elif m.group("key") is not None:
+            key = m.group("key")
+            steps.append(("all", None) if key == "*" else ("key", key))
+        elif m.group("q") is not None:
+            steps.append(("key", m.group("q")[1:-1]))
+        elif m.group("slice") is not None:
+            start, _, stop = m.group("slice").partition(":")
+            steps.append(("slice", slice(int(start) if start.strip() else None, int(stop) if stop.strip() else None)))
+        elif m.group("idx") is not None:
+            steps.append(("index", int(m.group("idx"))))
+        else:
+            steps.append(("all", None))
+        pos = m.end()
+    return steps
+
+
+def _children(path: str, value: Any) -> Iterator[Tuple[str, Any]]:
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield f"{path}.{k}", v
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            yield f"{path}[{i}]", v
+
+
+def _descendants(path: str, value: Any) -> Iterator[Tuple[str, Any]]:
+    for child in _children(path, value):
+        yield child
+        yield from _descendants(*child)
+
+
+def _self_and_descendants(path: str, value: Any) -> Iterator[Tuple[str, Any]]:
+    yield path, value
+    yield from _descendants(path, value)
+
+
+def _apply(step: Step, path: str, value: Any) -> Iterator[Tuple[str, Any]]:
+    kind, arg = step
+    if kind == "key":
+        if isinstance(value, dict) and arg in value:
+            yield f"{path}.{arg}", value[arg]
+    elif kind == "index":
+        if isinstance(value, list) and -len(value) <= arg < len(value):
+            yield f"{path}[{arg % len(value)}]", value[arg]
+    elif kind == "slice":
+        if isinstance(value, list):
+            for i in range(*arg.indices(len(value))):
+                yield f"{path}[{i}]", value[i]
+    elif kind == "all":
+        yield from _children(path, value)
+    elif kind == "desc":
+        if arg == "*":
+            yield from _descendants(path, value)
+            return
+        for p, v in _self_and_descendants(path, value):
+            if isinstance(v, dict) and arg in v:
+                yield f"{p}.{arg}", v[arg]
+
+
+def select(doc: Any, expr: str) -> List[Tuple[str, Any]]:
+    matches: List[Tuple[str, Any]] = [("$", doc)]
+    for step in parse_path(expr):
+        matches = [m for path, value in matches for m in _apply(step, path, value)]
+    return matches
+
+
+def preview(value: Any, max_items: int = 20, max_chars: int = 500, max_depth: int = 6) -> Any:
+    """
+    Bounded copy of `value`: arrays/objects beyond `max_items` entries, strings beyond `max_chars`
+    and nesting beyond `max_depth` are cut, with a placeholder saying what was left out.
+    """
+    if isinstance(value, str):
+        if len(value) > max_chars:
+            return value[:max_chars] + f"… (+{len(value) - max_chars} chars)"
+        return value
+    if not isinstance(value, (list, dict)):
+        return value
+    if max_depth <= 0:
+        kind = "items" if isinstance(value, list) else "keys"
+        return f"… {len(value)} {kind} (filter deeper to see them)"
+    if isinstance(value, list):
+        out: Any = [preview(v, max_items, max_chars, max_depth - 1) for v in value[:max_items]]
+        if len(value) > max_items:
+            out.append(f"… {len(value) - max_items} more items (use a [start:end] filter)")
+        return out
+    out = {}
+    for i, (k, v) in enumerate(value.items()):
+        if i >= max_items:
+            out["…"] = f"{len(value) - max_items} more keys"
+            break
+        out[k] = preview(v, max_items, max_chars, max_depth - 1)
+    return out
+
+
+@dataclass
+class JsonPage:
+    value: Any  # collapsed JSON for the visible page
+    total: int  # items (single-array match) or matches being paged over
+    page: int  # 0-based, clamped to the valid range
+    pages: int
+
+
+def page_view(doc: Any, expr: str = "$", page: int = 0, page_size: int = 20, **preview_kw: Any) -> JsonPage:
+    """
+    Raises `PathError` for expressions that cannot be parsed.
+    """
+    matches = select(doc, expr)
+    if len(matches) == 1 and isinstance(matches[0][1], list):
+        items: List[Any] = matches[0][1]
+        keyed = False
+    elif len(matches) == 1:
+        return JsonPage(value=preview(matches[0][1], max_items=page_size, **preview_kw), total=1, page=0, pages=1)
+    else:
+        items = matches
+        keyed = True
+    size = max(1, int(page_size))
+    pages = max(1, -(-len(items) // size))
+    page = min(max(0, int(page)), pages - 1)
+    chunk = items[page * size : (page + 1) * size]
+    if keyed:
+        value = {path: preview(v, **preview_kw) for path, v in chunk}
+    else:
+        value = [preview(v, **preview_kw) for v in chunk]
+    return JsonPage(value=value, total=len(items), page=page, pages=pages)
@@ -0,0 +1,161 @@
+# functions/core/metrics.py
+"""
+Per-instance latency metrics (histograms) with a Prometheus-style text dump.
+
+This module provides:
+- `Histogram`: cumulative Prometheus buckets plus a bounded reservoir of recent samples for
+  p50/p95/p99
+- `MetricsRegistry`: thread-safe, name-keyed histograms and counters; `timer()` context manager
+- `REGISTRY`: the process-wide registry used by the API client, UI and exports
+- `render_prometheus()`: text exposition format (histograms as `_bucket`/`_sum`/`_count`, plus
+  `quantile` gauges computed from the reservoir)
+- `start_metrics_server()`: optional `/metrics` HTTP endpoint on a side port
+
+Conventions:
+- Durations are recorded in milliseconds; metric names end in `_ms`.
+- Percentiles describe the most recent `reservoir_size` samples, not the whole process lifetime.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, Iterator, List, Optional, Sequence
+
+
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile of already-sorted values (q in [0, 100]); NaN when empty.
+    """
+    if not sorted_values:
+        return math.nan
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return float(sorted_values[min(rank, len(sorted_values)) - 1])
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS_MS, reservoir_size: int = 2048):
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent: Deque[float] = deque(maxlen=reservoir_size)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def summary(self) -> Dict[str, float]:
+        values = sorted(self.recent)
+        return {
+            "count": self.count,
+            "mean": (self.sum / self.count) if self.count else math.nan,
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self, reservoir_size: int = 2048):
+        self.reservoir_size = reservoir_size
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, float] = {}
+
+    def observe(self, name: str, value_ms: float) -> None:
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram(reservoir_size=self.reservoir_size)
+            hist.observe(float(value_ms))
+
+    def inc(self, name: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0.0) + amount
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - t0) * 1000)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: h.summary() for name, h in sorted(self._histograms.items())}
+
+    def counters(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def render_prometheus(self, prefix: str = "skills_gui_") -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, h in sorted(self._histograms.items()):
+                metric = prefix + name
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.bucket_counts):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{le="{bound:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {h.count}')
+                lines.append(f"{metric}_sum {h.sum:.3f}")
+                lines.append(f"{metric}_count {h.count}")
+                summary = h.summary()
+                for q in ("p50", "p95", "p99"):
+                    if not math.isnan(summary[q]):
+                        lines.append(f'{metric}_recent{{quantile="0.{q[1:]}"}} {summary[q]:.3f}')
+            for name, value in sorted(self._counters.items()):
+                metric = prefix + name
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def start_metrics_server(port: int, registry: Optional[MetricsRegistry] = None, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serves `GET /metrics` from a daemon thread. Returns the server (call `shutdown()` to stop).
+    """
+    reg = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = reg.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
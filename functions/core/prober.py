@@ -0,0 +1,198 @@
+# functions/core/prober.py
+"""
+Background keep-warm and health prober for the backend API.
+
+This module provides:
+- `in_business_hours()`: whether a local datetime falls inside a "HH:MM-HH:MM" window on given weekdays
+- `ProbeResult`: one health check (backend URL, wall-clock time, ok, latency, message)
+- `HealthProber`: a daemon thread that calls `health_check()` for every backend on a schedule,
+  keeps a bounded latency history, and summarizes backend status for the UI
+
+Schedule:
+- During business hours every backend is probed each `interval_seconds`; outside them only every
+  `off_hours_interval_seconds` (never when 0), so idle nights/weekends don't keep instances alive.
+- `request_probe()` wakes the thread for an immediate probe regardless of schedule (used when a
+  new session starts and the last probe is stale, or when the user asks to warm the backend).
+- Probes go through `health_check()`, so their results also feed the routing circuit breakers.
+
+Status (`status()`), per backend:
+- "unknown": not probed yet; "down": last probe failed; "cold": last probe succeeded but took
+  longer than `slow_ms` (likely a cold start); "warm": last probe succeeded quickly.
+
+Notes:
+- Create one prober per process (e.g. via `st.cache_resource`), not per Streamlit session.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from functions.core.api_client import health_check
+from functions.core.metrics import percentile
+from functions.utils.config import ApiConfig, ProberConfig
+
+
+def _parse_window(window: str) -> Tuple[int, int]:
+    start, _, end = window.partition("-")
+
+    def _minutes(hhmm: str) -> int:
+        h, _, m = hhmm.strip().partition(":")
+        return int(h) * 60 + int(m or 0)
+
+    return _minutes(start), _minutes(end)
+
+
+def in_business_hours(now: datetime, window: str, days: Sequence[int]) -> bool:
+    """
+    True if `now` (local time) is on one of `days` (Monday = 0) and inside `window`.
+    Windows that wrap past midnight (e.g. "20:00-02:00") count from the start day.
+    """
+    start, end = _parse_window(window)
+    minute = now.hour * 60 + now.minute
+    if start <= end:
+        return now.weekday() in days and start <= minute < end
+    if minute >= start:
+        return now.weekday() in days
+    return minute < end and (now.weekday() - 1) % 7 in days
+
+
+def _zone(name: str):
+    try:
+        from zoneinfo import ZoneInfo
+
+        return ZoneInfo(name)
+    except Exception:
+        return timezone.utc  # unknown zone / no tz database: fall back to UTC
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    url: str
+    at: float  # epoch seconds
+    ok: bool
+    latency_ms: float
+    message: str
+
+
+class HealthProber:
+    def __init__(
+        self,
+        api: ApiConfig,
+        cfg: ProberConfig,
+        check: Callable[[ApiConfig, str], Tuple[bool, str]] = health_check,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.api = api
+        self.cfg = cfg
+        self._check = check
+        self._clock = clock
+        self._tz = _zone(cfg.timezone)
+        self._lock = threading.Lock()
+        self._history: Deque[ProbeResult] = deque(maxlen=max(1, cfg.history_size))
+        self._last: Dict[str, ProbeResult] = {}
+        self._last_probe_at: Optional[float] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "HealthProber":
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="health-prober", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def request_probe(self) -> None:
+        self._wake.set()
+
+    def request_probe_if_stale(self) -> bool:
+        """
+        Wakes the prober when the last probe is older than `stale_seconds`; returns True if it did.
+        """
+        with self._lock:
+            last = self._last_probe_at
+        if last is not None and self._clock() - last < self.cfg.stale_seconds:
+            return False
+        self.request_probe()
+        return True
+
+    def due(self) -> bool:
+        with self._lock:
+            last = self._last_probe_at
+        now = self._clock()
+        local = datetime.fromtimestamp(now, self._tz)
+        if in_business_hours(local, self.cfg.business_hours, self.cfg.business_days):
+            interval = self.cfg.interval_seconds
+        else:
+            interval = self.cfg.off_hours_interval_seconds
+            if interval <= 0:
+                return False
+        return last is None or now - last >= interval
+
+    def probe_once(self) -> List[ProbeResult]:
+        results = []
+        for backend in self.api.backend_list():
+            t0 = time.perf_counter()
+            ok, msg = self._check(self.api, backend.url)
+            results.append(ProbeResult(backend.url, self._clock(), ok, (time.perf_counter() - t0) * 1000, msg))
+        with self._lock:
+            for r in results:
+                self._history.append(r)
+                self._last[r.url] = r
+            self._last_probe_at = self._clock()
+        return results
+
+    def _run(self) -> None:
+        forced = False
+        while not self._stop.is_set():
+            if forced or self.due():
+                try:
+                    self.probe_once()
+                except Exception:
+                    pass  # never let a probe bug kill the thread
+            # re-evaluate at least once a minute so schedule boundaries are noticed
+            forced = self._wake.wait(timeout=min(60.0, max(1.0, self.cfg.interval_seconds)))
+            self._wake.clear()
+
+    def history(self, url: Optional[str] = None) -> List[ProbeResult]:
+        with self._lock:
+            return [r for r in self._history if url is None or r.url == url]
+
+    def status(self) -> List[Dict[str, object]]:
+        rows = []
+        for backend in self.api.backend_list():
+            hist = self.history(backend.url)
+            last = hist[-1] if hist else None
+            latencies = sorted(r.latency_ms for r in hist if r.ok)
+            if last is None:
+                state = "unknown"
+            elif not last.ok:
+                state = "down"
+            elif last.latency_ms > self.cfg.slow_ms:
+                state = "cold"
+            else:
+                state = "warm"
+            rows.append(
+                {
+                    "url": backend.url,
+                    "state": state,
+                    "last_checked": last.at if last else None,
+                    "last_latency_ms": last.latency_ms if last else None,
+                    "message": last.message if last else "",
+                    "p50_ms": percentile(latencies, 50),
+                    "p95_ms": percentile(latencies, 95),
+                    "probes": len(hist),
+                }
+            )
+        return rows
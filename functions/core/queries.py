@@ -0,0 +1,155 @@
+# functions/core/queries.py
+"""
+Query canonicalization and near-duplicate matching for recommendation requests.
+
+Users type the same question in many ways ("Data Scientist", "data scientist ", "data-scientist").
+Canonicalizing the query makes those share one cache/store/single-flight key; the similarity index
+additionally maps close variants ("data scientists") onto a recent request whose response is still
+available, so it can be served without a backend call.
+
+This module provides:
+- `canonical_query()`: Unicode (NFKC) + case folding, punctuation -> space, collapsed whitespace
+- `query_words()`: the canonical query's words with plural endings folded ("analysts" -> "analyst")
+- `QueryMatch`: a recent request similar to the one asked (request, canonical query, similarity)
+- `QueryIndex`: bounded, thread-safe character n-gram index over recent requests;
+  `add()` registers a request whose response is cached, `match()` finds the most similar one
+
+Matching rules:
+- Only requests with identical non-query parameters (top_k, flags, ...) are candidates.
+- Similarity is the Dice coefficient of padded character trigrams of the canonical queries;
+  candidates below `threshold` are ignored. Identical canonical queries are not "matches": the
+  cache key already covers them.
+- A candidate must also have the same words (`query_words()`, in any order). Trigram similarity
+  alone is high for different roles that share most letters ("senior" vs "junior data engineer",
+  "software engineer ii" vs "iii"); only plural / word-order variants are treated as the same query.
+
+Notes:
+- Letters and combining marks of every script are kept (Thai vowel signs, accents), as are `+` and
+  `#` so "C++" and "C#" stay distinct from "C".
+"""
+
+from __future__ import annotations
+
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+
+from functions.core.api_client import RecommendRequest
+
+
+_KEEP = frozenset("+#")
+_Key = Tuple[RecommendRequest, str]  # (request with an empty query, canonical query)
+
+
+def canonical_query(query: str) -> str:
+    text = unicodedata.normalize("NFKC", str(query or "")).casefold()
+    chars = [ch if ch in _KEEP or unicodedata.category(ch)[0] in "LMN" else " " for ch in text]
+    return " ".join("".join(chars).split())
+
+
+def _fold_word(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("ches", "shes", "sses", "xes", "zes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def query_words(query: str) -> FrozenSet[str]:
+    return frozenset(_fold_word(w) for w in canonical_query(query).split())
+
+
+def _grams(text: str, n: int) -> FrozenSet[str]:
+    padded = f" {text} "
+    if len(padded) <= n:
+        return frozenset([padded])
+    return frozenset(padded[i : i + n] for i in range(len(padded) - n + 1))
+
+
+@dataclass
+class QueryMatch:
+    request: RecommendRequest
+    query: str
+    similarity: float
+
+
+class QueryIndex:
+    def __init__(self, max_queries: int = 2000, n: int = 3):
+        self.max_queries = int(max_queries)
+        self.n = int(n)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[_Key, Tuple[RecommendRequest, FrozenSet[str], FrozenSet[str]]]" = OrderedDict()  # (request, grams, words)
+        self._postings: Dict[str, Set[_Key]] = {}
+        self.lookups = 0
+        self.matches = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _key(self, req: RecommendRequest) -> _Key:
+        return replace(req, query=""), canonical_query(req.query)
+
+    def _drop(self, key: _Key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry[1]:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def add(self, req: RecommendRequest) -> None:
+        key = self._key(req)
+        if not key[1]:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            grams = _grams(key[1], self.n)
+            self._entries[key] = (req, grams, query_words(key[1]))
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(key)
+            while self.max_queries > 0 and len(self._entries) > self.max_queries:
+                self._drop(next(iter(self._entries)))
+
+    def discard(self, req: RecommendRequest) -> None:
+        with self._lock:
+            self._drop(self._key(req))
+
+    def match(self, req: RecommendRequest, threshold: float) -> Optional[QueryMatch]:
+        params, canon = self._key(req)
+        if not canon:
+            return None
+        grams = _grams(canon, self.n)
+        words = query_words(canon)
+        shared: Dict[_Key, int] = {}
+        with self._lock:
+            self.lookups += 1
+            for gram in grams:
+                for key in self._postings.get(gram, ()):
+                    if key[0] == params and key[1] != canon:
+                        shared[key] = shared.get(key, 0) + 1
+            best: Optional[QueryMatch] = None
+            for key, n_shared in shared.items():
+                other_req, other_grams, other_words = self._entries[key]
+                similarity = 2.0 * n_shared / (len(grams) + len(other_grams))
+                if similarity < threshold or other_words != words:
+                    continue
+                if best is None or similarity > best.similarity:
+                    best = QueryMatch(request=other_req, query=key[1], similarity=similarity)
+            if best is not None:
+                self.matches += 1
+                self._entries.move_to_end((params, best.query))
+        return best
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"queries": len(self._entries), "lookups": self.lookups, "matches": self.matches}
@@ -0,0 +1,77 @@
+# functions/core/results.py
+"""
+Results table helpers for the Streamlit UI.
+
+This module provides:
+- `results_df()`: tabular view of skill objects (id, name, score, source, text preview)
+- `ResultsView`: processed results for one response (display DataFrame, selectbox label -> skill_id,
+  skill_id -> skill object)
+- `results_view()`: `ResultsView` memoized on `AppState`, rebuilt only when a new response arrives
+  (`AppState.results_version`) or the display settings change
+
+Notes:
+- Streamlit reruns the whole script on every interaction; memoizing here keeps slider/selectbox
+  interactions from re-truncating texts and re-scanning results each time.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from functions.core.state import AppState
+from functions.utils.text import safe_str_series, truncate_series
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+DISPLAY_COLUMNS = ["skill_name", "relevance_score", "source", "preview"]
+_SOURCE_COLUMNS = ["skill_id", "skill_name", "relevance_score", "source", "skill_text"]
+
+
+def results_df(results: List[Dict[str, Any]], preview_chars: int) -> pd.DataFrame:
+    """
+    Built column-wise (no per-row dicts); missing names/ids/sources become "" and missing scores 0.0.
+    """
+    import pandas as pd
+
+    raw = pd.DataFrame(list(results), columns=_SOURCE_COLUMNS, dtype=object)
+    score = raw["relevance_score"]
+    return pd.DataFrame(
+        {
+            "skill_id": safe_str_series(raw["skill_id"]),
+            "skill_name": safe_str_series(raw["skill_name"]),
+            "relevance_score": score.where(score.notna(), 0.0).infer_objects(),
+            "source": safe_str_series(raw["source"]),
+            "preview": truncate_series(raw["skill_text"], preview_chars),
+        }
+    )
+
+
+@dataclass(frozen=True)
+class ResultsView:
+    df: pd.DataFrame  # first `max_rows` results, all columns
+    options: Dict[str, str]  # selectbox label -> skill_id
+    by_id: Dict[str, Dict[str, Any]]  # str(skill_id) -> skill object (first occurrence wins)
+
+
+def build_results_view(results: List[Dict[str, Any]], preview_chars: int, max_rows: int) -> ResultsView:
+    df = results_df(results, preview_chars).head(max_rows)
+    options: Dict[str, str] = {}
+    if not df.empty:
+        for skill_id, name, source, score in zip(df["skill_id"], df["skill_name"], df["source"], df["relevance_score"]):
+            options[f"{name} ({source}, {score:.2f})"] = skill_id
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for s in results:
+        by_id.setdefault(str(s.get("skill_id")), s)
+    return ResultsView(df=df, options=options, by_id=by_id)
+
+
+def results_view(state: AppState, preview_chars: int, max_rows: int) -> ResultsView:
+    # id/len guard against in-place edits of `last_results` that bypassed `set_results()`
+    key = (state.results_version, id(state.last_results), len(state.last_results), preview_chars, max_rows)
+    if state.results_view is None or state.results_view_key != key:
+        state.results_view = build_results_view(state.last_results, preview_chars, max_rows)
+        state.results_view_key = key
+    return state.results_view
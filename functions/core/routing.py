@@ -0,0 +1,282 @@
+# functions/core/routing.py
+"""
+Multi-backend routing for the API client: weighted choice, failover, hedging, circuit breakers.
+
+This module provides:
+- `CircuitBreaker`: closed -> open after N consecutive failures -> half-open after a cool-down
+- `Router`: per-`ApiConfig` backend set with a breaker and recent latencies per backend
+- `get_router()`: process-wide `Router` for an `ApiConfig` (shared by all sessions and threads)
+- `backend_status()`: per-backend state for display in the UI
+
+Routing rules (`Router.send()`):
+- A backend is picked at random by weight among backends whose breaker is not open; if every
+  breaker is open, untried backends are still used (failing open beats failing every request).
+- A network error, 429 or 5xx (after the client's own retries) fails over to another backend.
+- With `ApiConfig.hedge` and at least two backends, if the first backend has not answered
+  (response headers) within the hedge delay, a second request goes to another backend. Hedging
+  never targets the backend already working on the request: with a single backend `hedge` is
+  ignored, since a second copy would only double that backend's load.
+- The first good response wins; the loser is closed as soon as its headers arrive, so its
+  connection is dropped instead of being read and returned to the pool. Until then it keeps a
+  worker (and its backend keeps generating), so no new hedge is sent while
+  `ApiConfig.hedge_max_losers` losers are still running (counted as `api_hedges_skipped_total`).
+- The hedge delay is `max(hedge_min_delay_ms, p<hedge_percentile> of recent latencies)`, or
+  `hedge_initial_delay_ms` until `MIN_HEDGE_SAMPLES` successful requests have been seen.
+- Request outcomes and `health_check()` results both feed the breakers; a passing health check
+  closes an open breaker immediately.
+
+Notes:
+- A single backend is sent inline on the caller's thread, exactly as before.
+- Counters `api_hedges_total`, `api_hedge_wins_total`, `api_hedges_skipped_total` and
+  `api_failovers_total` are recorded in `functions.core.metrics.REGISTRY`.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import replace
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from functions.core.metrics import REGISTRY, percentile
+from functions.utils.config import ApiConfig, BackendConfig
+
+
+MIN_HEDGE_SAMPLES = 20
+LATENCY_WINDOW = 200
+FAILURE_STATUS_CODES = frozenset({429}) | frozenset(range(500, 600))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, reset_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_seconds = float(reset_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if self._clock() - self.opened_at >= self.reset_seconds:
+            return HALF_OPEN
+        return OPEN
+
+    def available(self) -> bool:
+        return self.state != OPEN
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            # a failed half-open trial re-opens immediately
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = self._clock()
+
+
+class _Backend:
+    def __init__(self, cfg: BackendConfig, api: ApiConfig, clock: Callable[[], float]):
+        self.url = cfg.url
+        self.weight = max(0.0, float(cfg.weight))
+        self.api = api if api.base_url == cfg.url else replace(api, base_url=cfg.url)
+        self.breaker = CircuitBreaker(api.breaker_failure_threshold, api.breaker_reset_seconds, clock)
+        self.latencies_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+
+Send = Callable[[ApiConfig], Any]  # returns a `requests.Response`
+
+
+def _close(resp: Any) -> None:
+    close = getattr(resp, "close", None)
+    if close is not None:
+        close()
+
+
+class Router:
+    def __init__(self, api: ApiConfig, clock: Callable[[], float] = time.monotonic, rng: Optional[random.Random] = None):
+        self.api = api
+        self.backends = [_Backend(b, api, clock) for b in api.backend_list()]
+        self._by_url = {b.url: b for b in self.backends}
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._recent_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._losers = 0  # abandoned attempts still running
+
+    @property
+    def hedging(self) -> bool:
+        return self.api.hedge and len(self.backends) > 1
+
+    def _abandon(self, fut: Future) -> None:
+        with self._lock:
+            self._losers += 1
+
+        def _discard(f: Future) -> None:
+            with self._lock:
+                self._losers -= 1
+            if not f.cancelled() and f.exception() is None:
+                _close(f.result()[1])
+
+        fut.add_done_callback(_discard)
+
+    def _may_hedge(self) -> bool:
+        with self._lock:
+            return self._losers < max(0, self.api.hedge_max_losers)
+
+    def choose(self, exclude: Set[str] = frozenset()) -> Optional[_Backend]:
+        untried = [b for b in self.backends if b.url not in exclude]
+        candidates = [b for b in untried if b.breaker.available()] or untried
+        if not candidates:
+            return None
+        weights = [b.weight for b in candidates]
+        with self._lock:
+            if sum(weights) <= 0:
+                return self._rng.choice(candidates)
+            return self._rng.choices(candidates, weights=weights)[0]
+
+    def hedge_delay_seconds(self) -> float:
+        with self._lock:
+            recent = sorted(self._recent_ms)
+        if len(recent) < MIN_HEDGE_SAMPLES:
+            return self.api.hedge_initial_delay_ms / 1000
+        return max(self.api.hedge_min_delay_ms, percentile(recent, self.api.hedge_percentile)) / 1000
+
+    def record_health(self, url: str, ok: bool) -> None:
+        backend = self._by_url.get(url)
+        if backend is None:
+            return
+        if ok:
+            backend.breaker.record_success()
+        else:
+            backend.breaker.record_failure()
+
+    def _attempt(self, backend: _Backend, send: Send) -> Tuple[ApiConfig, Any]:
+        t0 = time.perf_counter()
+        try:
+            resp = send(backend.api)
+        except Exception:
+            backend.breaker.record_failure()
+            raise
+        if getattr(resp, "status_code", 200) in FAILURE_STATUS_CODES:
+            backend.breaker.record_failure()
+        else:
+            backend.breaker.record_success()
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            backend.latencies_ms.append(elapsed_ms)
+            with self._lock:
+                self._recent_ms.append(elapsed_ms)
+        return backend.api, resp
+
+    def send(self, send: Send) -> Tuple[ApiConfig, Any]:
+        """
+        Runs `send(backend_api)` against one or more backends; returns (backend_api, response).
+        Raises the last error if every backend failed with an exception.
+        """
+        if len(self.backends) == 1:
+            return self._attempt(self.backends[0], send)
+
+        tried: Set[str] = set()
+        pending: Dict[Future, _Backend] = {}
+        hedge: Optional[Future] = None
+        last_exc: Optional[BaseException] = None
+        last_failed: Optional[Tuple[ApiConfig, Any]] = None
+
+        def _start(backend: _Backend) -> Future:
+            tried.add(backend.url)
+            fut = _EXECUTOR.submit(self._attempt, backend, send)
+            pending[fut] = backend
+            return fut
+
+        _start(self.choose())
+        hedged = False
+        while pending:
+            timeout = self.hedge_delay_seconds() if self.hedging and not hedged else None
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                backend = self.choose(tried)
+                if backend is None:
+                    continue
+                if not self._may_hedge():
+                    REGISTRY.inc("api_hedges_skipped_total")
+                    continue
+                REGISTRY.inc("api_hedges_total")
+                hedge = _start(backend)
+                continue
+            for fut in done:
+                del pending[fut]
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    last_exc = e
+                    continue
+                if getattr(result[1], "status_code", 200) in FAILURE_STATUS_CODES:
+                    if last_failed is not None:
+                        _close(last_failed[1])
+                    last_failed = result
+                    continue
+                for loser in pending:
+                    self._abandon(loser)
+                if last_failed is not None:
+                    _close(last_failed[1])
+                if fut is hedge:
+                    REGISTRY.inc("api_hedge_wins_total")
+                return result
+            if not pending:
+                # every in-flight attempt failed: fail over to a backend not tried yet
+                backend = self.choose(tried)
+                if backend is not None:
+                    REGISTRY.inc("api_failovers_total")
+                    _start(backend)
+        if last_failed is not None:
+            return last_failed
+        assert last_exc is not None
+        raise last_exc
+
+
+# hedged/failover attempts run here; losers keep a worker until their headers arrive (bounded
+# per router by `hedge_max_losers`)
+_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="api-route")
+_ROUTERS: Dict[ApiConfig, Router] = {}
+_ROUTERS_LOCK = threading.Lock()
+
+
+def get_router(api: ApiConfig) -> Router:
+    with _ROUTERS_LOCK:
+        router = _ROUTERS.get(api)
+        if router is None:
+            router = _ROUTERS[api] = Router(api)
+        return router
+
+
+def backend_status(api: ApiConfig) -> List[Dict[str, Any]]:
+    rows = []
+    for b in get_router(api).backends:
+        recent = sorted(b.latencies_ms)
+        rows.append(
+            {
+                "url": b.url,
+                "weight": b.weight,
+                "state": b.breaker.state,
+                "consecutive_failures": b.breaker.failures,
+                "p50_ms": percentile(recent, 50),
+                "p95_ms": percentile(recent, 95),
+            }
+        )
+    return rows
@@ -0,0 +1,201 @@
+# functions/core/selections.py
+"""
+Persistent, named skill selections (SQLite), shared by every session of the instance.
+
+A curator's selection otherwise lives only in their Streamlit session and is lost when the tab,
+session or instance goes away. Saving it under a name keeps it on disk, where any session can
+reload it (the app also puts the name in the page URL, so a reload or a shared link restores it).
+
+This module provides:
+- `SelectionStore`: SQLite-backed store of named selections with
+  - `save()`: replace a selection's skills in one transaction
+  - `add()` / `remove()`: bulk upsert / delete of skills in a selection (write-through edits)
+  - `load()` / `page()` / `count()`: skills in the selected order, whole or one page at a time
+  - `names()` / `delete()` / `stats()`
+
+Key behaviors:
+- Items are kept in the order of `functions.core.state.selected_list()` (`relevance_score` desc,
+  then `skill_name`, then `skill_id`) by a covering index, so `page()` reads one page without
+  sorting or loading the rest of the selection.
+- Each skill is stored as zlib-compressed JSON, deduped by `skill_id` within a selection.
+- One connection guarded by a lock is shared by all threads; WAL mode lets several processes
+  share the same file. Edits from different sessions to the same selection are applied item by
+  item (last write wins per skill); a session sees the others' edits when it reloads.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List
+
+from functions.core.state import skill_score
+from functions.utils.config import SelectionsConfig
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS selections (
+    name TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS selection_items (
+    selection TEXT NOT NULL,
+    skill_id TEXT NOT NULL,
+    score REAL NOT NULL,
+    name_key TEXT NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (selection, skill_id)
+);
+CREATE INDEX IF NOT EXISTS idx_selection_items_order
+    ON selection_items (selection, score DESC, name_key, skill_id);
+"""
+
+
+def _skill_id(skill: Dict[str, Any]) -> str:
+    return str(skill.get("skill_id", "") or "").strip()
+
+
+def _row(name: str, skill: Dict[str, Any]):
+    body = zlib.compress(json.dumps(skill, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    return (name, _skill_id(skill), skill_score(skill), str(skill.get("skill_name", "")).lower(), body)
+
+
+def _decode(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+_ORDER = "ORDER BY score DESC, name_key, skill_id"
+
+
+class SelectionStore:
+    def __init__(self, path: str, clock: Callable[[], float] = time.time):
+        self.path = str(path)
+        self._clock = clock
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_config(cls, cfg: SelectionsConfig) -> "SelectionStore":
+        return cls(path=cfg.resolved_path())
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _touch(self, name: str) -> None:
+        now = self._clock()
+        self._conn.execute(
+            "INSERT INTO selections (name, created_at, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET updated_at = excluded.updated_at",
+            (name, now, now),
+        )
+
+    def save(self, name: str, skills: Iterable[Dict[str, Any]]) -> int:
+        """
+        Replace the skills of selection `name` (created if missing). Returns the number stored.
+        """
+        rows = {r[1]: r for r in (_row(name, s) for s in skills) if r[1]}
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._touch(name)
+                self._conn.execute("DELETE FROM selection_items WHERE selection = ?", (name,))
+                self._conn.executemany("INSERT INTO selection_items VALUES (?, ?, ?, ?, ?)", list(rows.values()))
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return len(rows)
+
+    def add(self, name: str, skills: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add or update skills in selection `name` (created if missing). Returns the number written.
+        """
+        rows = {r[1]: r for r in (_row(name, s) for s in skills) if r[1]}
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._touch(name)
+                self._conn.executemany("INSERT OR REPLACE INTO selection_items VALUES (?, ?, ?, ?, ?)", list(rows.values()))
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return len(rows)
+
+    def remove(self, name: str, skill_ids: Iterable[str]) -> int:
+        ids = [(name, i) for i in dict.fromkeys(str(s).strip() for s in skill_ids) if i]
+        if not ids:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            before = self._conn.total_changes
+            self._conn.executemany("DELETE FROM selection_items WHERE selection = ? AND skill_id = ?", ids)
+            removed = self._conn.total_changes - before
+            if removed:
+                self._touch(name)
+            self._conn.execute("COMMIT")
+        return removed
+
+    def delete(self, name: str) -> bool:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM selection_items WHERE selection = ?", (name,))
+            deleted = self._conn.execute("DELETE FROM selections WHERE name = ?", (name,)).rowcount
+            self._conn.execute("COMMIT")
+        return deleted > 0
+
+    def exists(self, name: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM selections WHERE name = ?", (name,)).fetchone() is not None
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM selection_items WHERE selection = ?", (name,)).fetchone()[0])
+
+    def page(self, name: str, page: int, page_size: int) -> List[Dict[str, Any]]:
+        """
+        Skills of 0-based `page` (of `page_size` skills) in the selected order.
+        """
+        size = max(1, int(page_size))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT body FROM selection_items WHERE selection = ? {_ORDER} LIMIT ? OFFSET ?",
+                (name, size, max(0, int(page)) * size),
+            ).fetchall()
+        return [_decode(r[0]) for r in rows]
+
+    def load(self, name: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT body FROM selection_items WHERE selection = ? {_ORDER}", (name,)).fetchall()
+        return [_decode(r[0]) for r in rows]
+
+    def names(self) -> List[Dict[str, Any]]:
+        """
+        Saved selections, most recently updated first: {"name", "skills", "updated_at"}.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.name, COUNT(i.skill_id), s.updated_at FROM selections s "
+                "LEFT JOIN selection_items i ON i.selection = s.name "
+                "GROUP BY s.name ORDER BY s.updated_at DESC, s.name"
+            ).fetchall()
+        return [{"name": n, "skills": int(c), "updated_at": u} for n, c, u in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            selections = self._conn.execute("SELECT COUNT(*) FROM selections").fetchone()[0]
+            items = self._conn.execute("SELECT COUNT(*) FROM selection_items").fetchone()[0]
+        return {"selections": int(selections), "skills": int(items)}
@@ -0,0 +1,81 @@
+# functions/core/sessions.py
+"""
+Process-wide registry of live Streamlit sessions, for idle-session eviction and memory stats.
+
+This module provides:
+- `SessionRegistry`: `touch()` each `AppState` on every script run; `sweep()` compacts sessions
+  idle longer than `idle_seconds` (via `functions.core.state.compact_state()`); `stats()` sums
+  per-session footprints for the diagnostics panel
+
+Notes:
+- States are held through weak references, so sessions Streamlit has discarded disappear on
+  their own; the registry never keeps a session alive.
+- `sweep()` is cheap to call on every run: it does real work at most once per `sweep_interval`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Tuple
+
+from functions.core.state import AppState, compact_state, has_raw_response
+
+
+class SessionRegistry:
+    def __init__(self, idle_seconds: float = 1800.0, sweep_interval: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.idle_seconds = float(idle_seconds)
+        self.sweep_interval = float(sweep_interval)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # id(state) -> (weakref to state, last seen)
+        self._sessions: Dict[int, Tuple["weakref.ref[AppState]", float]] = {}
+        self._last_sweep = clock()
+        self.evictions = 0
+
+    def touch(self, state: AppState) -> None:
+        key = id(state)
+        with self._lock:
+            entry = self._sessions.get(key)
+            ref = entry[0] if entry is not None and entry[0]() is state else weakref.ref(state, lambda _r, k=key: self._forget(k))
+            self._sessions[key] = (ref, self._clock())
+
+    def _forget(self, key: int) -> None:
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is not None and entry[0]() is None:
+                del self._sessions[key]
+
+    def _live(self) -> List[Tuple[AppState, float]]:
+        with self._lock:
+            entries = list(self._sessions.values())
+        return [(s, seen) for s, seen in ((ref(), seen) for ref, seen in entries) if s is not None]
+
+    def sweep(self, force: bool = False) -> int:
+        now = self._clock()
+        with self._lock:
+            if not force and now - self._last_sweep < self.sweep_interval:
+                return 0
+            self._last_sweep = now
+        if self.idle_seconds <= 0:
+            return 0
+        evicted = 0
+        for state, seen in self._live():
+            if now - seen >= self.idle_seconds and (state.last_results or has_raw_response(state) or state.superset_resp):
+                compact_state(state)
+                evicted += 1
+        with self._lock:
+            self.evictions += evicted
+        return evicted
+
+    def stats(self) -> Dict[str, int]:
+        live = self._live()
+        return {
+            "sessions": len(live),
+            "result_rows": sum(len(s.last_results) for s, _ in live),
+            "selected": sum(len(s.selected) for s, _ in live),
+            "raw_bytes_in_memory": sum(len(s.raw_blob or b"") for s, _ in live),
+            "raw_spilled": sum(1 for s, _ in live if s.raw_spill is not None),
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,111 @@
+# functions/core/singleflight.py
+"""
+Single-flight coalescing of identical in-flight requests.
+
+This module provides:
+- `SingleFlight`: runs at most one call per key at a time; concurrent callers with the same key
+  wait for the leader and receive the same result (or the same exception)
+- `coalesce()`: wrap a `RecommendRequest -> response` fetch function so identical requests
+  (same `cache_key()`) share one outstanding backend call
+
+Notes:
+- Only *concurrent* duplicates are coalesced; once the leader finishes the key is released.
+  Pair with `ResponseCache` to also serve later repeats.
+- Like cached responses, a shared result is the same object for every waiter: treat it as read-only.
+- A leader that gives up (raises) fails its waiters too; `waiters()` lets it check first. A waiter
+  passing `cancelled` stops waiting (raising `JobCancelled`) once it is true, and no longer counts.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from functions.core.api_client import RecommendRequest
+from functions.core.cache import cache_key
+from functions.core.jobs import JobCancelled
+
+
+_POLL_SECONDS = 0.05  # how often a waiter checks `cancelled`
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def waiters(self, key: Hashable) -> int:
+        """
+        Callers currently waiting on the in-flight call for `key` (besides its leader).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            return call.waiters if call is not None else 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], cancelled: Optional[Callable[[], bool]] = None) -> Tuple[Any, bool]:
+        """
+        Returns (result, shared) where `shared` is True when this caller waited on another caller's call.
+        A waiter raises `JobCancelled` as soon as `cancelled()` is true.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            try:
+                while not call.done.wait(_POLL_SECONDS if cancelled is not None else None):
+                    if cancelled():
+                        raise JobCancelled()
+            finally:
+                with self._lock:
+                    call.waiters -= 1
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+def coalesce(
+    flight: SingleFlight,
+    fetch: Callable[[RecommendRequest], Dict[str, Any]],
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> Callable[[RecommendRequest], Dict[str, Any]]:
+    def _fetch(req: RecommendRequest) -> Dict[str, Any]:
+        return flight.do(cache_key(req), lambda: fetch(req), cancelled)[0]
+
+    return _fetch
@@ -0,0 +1,191 @@
+# functions/core/skill_index.py
+"""
+Process-wide, incrementally updated BM25 index over every skill this instance has received.
+
+Skills returned by the API are indexed as responses arrive (deduped by `skill_id`), so a user who
+wants to re-find a skill seen earlier (by anyone on this instance) can look it up locally in
+milliseconds instead of paying for another RAG call.
+
+This module provides:
+- `tokenize()`: lowercase word tokens (Unicode-aware), minus a few English stopwords
+- `IndexHit`: one lookup result (skill dict, BM25 score)
+- `SkillIndex`: thread-safe inverted index with `add()` / `add_response()` / `search()` /
+  `get()` / `stats()`
+- `lookup_selection()`: copy of a looked-up skill fit to add to a selection
+
+Indexing:
+- Indexed text per skill: `skill_name` (counted `NAME_BOOST` times), `skill_id`, `source`,
+  `skill_text`, the three criteria texts and `evidence`.
+- Re-adding a known `skill_id` replaces its postings when the text changed, else only refreshes
+  its recency. Beyond `max_skills` the least recently seen skill is dropped.
+- Stored skills keep only catalog fields and evidence (no per-query score or reasoning). Their
+  catalog texts are interned in `functions.core.skillstore.SKILLS` (one reference per indexed
+  skill, dropped when it leaves the index), so the index and the sessions showing a skill share
+  one copy.
+- Evidence is whatever the last response that returned the skill quoted, for that response's
+  query: `lookup_selection()` drops it (and marks the skill as looked up) before it is selected.
+
+Scoring:
+- Okapi BM25 (`k1`, `b`) with the non-negative IDF `log(1 + (N - df + 0.5) / (df + 0.5))`.
+- A query equal to a known `skill_id` returns that skill first.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from functions.core.skillstore import CATALOG_FIELDS, SKILLS
+
+
+NAME_BOOST = 3
+LOOKUP_REASONING = "Added from the skill lookup; not ranked for this query."
+STORED_FIELDS = ("skill_id",) + CATALOG_FIELDS + ("evidence",)
+_TEXT_FIELDS = ("skill_id", "source", "skill_text", "Foundational_Criteria", "Intermediate_Criteria", "Advanced_Criteria")
+_WORD = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset("a an and are as at be by for from in into is it of on or that the to with".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _WORD.findall(str(text or "").lower()) if t not in _STOPWORDS]
+
+
+def _skill_terms(skill: Dict[str, Any]) -> Counter:
+    terms: Counter = Counter()
+    name_terms = tokenize(skill.get("skill_name", ""))
+    for _ in range(NAME_BOOST):
+        terms.update(name_terms)
+    for field in _TEXT_FIELDS:
+        terms.update(tokenize(skill.get(field, "")))
+    evidence = skill.get("evidence")
+    if isinstance(evidence, (list, tuple)):
+        for item in evidence:
+            terms.update(tokenize(item))
+    elif evidence:
+        terms.update(tokenize(evidence))
+    return terms
+
+
+@dataclass
+class IndexHit:
+    skill: Dict[str, Any]
+    score: float
+
+
+def lookup_selection(skill: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Catalog fields of an indexed skill, without the evidence of whichever query last returned it.
+    It has no `relevance_score` (sorts last) and its `reasoning` says it came from the lookup.
+    """
+    out = {k: skill[k] for k in ("skill_id",) + CATALOG_FIELDS if k in skill}
+    out["reasoning"] = LOOKUP_REASONING
+    return out
+
+
+class SkillIndex:
+    def __init__(self, max_skills: int = 50000, k1: float = 1.5, b: float = 0.75):
+        self.max_skills = int(max_skills)
+        self.k1 = float(k1)
+        self.b = float(b)
+        self._lock = threading.Lock()
+        self._docs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # skill_id -> stored skill (LRU order)
+        self._terms: Dict[str, Tuple[str, ...]] = {}  # skill_id -> distinct terms (for removal)
+        self._lengths: Dict[str, int] = {}  # skill_id -> number of indexed terms
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {skill_id: tf}
+        self._total_len = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._docs)
+
+    def _remove(self, skill_id: str) -> None:
+        if self._docs.pop(skill_id, None) is not None:
+            SKILLS.release(skill_id)
+        terms = self._terms.pop(skill_id, None)
+        if terms is None:
+            return
+        self._total_len -= self._lengths.pop(skill_id, 0)
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(skill_id, None)
+                if not posting:
+                    del self._postings[term]
+
+    def add(self, skill: Dict[str, Any]) -> bool:
+        """
+        Index one skill. Returns True when its postings were (re)built.
+        """
+        skill_id = str(skill.get("skill_id", "") or "").strip()
+        if not skill_id:
+            return False
+        stored = {k: skill[k] for k in STORED_FIELDS if k in skill}
+        stored["skill_id"] = skill_id
+        with self._lock:
+            if self._docs.get(skill_id) == stored:
+                self._docs.move_to_end(skill_id)
+                return False
+            self._remove(skill_id)
+            stored = SKILLS.intern(stored)
+            terms = _skill_terms(stored)
+            self._docs[skill_id] = stored
+            self._terms[skill_id] = tuple(terms)
+            self._lengths[skill_id] = sum(terms.values())
+            self._total_len += self._lengths[skill_id]
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[skill_id] = tf
+            while self.max_skills > 0 and len(self._docs) > self.max_skills:
+                self._remove(next(iter(self._docs)))
+                self.evictions += 1
+        return True
+
+    def add_many(self, skills: Iterable[Dict[str, Any]]) -> int:
+        return sum(1 for s in skills if isinstance(s, dict) and self.add(s))
+
+    def add_response(self, resp: Optional[Dict[str, Any]]) -> int:
+        payload = (resp or {}).get("payload") or {}
+        return self.add_many(payload.get("recommended_skills") or [])
+
+    def get(self, skill_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            doc = self._docs.get(str(skill_id).strip())
+            return dict(doc) if doc is not None else None
+
+    def search(self, query: str, k: int = 10) -> List[IndexHit]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        exact_id = str(query or "").strip()
+        with self._lock:
+            n = len(self._docs)
+            if n == 0:
+                return []
+            avgdl = max(1.0, self._total_len / n)
+            scores: Dict[str, float] = {}
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1.0 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for skill_id, tf in posting.items():
+                    norm = self.k1 * (1.0 - self.b + self.b * self._lengths[skill_id] / avgdl)
+                    scores[skill_id] = scores.get(skill_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+            ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[: max(0, int(k))]
+            hits = [IndexHit(skill=dict(self._docs[i]), score=s) for i, s in ranked]
+            if exact_id in self._docs:
+                hits = [h for h in hits if h.skill["skill_id"] != exact_id]
+                hits.insert(0, IndexHit(skill=dict(self._docs[exact_id]), score=math.inf))
+                hits = hits[: max(1, int(k))]
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "skills": len(self._docs),
+                "terms": len(self._postings),
+                "avg_terms_per_skill": round(self._total_len / len(self._docs), 1) if self._docs else 0.0,
+                "evictions": self.evictions,
+            }
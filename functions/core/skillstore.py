@@ -0,0 +1,117 @@
+# functions/core/skillstore.py
+"""
+Process-wide, reference-counted intern store for skill catalog fields.
+
+Many sessions see the same skills (same `skill_id`) for different queries. The per-query parts of
+a recommended skill (`relevance_score`, `reasoning`, `evidence`) differ, but the catalog parts
+(`skill_name`, `source`, `skill_text`, the three criteria texts) are the same and make up most of
+the bytes. This module keeps one copy of those catalog strings per `skill_id` and hands out skill
+dicts that reference the shared strings instead of holding their own.
+
+This module provides:
+- `CATALOG_FIELDS`: fields shared per `skill_id`
+- `SkillStore`: thread-safe `intern()` / `release()` with per-id reference counts and `stats()`
+- `SKILLS`: the process-wide store used by `functions.core.state`
+
+Key behaviors:
+- `intern(skill)` returns a dict equal to `skill` whose catalog values are the shared objects
+  (`skill` itself when it already uses them) and takes one reference on its `skill_id`. Skills
+  without a `skill_id` are returned unchanged.
+- If a skill arrives with different catalog values for a known id (catalog update), the new values
+  replace the old ones for later `intern()` calls; dicts already handed out keep theirs.
+- `release(skill_id)` drops one reference; an id with no references left is removed, so the store
+  only holds skills some live session (or `functions.core.skill_index.SkillIndex`) still uses.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+CATALOG_FIELDS = (
+    "skill_name",
+    "source",
+    "skill_text",
+    "Foundational_Criteria",
+    "Intermediate_Criteria",
+    "Advanced_Criteria",
+)
+
+
+def _skill_id(skill: Dict[str, Any]) -> str:
+    return str(skill.get("skill_id", "") or "").strip()
+
+
+def _text_bytes(values: Iterable[Any]) -> int:
+    return sum(len(v) for v in values if isinstance(v, str))
+
+
+class SkillStore:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # skill_id -> (catalog values, reference count)
+        self._entries: Dict[str, Tuple[Dict[str, Any], int]] = {}
+        self.interned = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def intern(self, skill: Dict[str, Any]) -> Dict[str, Any]:
+        skill_id = _skill_id(skill)
+        if not skill_id:
+            return skill
+        catalog = {k: skill[k] for k in CATALOG_FIELDS if k in skill}
+        with self._lock:
+            entry = self._entries.get(skill_id)
+            if entry is None or entry[0] != catalog:
+                refs = entry[1] if entry is not None else 0
+                entry = (catalog, refs)
+            shared = entry[0]
+            self._entries[skill_id] = (shared, entry[1] + 1)
+            self.interned += 1
+        if all(skill[k] is v for k, v in shared.items()):
+            return skill  # already backed by the shared strings (e.g. a cached response seen before)
+        out = dict(skill)
+        out.update(shared)
+        return out
+
+    def release(self, skill_id: str) -> None:
+        skill_id = str(skill_id).strip()
+        with self._lock:
+            entry = self._entries.get(skill_id)
+            if entry is None:
+                return
+            if entry[1] <= 1:
+                del self._entries[skill_id]
+            else:
+                self._entries[skill_id] = (entry[0], entry[1] - 1)
+
+    def refs(self, skill_id: str) -> int:
+        with self._lock:
+            entry = self._entries.get(str(skill_id).strip())
+            return entry[1] if entry is not None else 0
+
+    def get(self, skill_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(str(skill_id).strip())
+            return dict(entry[0]) if entry is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        `shared_bytes`: catalog text held once; `saved_bytes`: text that would otherwise be
+        duplicated across references (approximate, counts characters).
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+        shared = saved = refs = 0
+        for catalog, n in entries:
+            size = _text_bytes(catalog.values())
+            shared += size
+            saved += size * (n - 1)
+            refs += n
+        return {"skills": len(entries), "references": refs, "shared_bytes": shared, "saved_bytes": saved}
+
+
+SKILLS = SkillStore()
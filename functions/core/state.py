@@ -3,19 +3,47 @@
 UI state helpers for the Skills Recommendation Streamlit app.
 
 This module defines:
-- `AppState`: session-scoped state container (last query, last results, selected skills)
-- `add_selected()` / `remove_selected()`: mutate selected skills (deduped by skill_id)
-- `selected_list()`: return selected skills in a stable, user-friendly order
+- `AppState`: session-scoped state container (last query, last results, selected skills, the
+  handle of a search running in the background, the current multi-query comparison)
+- `set_results()`: replace the current results and invalidate memoized views of them
+- `add_selected()` / `remove_selected()` / `clear_selected()`: mutate selected skills (deduped by skill_id)
+- `add_selected_many()` / `remove_selected_many()`: bulk versions (e.g. "add all results above a score")
+- `selected_list()` / `selected_page()`: selected skills (or one page of them) in a stable,
+  user-friendly order
+- `skill_score()`: a skill's `relevance_score` as used for ordering (invalid or non-finite -> 0)
+- `set_raw_response()` / `raw_response()` / `has_raw_response()`: the last raw API response, kept
+  zlib-compressed within a per-session byte budget (spilled to a temp file beyond it)
+- `compact_state()`: drop the heavy, re-fetchable parts of an idle session
+
+Memory model:
+- Skills stored through `set_results()` / `add_selected()` are interned in the process-wide
+  `functions.core.skillstore.SKILLS`, so catalog texts are held once per skill_id across all
+  sessions. The references a session holds are released when its results are replaced, skills are
+  removed, or the `AppState` is garbage-collected.
+- Spilled raw-response files are deleted when replaced, compacted, or garbage-collected.
 
 Notes:
-- `AppState.selected` is a dict keyed by `skill_id` to ensure deduplication.
-- `selected_list()` sorts by `relevance_score` (desc), then `skill_name` (asc), then `skill_id`.
+- `AppState.selected` is a dict keyed by `skill_id` to ensure deduplication. Mutate it through the
+  helpers above (not by reassigning it) so interned references stay balanced and
+  `AppState.selected_order` stays in step.
+- The order is `relevance_score` (desc; missing or non-finite scores count as 0), then `skill_name` (asc, case-insensitive), then `skill_id`.
+  It is maintained on every mutation (bisect insert / one merge per bulk add), so reading the
+  list or a page of it never re-sorts.
 """
 
 from __future__ import annotations
 
+import json
+import math
+import os
+import tempfile
+import weakref
+import zlib
+from bisect import bisect_left, insort
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from functions.core.skillstore import SKILLS
 
 
 @dataclass
@@ -24,38 +52,239 @@ class AppState:
     generation_cache_id: str = ""
     last_results: List[Dict[str, Any]] = None  # list of skill objects
     selected: Dict[str, Dict[str, Any]] = None  # skill_id -> skill object
-    last_resp_raw: Optional[Dict[str, Any]] = None  # full API response for debug expander
+    selected_order: List[Tuple[float, str, str]] = None  # sort keys of `selected`, kept sorted (`_order_key()`)
+    selection_name: str = ""  # named selection (`functions.core.selections`) the selection is saved to
     last_resp_time_ms: Optional[float] = None  # round-trip time in ms
+    last_resp_cached: bool = False  # True when the last response was served from the response cache
+    results_version: int = 0  # bumped by `set_results()`; keys memoized views of `last_results`
+    results_view: Optional[Any] = None  # memoized `functions.core.results.ResultsView`
+    results_view_key: Optional[Tuple[Any, ...]] = None
+    superset_request: Optional[Any] = None  # fetch-once mode: request sent to the backend (`RecommendRequest`)
+    superset_resp: Optional[Dict[str, Any]] = None  # fetch-once mode: its response, sliced locally
+    derived_key: Optional[Tuple[Any, ...]] = None  # fetch-once mode: (request, min_score) last derived
+    prewarm_requested: bool = False  # a stale-backend warm-up probe was requested for this session
+    raw_blob: Optional[bytes] = None  # zlib-compressed JSON of the last raw API response
+    raw_spill: Optional[Any] = None  # `weakref.finalize` deleting the spill file, when spilled to disk
+    raw_bytes: int = 0  # uncompressed size of the last raw API response
+    result_ids: List[str] = None  # skill_ids interned for `last_results` (released on replace)
+    release_refs: Optional[Any] = None  # `weakref.finalize` releasing every interned reference
+    evicted: bool = False  # set by `compact_state()` so the UI can explain the missing results
+    job: Optional[Any] = None  # search running in the background (`functions.core.jobs.Job`)
+    similar_match: Optional[Tuple[str, str, float]] = None  # (asked, matched query, similarity) when a near-duplicate answered
+    compare: Optional[Any] = None  # multi-query comparison (`functions.core.compare.CompareRun`)
 
     def __post_init__(self) -> None:
         if self.last_results is None:
             self.last_results = []
         if self.selected is None:
             self.selected = {}
+        if self.selected_order is None:
+            self.selected_order = []
+        if self.result_ids is None:
+            self.result_ids = []
+        self.release_refs = weakref.finalize(self, _release_all, self.result_ids, self.selected)
+
+
+def _release_all(result_ids: List[str], selected: Dict[str, Dict[str, Any]]) -> None:
+    for skill_id in result_ids:
+        SKILLS.release(skill_id)
+    for skill_id in selected:
+        SKILLS.release(skill_id)
+
+
+def _skill_id(skill: Dict[str, Any]) -> str:
+    return str(skill.get("skill_id", "")).strip()
+
+
+def set_results(state: AppState, results: List[Dict[str, Any]]) -> None:
+    for skill_id in state.result_ids:
+        SKILLS.release(skill_id)
+    interned = [SKILLS.intern(s) for s in results]
+    state.result_ids[:] = [i for i in (_skill_id(s) for s in interned) if i]
+    state.last_results = interned
+    state.results_version += 1
+    state.results_view = None
+    state.results_view_key = None
+
+
+def skill_score(skill: Dict[str, Any]) -> float:
+    try:
+        score = float(skill.get("relevance_score", 0.0))
+    except Exception:
+        return 0.0
+    return score if math.isfinite(score) else 0.0  # NaN would break key equality (and SQL order)
+
+
+def _order_key(skill: Dict[str, Any]) -> Tuple[float, str, str]:
+    return (-skill_score(skill), str(skill.get("skill_name", "")).lower(), _skill_id(skill))
+
+
+def _unorder(state: AppState, skill: Dict[str, Any]) -> None:
+    key = _order_key(skill)
+    i = bisect_left(state.selected_order, key)
+    if i < len(state.selected_order) and state.selected_order[i] == key:
+        del state.selected_order[i]
 
 
 def add_selected(state: AppState, skill: Dict[str, Any]) -> None:
-    skill_id = str(skill.get("skill_id", "")).strip()
+    skill_id = _skill_id(skill)
     if not skill_id:
         return
-    state.selected[skill_id] = skill  # overwrite = dedupe
+    old = state.selected.get(skill_id)
+    if old is not None:
+        SKILLS.release(skill_id)
+        _unorder(state, old)
+    interned = SKILLS.intern(skill)
+    state.selected[skill_id] = interned  # overwrite = dedupe
+    insort(state.selected_order, _order_key(interned))
+
+
+def add_selected_many(state: AppState, skills: Iterable[Dict[str, Any]]) -> int:
+    """
+    Add (or update) many skills with one merge into the maintained order. Returns the number of
+    skills added or updated.
+    """
+    added: Dict[str, Dict[str, Any]] = {}
+    for skill in skills:
+        skill_id = _skill_id(skill)
+        if not skill_id:
+            continue
+        if skill_id in added:
+            SKILLS.release(skill_id)
+        added[skill_id] = SKILLS.intern(skill)
+    if not added:
+        return 0
+    replaced = set()
+    for skill_id in added:
+        if skill_id in state.selected:
+            SKILLS.release(skill_id)
+            replaced.add(skill_id)
+    if replaced:
+        state.selected_order[:] = [k for k in state.selected_order if k[2] not in replaced]
+    state.selected.update(added)
+    state.selected_order.extend(_order_key(s) for s in added.values())
+    state.selected_order.sort()  # timsort: one sorted run plus the new keys
+    return len(added)
 
 
 def remove_selected(state: AppState, skill_id: str) -> None:
     skill_id = str(skill_id).strip()
     if not skill_id:
         return
-    state.selected.pop(skill_id, None)
+    old = state.selected.pop(skill_id, None)
+    if old is not None:
+        SKILLS.release(skill_id)
+        _unorder(state, old)
+
+
+def remove_selected_many(state: AppState, skill_ids: Iterable[str]) -> int:
+    removed = set()
+    for skill_id in skill_ids:
+        skill_id = str(skill_id).strip()
+        if skill_id and state.selected.pop(skill_id, None) is not None:
+            SKILLS.release(skill_id)
+            removed.add(skill_id)
+    if removed:
+        state.selected_order[:] = [k for k in state.selected_order if k[2] not in removed]
+    return len(removed)
+
+
+def clear_selected(state: AppState) -> None:
+    for skill_id in state.selected:
+        SKILLS.release(skill_id)
+    state.selected.clear()
+    state.selected_order.clear()
 
 
 def selected_list(state: AppState) -> List[Dict[str, Any]]:
-    # stable order: by relevance_score desc then skill_name
-    def _score(x: Dict[str, Any]) -> float:
+    selected = state.selected
+    return [selected[key[2]] for key in state.selected_order]
+
+
+def selected_page(state: AppState, page: int, page_size: int) -> List[Dict[str, Any]]:
+    """
+    Skills of 0-based `page` (of `page_size` skills) in the selected order.
+    """
+    start = max(0, int(page)) * max(1, int(page_size))
+    selected = state.selected
+    return [selected[key[2]] for key in state.selected_order[start : start + max(1, int(page_size))]]
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _drop_raw(state: AppState) -> None:
+    if state.raw_spill is not None:
+        state.raw_spill()  # deletes the file (once)
+    state.raw_blob = None
+    state.raw_spill = None
+    state.raw_bytes = 0
+
+
+def set_raw_response(
+    state: AppState,
+    resp: Optional[Dict[str, Any]],
+    max_bytes: int = 1024 * 1024,
+    spill_dir: Optional[str] = None,
+) -> None:
+    """
+    Keep `resp` zlib-compressed in memory if it fits `max_bytes`, else in a file under `spill_dir`.
+    Without a `spill_dir` (or if writing fails), an oversized response is not kept.
+    """
+    _drop_raw(state)
+    if resp is None:
+        return
+    data = json.dumps(resp, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    blob = zlib.compress(data, 6)
+    state.raw_bytes = len(data)
+    if len(blob) <= max_bytes:
+        state.raw_blob = blob
+        return
+    if spill_dir is None:
+        return
+    try:
+        os.makedirs(spill_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="raw_", suffix=".json.z", dir=spill_dir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+    except OSError:
+        return
+    state.raw_spill = weakref.finalize(state, _unlink, path)
+
+
+def has_raw_response(state: AppState) -> bool:
+    return state.raw_blob is not None or state.raw_spill is not None
+
+
+def raw_response(state: AppState) -> Optional[Dict[str, Any]]:
+    blob = state.raw_blob
+    if blob is None and state.raw_spill is not None and state.raw_spill.alive:
+        path = state.raw_spill.peek()[2][0]
         try:
-            return float(x.get("relevance_score", 0.0))
-        except Exception:
-            return 0.0
+            with open(path, "rb") as f:
+                blob = f.read()
+        except OSError:
+            return None
+    if blob is None:
+        return None
+    return json.loads(zlib.decompress(blob))
+
 
-    items = list(state.selected.values())
-    items.sort(key=lambda x: (-_score(x), str(x.get("skill_name", "")).lower(), str(x.get("skill_id", ""))))
-    return items
\ No newline at end of file
+def compact_state(state: AppState) -> None:
+    """
+    Free an idle session: results, memoized views, raw response, fetch-once superset and a finished
+    comparison are dropped (a new search restores them); the query and selected skills are kept.
+    """
+    had_results = bool(state.last_results) or has_raw_response(state)
+    set_results(state, [])
+    _drop_raw(state)
+    state.superset_request = None
+    state.superset_resp = None
+    state.derived_key = None
+    if state.compare is not None and state.compare.done:
+        state.compare = None
+    state.evicted = state.evicted or had_results
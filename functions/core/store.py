@@ -0,0 +1,214 @@
+# functions/core/store.py
+"""
+Persistent on-disk response store (SQLite) for `/v1/recommend-skills` responses.
+
+Survives process/instance restarts so warm instances, batch runs and exports can reuse
+previously generated results instead of paying for a new generation.
+
+This module provides:
+- `ResponseStore`: SQLite-backed store keyed by request hash (`cache_key()`) with a secondary
+  index on `meta.generation_cache_id`
+- `through_store()`: wrap a fetch function so responses are read from / written to the store
+- `warm_cache()`: preload the most recently used stored responses into a `ResponseCache`
+
+Key behaviors:
+- Responses are stored as zlib-compressed JSON; `size` is the compressed size.
+- Eviction is least-recently-accessed once `max_entries` or `max_bytes` is exceeded, and entries
+  older than `max_age_seconds` (if > 0) are treated as misses and pruned.
+- One connection guarded by a lock is shared by all threads; WAL mode lets several processes
+  share the same file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from functions.core.api_client import RecommendRequest
+from functions.core.cache import ResponseCache, cache_key
+from functions.utils.config import StoreConfig
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    request_hash TEXT PRIMARY KEY,
+    request_key TEXT NOT NULL,
+    generation_cache_id TEXT,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_generation_cache_id ON responses (generation_cache_id);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access);
+"""
+
+
+def request_hash(req: RecommendRequest) -> str:
+    return hashlib.sha256(cache_key(req).encode("utf-8")).hexdigest()
+
+
+def _generation_cache_id(resp: Dict[str, Any]) -> str:
+    meta = resp.get("meta") if isinstance(resp, dict) else None
+    return (meta.get("generation_cache_id") or "") if isinstance(meta, dict) else ""
+
+
+def _encode(resp: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(resp, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class ResponseStore:
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 5000,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age_seconds: float = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = str(path)
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.max_age_seconds = float(max_age_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, cfg: StoreConfig) -> "ResponseStore":
+        return cls(
+            path=cfg.resolved_path(),
+            max_entries=cfg.max_entries,
+            max_bytes=cfg.max_bytes,
+            max_age_seconds=cfg.max_age_seconds,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0])
+
+    def _min_created_at(self) -> float:
+        return self._clock() - self.max_age_seconds if self.max_age_seconds > 0 else float("-inf")
+
+    def _lookup(self, where: str, arg: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT request_hash, body, created_at FROM responses WHERE {where} "
+                "ORDER BY last_access DESC LIMIT 1",
+                (arg,),
+            ).fetchone()
+            if row is None or row[2] < self._min_created_at():
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE request_hash = ?", (row[0],))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE request_hash = ?", (self._clock(), row[0]))
+            self.hits += 1
+        return _decode(row[1])
+
+    def get(self, req: RecommendRequest) -> Optional[Dict[str, Any]]:
+        return self._lookup("request_hash = ?", request_hash(req))
+
+    def get_by_generation_cache_id(self, generation_cache_id: str) -> Optional[Dict[str, Any]]:
+        if not generation_cache_id:
+            return None
+        return self._lookup("generation_cache_id = ?", generation_cache_id)
+
+    def put(self, req: RecommendRequest, resp: Dict[str, Any]) -> bool:
+        blob = _encode(resp)
+        if len(blob) > self.max_bytes or self.max_entries <= 0:
+            return False
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(request_hash, request_key, generation_cache_id, body, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (request_hash(req), cache_key(req), _generation_cache_id(resp), blob, len(blob), now, now),
+            )
+            self._evict()
+        return True
+
+    def _evict(self) -> None:
+        if self.max_age_seconds > 0:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (self._min_created_at(),))
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        doomed = []
+        rows = self._conn.execute("SELECT request_hash, size FROM responses ORDER BY last_access ASC").fetchall()
+        for rh, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((rh,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE request_hash = ?", doomed)
+
+    def recent(self, limit: int) -> List[Tuple[RecommendRequest, Dict[str, Any]]]:
+        """
+        Returns (RecommendRequest, response) for the `limit` most recently used fresh entries, newest first.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT request_key, body FROM responses WHERE created_at >= ? ORDER BY last_access DESC LIMIT ?",
+                (self._min_created_at(), int(limit)),
+            ).fetchall()
+        return [(RecommendRequest(**json.loads(key)), _decode(blob)) for key, blob in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            return {"hits": self.hits, "misses": self.misses, "entries": int(count), "bytes": int(total)}
+
+
+def through_store(
+    store: Optional[ResponseStore],
+    fetch: Callable[[RecommendRequest], Dict[str, Any]],
+) -> Callable[[RecommendRequest], Dict[str, Any]]:
+    if store is None:
+        return fetch
+
+    def _fetch(req: RecommendRequest) -> Dict[str, Any]:
+        resp = store.get(req)
+        if resp is None:
+            resp = fetch(req)
+            store.put(req, resp)
+        return resp
+
+    return _fetch
+
+
+def warm_cache(cache: Optional[ResponseCache], store: Optional[ResponseStore], limit: int) -> int:
+    """
+    Copies up to `limit` most recently used stored responses into `cache`. Returns the number loaded.
+    """
+    if cache is None or store is None or limit <= 0:
+        return 0
+    n = 0
+    # oldest first, so the most recently used entries end up most recent in the LRU
+    for req, resp in reversed(store.recent(limit)):
+        if cache.put(req, resp):
+            n += 1
+    return n
@@ -0,0 +1,102 @@
+# functions/core/superset.py
+"""
+Fetch-once, slice-locally support for exploratory tuning.
+
+Instead of asking the backend for exactly `top_k` results, the UI can request a superset
+(`top_k = max_top_k`) once per query and serve smaller `top_k` values, score thresholds and
+(when possible) judge/meta filters by filtering that superset locally.
+
+This module provides:
+- `superset_request()`: the request actually sent to the backend for a user request
+- `can_derive()`: whether a user request can be answered from a fetched superset
+- `derive()`: build a response for the user request from the superset response
+
+Derivation rules:
+- Same whitespace-normalized query, `top_k_vector` and `top_k_bm25`.
+- `top_k` <= superset `top_k` (results are ranked, so a smaller `top_k` is a prefix).
+- `debug`: a debug superset can serve non-debug requests, not the other way round.
+- `require_judge_pass` / `require_all_meta`: equal, or the superset is unfiltered (False) and
+  every skill carries the boolean `JUDGE_PASS_FIELD` / `ALL_META_FIELD` annotation to filter on.
+  Without those annotations a stricter filter needs a new backend call.
+- `min_score` is purely local and always derivable.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
+
+from functions.core.api_client import RecommendRequest
+from functions.core.queries import canonical_query
+
+
+JUDGE_PASS_FIELD = "judge_pass"
+ALL_META_FIELD = "has_all_meta"
+
+
+def superset_request(req: RecommendRequest, max_top_k: int) -> RecommendRequest:
+    return replace(req, top_k=max(int(req.top_k), int(max_top_k)))
+
+
+def _skills(resp: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    payload = (resp or {}).get("payload") or {}
+    return payload.get("recommended_skills") or []
+
+
+def _flag_derivable(have: bool, want: bool, skills: List[Dict[str, Any]], field: str) -> bool:
+    if have == want:
+        return True
+    if have:
+        return False  # superset is already filtered; an unfiltered request needs the dropped skills
+    return all(isinstance(s.get(field), bool) for s in skills)
+
+
+def can_derive(superset_req: Optional[RecommendRequest], superset_resp: Optional[Dict[str, Any]], req: RecommendRequest) -> bool:
+    if superset_req is None or superset_resp is None:
+        return False
+    if canonical_query(superset_req.query) != canonical_query(req.query):
+        return False
+    if (superset_req.top_k_vector, superset_req.top_k_bm25) != (req.top_k_vector, req.top_k_bm25):
+        return False
+    if req.top_k > superset_req.top_k:
+        return False
+    if req.debug and not superset_req.debug:
+        return False
+    skills = _skills(superset_resp)
+    return _flag_derivable(superset_req.require_judge_pass, req.require_judge_pass, skills, JUDGE_PASS_FIELD) and _flag_derivable(
+        superset_req.require_all_meta, req.require_all_meta, skills, ALL_META_FIELD
+    )
+
+
+def _score(s: Dict[str, Any]) -> float:
+    try:
+        return float(s.get("relevance_score", 0.0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def derive(
+    superset_req: RecommendRequest,
+    superset_resp: Dict[str, Any],
+    req: RecommendRequest,
+    min_score: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Returns a new response for `req` (the superset response is not modified).
+    Callers should check `can_derive()` first.
+    """
+    skills = _skills(superset_resp)
+    if req.require_judge_pass and not superset_req.require_judge_pass:
+        skills = [s for s in skills if s.get(JUDGE_PASS_FIELD) is True]
+    if req.require_all_meta and not superset_req.require_all_meta:
+        skills = [s for s in skills if s.get(ALL_META_FIELD) is True]
+    if min_score > 0:
+        skills = [s for s in skills if _score(s) >= min_score]
+    skills = skills[: req.top_k]
+
+    payload = dict(superset_resp.get("payload") or {})
+    payload["recommended_skills"] = skills
+    meta = superset_resp.get("meta")
+    meta = dict(meta) if isinstance(meta, dict) else {}
+    meta["derived_from_top_k"] = superset_req.top_k
+    return {**superset_resp, "payload": payload, "meta": meta}
@@ -6,24 +6,62 @@ This module defines dataclass-based config models and a YAML loader that reads
 `configs/parameters.yaml` (by default) into a strongly-typed `AppConfig`.
 
 Structure:
-- `ApiConfig`: API base URL, endpoints, timeout
+- `BackendConfig`: one backend URL and its routing weight
+- `ApiConfig`: API base URL (plus optional weighted backends), endpoints, connect/read timeouts,
+  connection pool, retry, hedging and circuit-breaker settings, response encoding negotiation
 - `DefaultsConfig`: default request parameters for UI controls
 - `UiConfig`: Streamlit page settings and display limits
-- `AppConfig`: top-level container (api/defaults/ui)
+- `CacheConfig`: process-wide response cache (TTL, LRU size, byte budget)
+- `BatchConfig`: concurrency and rate limit for bulk query runs
+- `StoreConfig`: persistent on-disk response store (SQLite path, size bounds, warm-up)
+- `FetchOnceConfig`: fetch a max-size result set once per query and slice/filter locally
+- `MetricsConfig`: diagnostics panel and optional Prometheus `/metrics` side port
+- `ProberConfig`: background keep-warm / health prober schedule and status thresholds
+- `SessionConfig`: per-session memory bounds (raw response budget, spill dir, idle eviction)
+- `JobsConfig`: background worker pool for searches (size, progress poll period)
+- `IndexConfig`: local BM25 index of received skills for the quick lookup
+- `QueriesConfig`: near-duplicate query matching (similarity threshold, recent queries kept)
+- `CompareConfig`: multi-query comparison view (queries per comparison)
+- `SelectionsConfig`: named, persistent skill selections (SQLite path) and selected-skills paging
+- `AdmissionConfig`: per-instance backend concurrency cap, wait queue and per-session rate limit
+- `AppConfig`: top-level container (api/defaults/ui/cache/batch/store/fetch_once/metrics/prober/
+  session/jobs/index/queries/compare/selections/admission)
 
 Loading rules:
 - `_read_yaml()` validates the YAML file exists and the root is a mapping.
 - `load_config()` applies sane defaults for missing keys, strips trailing slash
   from `api.base_url`, and requires `api.base_url` to be present.
+- The file is `config_path`, else `$SKILLS_GUI_CONFIG`, else `configs/parameters.yaml`. A `.json`
+  file (see `compile_config()`) is read with the json module, skipping YAML parsing entirely;
+  PyYAML is only imported when a YAML file is actually read.
+- Environment variables `SKILLS_GUI__<SECTION>__<KEY>` override single keys after the file is
+  read (values are parsed as JSON when possible, e.g. `SKILLS_GUI__CACHE__ENABLED=false`).
+
+CLI:
+- `python -m functions.utils.config --compile [configs/parameters.yaml] -o configs/parameters.json`
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
 
-import yaml
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "configs" / "parameters.yaml"
+CONFIG_ENV = "SKILLS_GUI_CONFIG"
+OVERRIDE_PREFIX = "SKILLS_GUI__"
+
+
+@dataclass(frozen=True)
+class BackendConfig:
+    url: str
+    weight: float = 1.0
 
 
 @dataclass(frozen=True)
@@ -32,6 +70,32 @@ class ApiConfig:
     endpoint_recommend: str
     endpoint_health: str
     timeout_seconds: int = 120
+    endpoint_recommend_stream: str = "/v1/recommend-skills/stream"
+    streaming: bool = True
+    connect_timeout_seconds: float = 10.0
+    read_timeout_seconds: Optional[float] = None  # None -> timeout_seconds
+    pool_size: int = 16
+    max_retries: int = 2
+    backoff_base_seconds: float = 0.5
+    backoff_max_seconds: float = 8.0
+    backends: Tuple[BackendConfig, ...] = ()  # empty -> base_url only
+    hedge: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_delay_ms: float = 250.0
+    hedge_initial_delay_ms: float = 3000.0  # used until enough latency samples exist
+    hedge_max_losers: int = 4  # abandoned attempts still running before new hedges are skipped
+    breaker_failure_threshold: int = 3
+    breaker_reset_seconds: float = 30.0
+    compression: Tuple[str, ...] = ("zstd", "br", "gzip")  # Accept-Encoding preference (decodable ones only)
+    msgpack: bool = True  # offer MessagePack responses when the msgpack package is installed
+
+    def backend_list(self) -> Tuple[BackendConfig, ...]:
+        return self.backends or (BackendConfig(url=self.base_url),)
+
+    def read_timeout(self) -> float:
+        if self.read_timeout_seconds is None:
+            return float(self.timeout_seconds)
+        return float(self.read_timeout_seconds)
 
 
 @dataclass(frozen=True)
@@ -52,14 +116,153 @@ class UiConfig:
     max_display_rows: int = 200
 
 
+@dataclass(frozen=True)
+class CacheConfig:
+    enabled: bool = True
+    ttl_seconds: int = 600
+    max_entries: int = 256
+    max_bytes: int = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class BatchConfig:
+    max_concurrency: int = 8
+    rate_per_second: float = 4.0  # 0 disables rate limiting
+
+
+@dataclass(frozen=True)
+class StoreConfig:
+    enabled: bool = True
+    path: str = "artifacts/responses.sqlite3"  # relative paths resolve against the project root
+    max_entries: int = 5000
+    max_bytes: int = 256 * 1024 * 1024
+    max_age_seconds: int = 7 * 24 * 3600  # 0 = never expire
+    warm_entries: int = 200  # stored responses preloaded into the memory cache at startup
+
+    def resolved_path(self) -> str:
+        p = Path(self.path)
+        if not p.is_absolute():
+            p = PROJECT_ROOT / p
+        return str(p)
+
+
+@dataclass(frozen=True)
+class FetchOnceConfig:
+    enabled: bool = False
+    max_top_k: int = 100
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+    show_diagnostics: bool = True
+    port: int = 0  # 0 disables the /metrics side server
+
+
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+@dataclass(frozen=True)
+class ProberConfig:
+    enabled: bool = True
+    interval_seconds: float = 300.0  # keep-warm period during business hours
+    business_hours: str = "08:00-20:00"  # local time window, "HH:MM-HH:MM"
+    business_days: Tuple[int, ...] = (0, 1, 2, 3, 4)  # Monday = 0
+    timezone: str = "Asia/Bangkok"
+    off_hours_interval_seconds: float = 0.0  # 0 = no probes outside business hours
+    history_size: int = 500
+    slow_ms: float = 3000.0  # health latency above this is reported as a likely cold start
+    stale_seconds: float = 600.0  # a new session re-probes when the last probe is older
+
+
+@dataclass(frozen=True)
+class SessionConfig:
+    max_raw_bytes: int = 1024 * 1024  # compressed raw response kept in memory; larger ones spill to disk
+    spill_dir: str = "artifacts/sessions"  # relative paths resolve against the project root
+    idle_seconds: float = 1800.0  # results/raw response of sessions idle this long are dropped (0 = never)
+
+    def resolved_spill_dir(self) -> str:
+        p = Path(self.spill_dir)
+        if not p.is_absolute():
+            p = PROJECT_ROOT / p
+        return str(p)
+
+
+@dataclass(frozen=True)
+class JobsConfig:
+    enabled: bool = True  # run searches on a background worker pool (False = inside the script run)
+    max_workers: int = 24  # concurrent searches per instance, across all sessions (backend calls: see AdmissionConfig)
+    poll_seconds: float = 0.5  # how often a waiting session refreshes its progress
+    inline_wait_seconds: float = 0.2  # searches finishing this fast (e.g. joining one about to finish) render in the same run
+
+
+@dataclass(frozen=True)
+class IndexConfig:
+    enabled: bool = True  # index every received skill for the sidebar quick lookup
+    max_skills: int = 50000  # least recently seen skills beyond this are dropped
+    warm_responses: int = 200  # stored responses indexed at startup
+    lookup_results: int = 10
+
+
+@dataclass(frozen=True)
+class QueriesConfig:
+    enabled: bool = True  # answer near-duplicate queries from a recent query's cached response
+    similarity_threshold: float = 0.87  # character-trigram Dice similarity needed for a match
+    max_recent: int = 2000  # recent queries kept for matching
+
+
+@dataclass(frozen=True)
+class CompareConfig:
+    enabled: bool = True  # show the "Compare queries" view
+    max_queries: int = 6  # queries per comparison (they run concurrently on the job queue)
+
+
+@dataclass(frozen=True)
+class SelectionsConfig:
+    enabled: bool = True  # save / reload named selections
+    path: str = "artifacts/selections.sqlite3"  # relative paths resolve against the project root
+    page_size: int = 50  # selected skills shown per page
+
+    def resolved_path(self) -> str:
+        p = Path(self.path)
+        if not p.is_absolute():
+            p = PROJECT_ROOT / p
+        return str(p)
+
+
+@dataclass(frozen=True)
+class AdmissionConfig:
+    enabled: bool = True
+    max_concurrent: int = 8  # backend calls in flight per instance, across all sessions
+    max_queue: int = 16  # calls waiting for a slot; beyond this new ones are refused
+    queue_timeout_seconds: float = 60.0  # a call waiting longer is refused (0 = wait indefinitely)
+    session_rate_per_minute: float = 6.0  # backend searches per session per minute (0 = unlimited)
+    session_burst: int = 5  # searches a session may make back to back
+    heavy_top_k: int = 50  # requests with top_k >= this (or debug) wait behind lighter ones
+
+
 @dataclass(frozen=True)
 class AppConfig:
     api: ApiConfig
     defaults: DefaultsConfig
     ui: UiConfig
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    batch: BatchConfig = field(default_factory=BatchConfig)
+    store: StoreConfig = field(default_factory=StoreConfig)
+    fetch_once: FetchOnceConfig = field(default_factory=FetchOnceConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+    prober: ProberConfig = field(default_factory=ProberConfig)
+    session: SessionConfig = field(default_factory=SessionConfig)
+    jobs: JobsConfig = field(default_factory=JobsConfig)
+    index: IndexConfig = field(default_factory=IndexConfig)
+    queries: QueriesConfig = field(default_factory=QueriesConfig)
+    compare: CompareConfig = field(default_factory=CompareConfig)
+    selections: SelectionsConfig = field(default_factory=SelectionsConfig)
+    admission: AdmissionConfig = field(default_factory=AdmissionConfig)
 
 
 def _read_yaml(path: Path) -> Dict[str, Any]:
+    import yaml
+
     if not path.exists():
         raise FileNotFoundError(f"Missing config file: {path}")
     with path.open("r", encoding="utf-8") as f:
@@ -69,24 +272,116 @@ def _read_yaml(path: Path) -> Dict[str, Any]:
     return data
 
 
-def load_config(config_path: Optional[str] = None) -> AppConfig:
+def _read_config_file(path: Path) -> Dict[str, Any]:
+    if path.suffix.lower() != ".json":
+        return _read_yaml(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Missing config file: {path}")
+    with path.open("r", encoding="utf-8") as f:
+        data = json.load(f) or {}
+    if not isinstance(data, dict):
+        raise ValueError(f"Invalid JSON root (expected object): {path}")
+    return data
+
+
+def _apply_env_overrides(data: Dict[str, Any], environ: Mapping[str, str]) -> Dict[str, Any]:
+    for name, raw in environ.items():
+        if not name.startswith(OVERRIDE_PREFIX):
+            continue
+        parts = [p.lower() for p in name[len(OVERRIDE_PREFIX):].split("__") if p]
+        if len(parts) != 2:
+            continue
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        section = data.get(parts[0])
+        if not isinstance(section, dict):
+            section = data[parts[0]] = {}
+        section[parts[1]] = value
+    return data
+
+
+def compile_config(src: Optional[str] = None, dest: Optional[str] = None) -> Path:
+    """
+    Parse a YAML config once and write it as JSON (default: same path with `.json`).
+    """
+    src_path = Path(src) if src else DEFAULT_CONFIG_PATH
+    dest_path = Path(dest) if dest else src_path.with_suffix(".json")
+    data = _read_yaml(src_path)
+    dest_path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return dest_path
+
+
+def _backend(item: Any) -> BackendConfig:
+    if isinstance(item, str):
+        return BackendConfig(url=item.rstrip("/"))
+    if not isinstance(item, dict) or not item.get("url"):
+        raise ValueError(f"api.backends entries need a url: {item!r}")
+    return BackendConfig(url=str(item["url"]).rstrip("/"), weight=float(item.get("weight", 1.0)))
+
+
+def _weekday(item: Any) -> int:
+    if isinstance(item, int) and 0 <= item <= 6:
+        return item
+    name = str(item).strip().lower()[:3]
+    if name not in _WEEKDAYS:
+        raise ValueError(f"prober.business_days: unknown day {item!r}")
+    return _WEEKDAYS.index(name)
+
+
+def load_config(config_path: Optional[str] = None, environ: Optional[Mapping[str, str]] = None) -> AppConfig:
     """
-    Loads configs/parameters.yaml by default.
+    Loads `config_path`, else `$SKILLS_GUI_CONFIG`, else configs/parameters.yaml.
     """
+    environ = os.environ if environ is None else environ
     if config_path is None:
-        config_path = str(Path(__file__).resolve().parents[2] / "configs" / "parameters.yaml")
+        config_path = environ.get(CONFIG_ENV) or str(DEFAULT_CONFIG_PATH)
 
-    data = _read_yaml(Path(config_path))
+    data = _apply_env_overrides(_read_config_file(Path(config_path)), environ)
 
     api_d = data.get("api", {}) or {}
     defaults_d = data.get("defaults", {}) or {}
     ui_d = data.get("ui", {}) or {}
+    cache_d = data.get("cache", {}) or {}
+    batch_d = data.get("batch", {}) or {}
+    store_d = data.get("store", {}) or {}
+    fetch_once_d = data.get("fetch_once", {}) or {}
+    metrics_d = data.get("metrics", {}) or {}
+    prober_d = data.get("prober", {}) or {}
+    session_d = data.get("session", {}) or {}
+    jobs_d = data.get("jobs", {}) or {}
+    index_d = data.get("index", {}) or {}
+    queries_d = data.get("queries", {}) or {}
+    compare_d = data.get("compare", {}) or {}
+    selections_d = data.get("selections", {}) or {}
+    admission_d = data.get("admission", {}) or {}
 
     api = ApiConfig(
         base_url=str(api_d.get("base_url", "")).rstrip("/"),
         endpoint_recommend=str(api_d.get("endpoint_recommend", "/v1/recommend-skills")),
         endpoint_health=str(api_d.get("endpoint_health", "/healthz")),
         timeout_seconds=int(api_d.get("timeout_seconds", 120)),
+        endpoint_recommend_stream=str(api_d.get("endpoint_recommend_stream", "/v1/recommend-skills/stream")),
+        streaming=bool(api_d.get("streaming", True)),
+        connect_timeout_seconds=float(api_d.get("connect_timeout_seconds", 10.0)),
+        read_timeout_seconds=(
+            float(api_d["read_timeout_seconds"]) if api_d.get("read_timeout_seconds") is not None else None
+        ),
+        pool_size=int(api_d.get("pool_size", 16)),
+        max_retries=int(api_d.get("max_retries", 2)),
+        backoff_base_seconds=float(api_d.get("backoff_base_seconds", 0.5)),
+        backoff_max_seconds=float(api_d.get("backoff_max_seconds", 8.0)),
+        backends=tuple(_backend(b) for b in (api_d.get("backends") or [])),
+        hedge=bool(api_d.get("hedge", False)),
+        hedge_percentile=float(api_d.get("hedge_percentile", 95.0)),
+        hedge_min_delay_ms=float(api_d.get("hedge_min_delay_ms", 250.0)),
+        hedge_initial_delay_ms=float(api_d.get("hedge_initial_delay_ms", 3000.0)),
+        hedge_max_losers=int(api_d.get("hedge_max_losers", 4)),
+        breaker_failure_threshold=int(api_d.get("breaker_failure_threshold", 3)),
+        breaker_reset_seconds=float(api_d.get("breaker_reset_seconds", 30.0)),
+        compression=tuple(str(e) for e in api_d.get("compression", ("zstd", "br", "gzip")) or ()),
+        msgpack=bool(api_d.get("msgpack", True)),
     )
 
     if not api.base_url:
@@ -108,4 +403,132 @@ def load_config(config_path: Optional[str] = None) -> AppConfig:
         max_display_rows=int(ui_d.get("max_display_rows", 200)),
     )
 
-    return AppConfig(api=api, defaults=defaults, ui=ui)
\ No newline at end of file
+    cache = CacheConfig(
+        enabled=bool(cache_d.get("enabled", True)),
+        ttl_seconds=int(cache_d.get("ttl_seconds", 600)),
+        max_entries=int(cache_d.get("max_entries", 256)),
+        max_bytes=int(cache_d.get("max_bytes", 64 * 1024 * 1024)),
+    )
+
+    batch = BatchConfig(
+        max_concurrency=int(batch_d.get("max_concurrency", 8)),
+        rate_per_second=float(batch_d.get("rate_per_second", 4.0)),
+    )
+
+    store = StoreConfig(
+        enabled=bool(store_d.get("enabled", True)),
+        path=str(store_d.get("path", "artifacts/responses.sqlite3")),
+        max_entries=int(store_d.get("max_entries", 5000)),
+        max_bytes=int(store_d.get("max_bytes", 256 * 1024 * 1024)),
+        max_age_seconds=int(store_d.get("max_age_seconds", 7 * 24 * 3600)),
+        warm_entries=int(store_d.get("warm_entries", 200)),
+    )
+
+    fetch_once = FetchOnceConfig(
+        enabled=bool(fetch_once_d.get("enabled", False)),
+        max_top_k=int(fetch_once_d.get("max_top_k", 100)),
+    )
+
+    metrics = MetricsConfig(
+        show_diagnostics=bool(metrics_d.get("show_diagnostics", True)),
+        port=int(metrics_d.get("port", 0)),
+    )
+
+    prober = ProberConfig(
+        enabled=bool(prober_d.get("enabled", True)),
+        interval_seconds=float(prober_d.get("interval_seconds", 300.0)),
+        business_hours=str(prober_d.get("business_hours", "08:00-20:00")),
+        business_days=tuple(_weekday(d) for d in prober_d.get("business_days", _WEEKDAYS[:5])),
+        timezone=str(prober_d.get("timezone", "Asia/Bangkok")),
+        off_hours_interval_seconds=float(prober_d.get("off_hours_interval_seconds", 0.0)),
+        history_size=int(prober_d.get("history_size", 500)),
+        slow_ms=float(prober_d.get("slow_ms", 3000.0)),
+        stale_seconds=float(prober_d.get("stale_seconds", 600.0)),
+    )
+
+    session = SessionConfig(
+        max_raw_bytes=int(session_d.get("max_raw_bytes", 1024 * 1024)),
+        spill_dir=str(session_d.get("spill_dir", "artifacts/sessions")),
+        idle_seconds=float(session_d.get("idle_seconds", 1800.0)),
+    )
+
+    jobs = JobsConfig(
+        enabled=bool(jobs_d.get("enabled", True)),
+        max_workers=int(jobs_d.get("max_workers", 24)),
+        poll_seconds=float(jobs_d.get("poll_seconds", 0.5)),
+        inline_wait_seconds=float(jobs_d.get("inline_wait_seconds", 0.2)),
+    )
+
+    index = IndexConfig(
+        enabled=bool(index_d.get("enabled", True)),
+        max_skills=int(index_d.get("max_skills", 50000)),
+        warm_responses=int(index_d.get("warm_responses", 200)),
+        lookup_results=int(index_d.get("lookup_results", 10)),
+    )
+
+    queries = QueriesConfig(
+        enabled=bool(queries_d.get("enabled", True)),
+        similarity_threshold=float(queries_d.get("similarity_threshold", 0.87)),
+        max_recent=int(queries_d.get("max_recent", 2000)),
+    )
+
+    compare = CompareConfig(
+        enabled=bool(compare_d.get("enabled", True)),
+        max_queries=int(compare_d.get("max_queries", 6)),
+    )
+
+    selections = SelectionsConfig(
+        enabled=bool(selections_d.get("enabled", True)),
+        path=str(selections_d.get("path", "artifacts/selections.sqlite3")),
+        page_size=int(selections_d.get("page_size", 50)),
+    )
+
+    admission = AdmissionConfig(
+        enabled=bool(admission_d.get("enabled", True)),
+        max_concurrent=int(admission_d.get("max_concurrent", 8)),
+        max_queue=int(admission_d.get("max_queue", 16)),
+        queue_timeout_seconds=float(admission_d.get("queue_timeout_seconds", 60.0)),
+        session_rate_per_minute=float(admission_d.get("session_rate_per_minute", 6.0)),
+        session_burst=int(admission_d.get("session_burst", 5)),
+        heavy_top_k=int(admission_d.get("heavy_top_k", 50)),
+    )
+
+    return AppConfig(
+        api=api,
+        defaults=defaults,
+        ui=ui,
+        cache=cache,
+        batch=batch,
+        store=store,
+        fetch_once=fetch_once,
+        metrics=metrics,
+        prober=prober,
+        session=session,
+        jobs=jobs,
+        index=index,
+        queries=queries,
+        compare=compare,
+        selections=selections,
+        admission=admission,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate or precompile the app configuration.")
+    parser.add_argument("config", nargs="?", help="YAML config (default: configs/parameters.yaml)")
+    parser.add_argument("--compile", action="store_true", help="write the config as JSON for faster startup")
+    parser.add_argument("-o", "--output", help="JSON output path (default: <config>.json)")
+    args = parser.parse_args(argv)
+
+    if args.compile:
+        out = compile_config(args.config, args.output)
+        load_config(str(out), environ={})  # fail the build on an invalid config
+        print(f"Wrote {out}", file=sys.stderr)
+    else:
+        load_config(args.config)
+        print("Config OK", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
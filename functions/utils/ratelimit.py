@@ -0,0 +1,60 @@
+# functions/utils/ratelimit.py
+"""
+Rate limiting primitives.
+
+This module provides:
+- `TokenBucket`: thread-safe token bucket (steady `rate_per_second` refill, up to `burst` tokens)
+
+Notes:
+- `acquire()` blocks (sleeping outside the lock) until a token is available unless `block=False`.
+- `clock` / `sleep` are injectable for deterministic tests.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be > 0")
+        self.rate = float(rate_per_second)
+        self.capacity = float(burst) if burst is not None else max(1.0, self.rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._last = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def acquire(self, tokens: float = 1.0, block: bool = True) -> bool:
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of {self.capacity}")
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if not block:
+                return False
+            self._sleep(wait)
@@ -7,16 +7,25 @@ This module centralizes small, UI-safe helpers used across the Streamlit app:
 - `truncate()`: truncate long text with an ellipsis for table previews
 - `evidence_to_display()`: format evidence for on-screen rendering
 - `evidence_to_export()`: format evidence for exports (pipe-joined or JSON)
+- `evidence_to_list()`: cleaned evidence as a list of strings (for list-typed exports)
+- `safe_str_series()` / `truncate_series()` / `evidence_series_to_export()`: column-wise
+  (pandas) equivalents of the helpers above, used to build large tables
 
 Conventions:
 - Evidence may be `list[str]` or a preformatted string; helpers handle both.
 - Export formatting is deterministic to keep CSV/XLSX outputs stable.
+- Series helpers treat any missing value (None/NaN) as "" and return object-dtype Series whose
+  values match the scalar helpers element for element.
+- pandas is imported on first use of a Series helper, not at module import (cold-start time).
 """
 
 from __future__ import annotations
 
 import json
-from typing import Any, Iterable, List, Optional
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def safe_str(x: Any) -> str:
@@ -58,4 +67,51 @@ def evidence_to_export(evidence: Any, mode: str = "pipe") -> str:
         if mode == "json":
             return json.dumps(cleaned, ensure_ascii=False)
         return "|".join(cleaned)
-    return safe_str(evidence).strip()
\ No newline at end of file
+    return safe_str(evidence).strip()
+
+
+def evidence_to_list(evidence: Any) -> List[str]:
+    """
+    list -> stripped non-empty items; non-empty string -> [string]; None -> [].
+    """
+    if evidence is None:
+        return []
+    if isinstance(evidence, list):
+        return [safe_str(e).strip() for e in evidence if safe_str(e).strip()]
+    text = safe_str(evidence).strip()
+    return [text] if text else []
+
+
+def safe_str_series(s: pd.Series) -> pd.Series:
+    import pandas as pd
+
+    s = s.astype(object)
+    s = s.where(s.notna(), "")
+    if pd.api.types.infer_dtype(s, skipna=False) == "string":
+        return s  # already all str: skip the per-element str() pass
+    return s.astype(str).astype(object)
+
+
+def truncate_series(s: pd.Series, n: int) -> pd.Series:
+    import pandas as pd
+
+    s = safe_str_series(s)
+    if n <= 0:
+        return pd.Series("", index=s.index, dtype=object)
+    long = s.str.len() > n
+    return s.where(~long, s.str[: max(0, n - 1)] + "…").astype(object)
+
+
+def evidence_series_to_export(evidence: pd.Series, mode: str = "pipe") -> pd.Series:
+    """
+    Column-wise `evidence_to_export()` (or `evidence_to_list()` for mode="list"). Evidence lists
+    are short, so a single `map` over the column is cheaper than explode/groupby-join or
+    regex-based cleaning (measured at 50k rows).
+    """
+    if mode == "list":
+        return evidence.astype(object).map(lambda e: evidence_to_list(None if _is_missing(e) else e))
+    return evidence.astype(object).map(lambda e: evidence_to_export(None if _is_missing(e) else e, mode=mode))
+
+
+def _is_missing(x: Any) -> bool:
+    return x is None or (isinstance(x, float) and x != x)
@@ -0,0 +1,141 @@
+import threading
+import time
+
+import pytest
+
+from functions.core.admission import CANCELLED, QUEUE_FULL, RATE_LIMITED, TIMEOUT, AdmissionController, AdmissionRejected
+from functions.core.jobs import JobQueue
+
+
+def test_session_rate_limit_refuses_then_refills():
+    now = [0.0]
+    ctl = AdmissionController(session_rate_per_second=0.1, session_burst=2, clock=lambda: now[0])
+    ctl.allow("a")
+    ctl.allow("a")
+    with pytest.raises(AdmissionRejected) as e:
+        ctl.allow("a")
+    assert e.value.reason == RATE_LIMITED and e.value.retry_after == pytest.approx(10.0)
+    ctl.allow("b")  # other sessions have their own bucket
+    now[0] = 10.0
+    ctl.allow("a")
+    assert ctl.stats()["shed_rate_limited"] == 1
+
+
+def _wait_until(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_waiting_calls_get_slots_by_priority_and_full_queue_is_shed():
+    ctl = AdmissionController(max_concurrent=1, max_queue=2)
+    release = threading.Event()
+    order, tickets = [], {}
+
+    def call(name, priority):
+        with ctl.slot(priority, on_queued=lambda t: tickets.setdefault(name, t)):
+            order.append(name)
+            if name == "holder":
+                release.wait(5)
+
+    threads = [threading.Thread(target=call, args=("holder", 0))]
+    threads[0].start()
+    _wait_until(lambda: order == ["holder"])
+    for name, priority in (("heavy", 1), ("light", 0)):
+        threads.append(threading.Thread(target=call, args=(name, priority)))
+        threads[-1].start()
+        _wait_until(lambda: name in tickets)
+    assert ctl.position(tickets["light"]) == 1 and ctl.position(tickets["heavy"]) == 2
+
+    with pytest.raises(AdmissionRejected) as e:
+        with ctl.slot():
+            pass
+    assert e.value.reason == QUEUE_FULL
+
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert order == ["holder", "light", "heavy"]
+    assert ctl.position(tickets["heavy"]) == 0
+    assert ctl.stats() == {
+        "running": 0,
+        "queued": 0,
+        "max_concurrent": 1,
+        "max_queue": 2,
+        "admitted": 3,
+        "shed_rate_limited": 0,
+        "shed_queue_full": 1,
+        "shed_timeout": 0,
+        "shed_cancelled": 0,
+    }
+
+
+def test_wait_beyond_timeout_is_shed():
+    ctl = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout_seconds=0.05)
+    with ctl.slot():
+        with pytest.raises(AdmissionRejected) as e:
+            with ctl.slot():
+                pass
+    assert e.value.reason == TIMEOUT and "busy" in str(e.value)
+    assert ctl.stats()["queued"] == 0
+    with ctl.slot():  # the timed-out waiter left no trace
+        assert ctl.stats()["running"] == 1
+
+
+def test_cancelled_queued_job_never_calls_the_backend():
+    ctl = AdmissionController(max_concurrent=1, max_queue=4)
+    jobs = JobQueue(max_workers=2)
+    release, calls = threading.Event(), []
+
+    def search(name):
+        def _run(job):
+            def on_queued(ticket):
+                job.context["ticket"] = ticket
+                job.on_cancel(lambda: ctl.withdraw(ticket))
+
+            with ctl.slot(on_queued=on_queued, cancelled=lambda: job.cancelled):
+                calls.append(name)
+                if name == "holder":
+                    release.wait(5)
+
+        return _run
+
+    holder = jobs.submit(search("holder"))
+    _wait_until(lambda: calls == ["holder"])
+    queued = jobs.submit(search("queued"))
+    _wait_until(lambda: "ticket" in queued.context)
+    assert ctl.position(queued.context["ticket"]) == 1
+
+    assert queued.cancel()
+    _wait_until(lambda: ctl.stats()["queued"] == 0)
+    release.set()
+    jobs.shutdown(wait=True)
+    assert holder.wait(5) and calls == ["holder"]
+    assert ctl.stats()["shed_cancelled"] == 1 and ctl.stats()["running"] == 0
+
+
+def test_call_cancelled_while_granted_hands_the_slot_back():
+    ctl = AdmissionController(max_concurrent=1, max_queue=4)
+    cancelled, calls = [False], []
+
+    def waiter():
+        try:
+            with ctl.slot(cancelled=lambda: cancelled[0]):
+                calls.append("waiter")
+        except AdmissionRejected as e:
+            calls.append(e.reason)
+
+    with pytest.raises(AdmissionRejected) as e:
+        with ctl.slot(cancelled=lambda: True):
+            pass
+    assert e.value.reason == CANCELLED
+
+    with ctl.slot():
+        t = threading.Thread(target=waiter)
+        t.start()
+        _wait_until(lambda: ctl.stats()["queued"] == 1)
+        cancelled[0] = True  # cancelled without withdrawing: noticed once the slot is granted
+    t.join(5)
+    assert calls == [CANCELLED]
+    assert ctl.stats()["running"] == 0
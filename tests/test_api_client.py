@@ -0,0 +1,145 @@
+import pytest
+
+from benchmarks.fake_api import FakeApi
+
+from functions.core.api_client import (
+    ApiError,
+    RecommendRequest,
+    connection_stats,
+    health_check,
+    iter_recommend_skills,
+    recommend_skills,
+    transfer_stats,
+)
+from functions.core.codecs import accept, accept_encoding, decode_body
+from functions.utils.config import ApiConfig
+
+
+def _api(base_url, **kw):
+    kw.setdefault("backoff_base_seconds", 0.0)
+    return ApiConfig(
+        base_url=base_url,
+        endpoint_recommend="/v1/recommend-skills",
+        endpoint_health="/healthz",
+        **kw,
+    )
+
+
+def _req(query="q"):
+    return RecommendRequest(
+        query=query,
+        top_k=3,
+        debug=False,
+        require_judge_pass=True,
+        top_k_vector=20,
+        top_k_bm25=20,
+        require_all_meta=False,
+    )
+
+
+def test_connections_are_reused():
+    with FakeApi() as fake:
+        api = _api(fake.base_url)
+        before = connection_stats()
+        assert health_check(api) == (True, "ok")
+        for _ in range(3):
+            resp = recommend_skills(api, _req())
+            assert len(resp["payload"]["recommended_skills"]) == 3
+        after = connection_stats()
+        assert after["requests"] - before["requests"] == 4
+        assert after["new_connections"] - before["new_connections"] == 1
+
+
+def test_retries_cold_start_statuses():
+    with FakeApi() as fake:
+        fake.script = [503, 429]
+        resp = recommend_skills(_api(fake.base_url, max_retries=2), _req())
+        assert resp["meta"]["generation_cache_id"] == "gen-q"
+        assert len(fake.requests) == 3
+
+
+def test_retries_are_bounded_and_other_errors_not_retried():
+    with FakeApi() as fake:
+        fake.script = [503, 503, 503]
+        with pytest.raises(ApiError) as e:
+            recommend_skills(_api(fake.base_url, max_retries=1), _req())
+        assert e.value.status_code == 503
+        assert len(fake.requests) == 2
+
+        fake.script = [500]
+        with pytest.raises(ApiError) as e:
+            recommend_skills(_api(fake.base_url), _req())
+        assert e.value.status_code == 500
+        assert e.value.detail == {"detail": "scripted 500"}
+
+
+@pytest.mark.parametrize("stream_format", ["ndjson", "sse"])
+def test_stream_yields_skills_then_response(stream_format):
+    with FakeApi(stream_format=stream_format) as fake:
+        events = list(iter_recommend_skills(_api(fake.base_url), _req()))
+        assert [e for e, _ in events] == ["skill", "skill", "skill", "response"]
+        resp = events[-1][1]
+        assert resp == fake.respond({"query": "q", "top_k": 3})
+        assert fake.paths == ["/v1/recommend-skills/stream"]
+
+
+@pytest.mark.parametrize("stream_format", ["ndjson", "sse"])
+def test_stream_decodes_utf8_text(stream_format):
+    name = "วิทยาศาสตร์ข้อมูล café"
+    with FakeApi(stream_format=stream_format) as fake:
+        fake.respond = lambda body: {"payload": {"query": body["query"], "recommended_skills": [{"skill_id": "T1", "skill_name": name}]}, "meta": {}}
+        events = list(iter_recommend_skills(_api(fake.base_url), _req("ข้อมูล")))
+    assert events[0] == ("skill", {"skill_id": "T1", "skill_name": name})
+    assert events[-1][1]["payload"]["query"] == "ข้อมูล"
+
+
+def test_stream_without_done_event_is_an_error():
+    with FakeApi(stream_format="sse", stream_done=False) as fake:
+        events = []
+        with pytest.raises(ApiError) as e:
+            for event in iter_recommend_skills(_api(fake.base_url), _req()):
+                events.append(event[0])
+    assert events == ["skill", "skill", "skill"]  # streamed skills still render, no "response"
+    assert e.value.detail == {"skills_received": 3}
+
+
+def test_stream_falls_back_to_blocking_post():
+    with FakeApi(streaming=False) as fake:
+        api = _api(fake.base_url)
+        for _ in range(2):
+            events = list(iter_recommend_skills(api, _req()))
+            assert [e for e, _ in events] == ["skill", "skill", "skill", "response"]
+        # unsupported endpoint is remembered after the first 404
+        assert fake.paths == ["/v1/recommend-skills", "/v1/recommend-skills"]
+
+
+def test_stop_closes_a_live_stream_but_not_a_blocking_answer():
+    with FakeApi() as fake:
+        events = [e for e, _ in iter_recommend_skills(_api(fake.base_url), _req(), stop=lambda: True)]
+        assert events == ["skill"]  # closed after the first streamed skill, no "response"
+    with FakeApi(streaming=False) as fake:
+        events = [e for e, _ in iter_recommend_skills(_api(fake.base_url), _req("blocking"), stop=lambda: True)]
+        assert events == ["skill", "skill", "skill", "response"]  # already complete: kept
+
+
+def test_negotiates_compressed_responses_and_records_transfer_stats():
+    with FakeApi(compression="gzip", realistic=True) as fake:
+        before = transfer_stats()
+        resp = recommend_skills(_api(fake.base_url, compression=("zstd", "gzip"), streaming=False), _req())
+        assert len(resp["payload"]["recommended_skills"]) == 3
+        assert "gzip" in fake.headers[-1]["Accept-Encoding"]
+        after = transfer_stats()
+        assert after["responses"] - before["responses"] == 1
+        assert after["last"]["encoding"] == "gzip" and after["last"]["format"] == "json"
+        assert after["last"]["wire_bytes"] < after["last"]["body_bytes"]
+
+        recommend_skills(_api(fake.base_url, compression=(), streaming=False), _req("plain"))
+        assert fake.headers[-1]["Accept-Encoding"] == "identity"
+        assert transfer_stats()["last"]["encoding"] == "identity"
+
+
+def test_codecs_offer_only_what_can_be_decoded():
+    assert accept_encoding(["snappy", "gzip", "GZIP"]) == "gzip"
+    assert accept_encoding([]) == "identity"
+    assert accept(False) == "application/json"
+    assert decode_body(b'{"a": 1}', "application/json; charset=utf-8") == ({"a": 1}, "json")
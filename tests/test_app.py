@@ -0,0 +1,47 @@
+import time
+from dataclasses import replace
+
+from benchmarks.fake_api import FakeApi
+
+import app
+from functions.core.api_client import RecommendRequest
+from functions.core.cache import ResponseCache
+from functions.core.jobs import JobQueue
+from functions.core.singleflight import SingleFlight
+from functions.utils.config import load_config
+
+
+def _req(query="cancelled early"):
+    return RecommendRequest(
+        query=query,
+        top_k=3,
+        debug=False,
+        require_judge_pass=True,
+        top_k_vector=20,
+        top_k_bm25=20,
+        require_all_meta=False,
+    )
+
+
+def test_search_cancelled_during_a_blocking_call_still_fills_the_cache(monkeypatch):
+    cache, flight = ResponseCache(), SingleFlight()
+    monkeypatch.setattr(app, "_response_cache", lambda: cache)
+    monkeypatch.setattr(app, "_response_store", lambda: None)
+    monkeypatch.setattr(app, "_inflight", lambda: flight)
+    monkeypatch.setattr(app, "_admission", lambda: None)
+
+    with FakeApi(streaming=False, latency_ms=300) as fake:
+        cfg = load_config(environ={})
+        cfg = replace(cfg, api=replace(cfg.api, base_url=fake.base_url, backends=(), max_retries=0))
+        run = app._search_runner(cfg)
+        jobs = JobQueue(max_workers=1)
+        job = jobs.submit(lambda j: run(_req(), j.report, j))
+        deadline = time.monotonic() + 5
+        while not fake.requests:
+            assert time.monotonic() < deadline
+            time.sleep(0.005)
+        assert job.cancel()
+        jobs.shutdown(wait=True)
+
+    assert len(fake.requests) == 1
+    assert app._lookup_cached(_req()) is not None  # the next identical search is a cache hit
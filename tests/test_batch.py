@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from functions.core.api_client import ApiError
+from functions.core.batch import load_checkpoint, read_queries, request_for, run_batch, write_batch_export
+from functions.utils.config import DefaultsConfig
+from functions.utils.ratelimit import TokenBucket
+
+
+def _fetch(req):
+    return {
+        "payload": {"query": req.query, "recommended_skills": [{"skill_id": req.query, "skill_name": req.query}]},
+        "meta": {"generation_cache_id": f"gen-{req.query}"},
+    }
+
+
+def _make(q):
+    return request_for(q, DefaultsConfig())
+
+
+def test_read_queries(tmp_path):
+    p = tmp_path / "q.csv"
+    p.write_text("id,query\n1,data scientist\n2, \n3,data scientist\n4,nurse\n", encoding="utf-8")
+    assert read_queries(str(p)) == ["data scientist", "nurse"]
+    headered = tmp_path / "roles.csv"
+    headered.write_text("title\ndata scientist\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="no 'query' column"):
+        read_queries(str(headered))  # "title" must not be sent as a query
+    t = tmp_path / "q.txt"
+    t.write_text("a\n\nb\n", encoding="utf-8")
+    assert read_queries(str(t)) == ["a", "b"]
+
+
+def test_run_batch_bounded_concurrency_and_order():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def fetch(req):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return _fetch(req)
+
+    seen = []
+    queries = [f"q{i}" for i in range(20)]
+    results = run_batch(queries, _make, fetch, max_concurrency=3, progress=lambda n, t, r: seen.append((n, t)))
+    assert [r.query for r in results] == queries
+    assert all(r.ok for r in results)
+    assert peak[0] <= 3
+    assert seen[-1] == (20, 20)
+
+
+def test_resume_from_checkpoint(tmp_path):
+    ckpt = str(tmp_path / "run.checkpoint.jsonl")
+
+    def flaky(req):
+        if req.query == "b":
+            raise ApiError("boom", status_code=503)
+        return _fetch(req)
+
+    first = run_batch(["a", "b", "c"], _make, flaky, checkpoint_path=ckpt)
+    assert [r.ok for r in first] == [True, False, True]
+
+    calls = []
+
+    def fetch(req):
+        calls.append(req.query)
+        return _fetch(req)
+
+    second = run_batch(["a", "b", "c"], _make, fetch, checkpoint_path=ckpt)
+    assert calls == ["b"]
+    assert all(r.ok for r in second)
+
+    out = tmp_path / "out.csv"
+    assert write_batch_export(second, str(out)) == 3
+    text = out.read_text(encoding="utf-8")
+    assert text.splitlines()[0].startswith("skill_id,skill_name")
+    assert "gen-b" in text
+
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    slept = []
+
+    def sleep(s):
+        slept.append(s)
+        now[0] += s
+
+    bucket = TokenBucket(rate_per_second=2, burst=1, clock=lambda: now[0], sleep=sleep)
+    assert bucket.acquire()
+    assert bucket.acquire(block=False) is False
+    assert bucket.acquire()
+    assert abs(sum(slept) - 0.5) < 1e-9
+
+
+def test_interrupted_run_starts_nothing_new_and_checkpoints_calls_in_flight(tmp_path):
+    ckpt = str(tmp_path / "run.checkpoint.jsonl")
+    calls, lock = [], threading.Lock()
+
+    def fetch(req):
+        with lock:
+            calls.append(req.query)
+        time.sleep(0.02)
+        return _fetch(req)
+
+    def interrupt(n, total, res):
+        if n == 2:
+            raise KeyboardInterrupt
+
+    queries = [f"q{i}" for i in range(20)]
+    with pytest.raises(KeyboardInterrupt):
+        run_batch(queries, _make, fetch, max_concurrency=3, checkpoint_path=ckpt, progress=interrupt)
+    assert len(calls) <= 5  # 3 in flight, plus one submitted for each of the 2 completions
+    assert sorted(load_checkpoint(ckpt)) == sorted(calls)
+
+    checkpointed = set(calls)
+    calls.clear()
+    resumed = run_batch(queries, _make, fetch, max_concurrency=3, checkpoint_path=ckpt)
+    assert all(r.ok for r in resumed) and sorted(calls) == sorted(set(queries) - checkpointed)
@@ -0,0 +1,38 @@
+import requests
+
+from benchmarks.fake_api import FakeApi
+from benchmarks.run import bench_api, bench_tables, compare
+
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = {"a": {"seconds": 0.100}, "b": {"seconds": 0.100}, "tiny": {"seconds": 0.0001}}
+    current = {"a": {"seconds": 0.200}, "b": {"seconds": 0.110}, "tiny": {"seconds": 0.0009}, "new": {"seconds": 1.0}}
+    regressions = compare(current, baseline, tolerance=0.25)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("a: ")
+
+
+def test_fake_api_injects_errors_and_server_timing():
+    with FakeApi(error_rate=1.0, seed=1) as fake:
+        resp = requests.post(fake.base_url + "/v1/recommend-skills", json={"query": "q", "top_k": 1}, timeout=5)
+        assert resp.status_code in (429, 503, 500)
+
+    with FakeApi(latency_ms=5, realistic=True) as fake:
+        resp = requests.post(fake.base_url + "/v1/recommend-skills", json={"query": "q", "top_k": 2}, timeout=5)
+        assert resp.headers["Server-Timing"] == "app;dur=5.0"
+        assert len(resp.json()["payload"]["recommended_skills"][0]["evidence"]) == 4
+
+
+def test_bench_api_counts_requests_per_session():
+    r = bench_api(sessions=2, requests_per_session=3, latency_ms=0, jitter_ms=0)
+    assert r["requests"] == 6 and r["errors"] == 0
+    assert r["requests_per_second"] > 0 and r["p95_ms"] >= r["p50_ms"]
+
+
+def test_bench_tables_covers_every_stage():
+    out = bench_tables([10], repeat=1, preview_chars=50)
+    assert set(out) == {
+        f"{name}[rows=10]"
+        for name in ("results_df", "export_frame", "export_csv", "export_xlsx", "export_parquet", "export_jsonl", "selected_list", "selected_add_many", "decode_json")
+    }
+    assert all(r["seconds"] >= 0 for r in out.values())
@@ -0,0 +1,57 @@
+from functions.core.api_client import RecommendRequest
+from functions.core.cache import ResponseCache, cache_key, cached_call
+
+
+def _req(query="data scientist", top_k=20):
+    return RecommendRequest(
+        query=query,
+        top_k=top_k,
+        debug=False,
+        require_judge_pass=True,
+        top_k_vector=20,
+        top_k_bm25=20,
+        require_all_meta=False,
+    )
+
+
+def test_cache_key_normalizes_whitespace():
+    assert cache_key(_req("  data   scientist ")) == cache_key(_req("data scientist"))
+    assert cache_key(_req(top_k=5)) != cache_key(_req(top_k=6))
+
+
+def test_cached_call_hit_and_miss():
+    cache = ResponseCache(ttl_seconds=60, max_entries=10)
+    calls = []
+
+    def fetch(r):
+        calls.append(r)
+        return {"payload": {"query": r.query}}
+
+    _, hit1 = cached_call(cache, _req(), fetch)
+    resp, hit2 = cached_call(cache, _req(), fetch)
+    assert (hit1, hit2) == (False, True)
+    assert len(calls) == 1
+    assert resp["payload"]["query"] == "data scientist"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_ttl_expiry():
+    now = [0.0]
+    cache = ResponseCache(ttl_seconds=10, clock=lambda: now[0])
+    cache.put(_req(), {"x": 1})
+    now[0] = 11.0
+    assert cache.get(_req()) is None
+
+
+def test_lru_and_byte_budget():
+    cache = ResponseCache(ttl_seconds=60, max_entries=2)
+    cache.put(_req("a"), {"x": 1})
+    cache.put(_req("b"), {"x": 2})
+    cache.get(_req("a"))
+    cache.put(_req("c"), {"x": 3})
+    assert cache.get(_req("b")) is None
+    assert cache.get(_req("a")) is not None
+
+    small = ResponseCache(ttl_seconds=60, max_bytes=50)
+    assert small.put(_req(), {"blob": "x" * 100}) is False
+    assert len(small) == 0
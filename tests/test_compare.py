@@ -0,0 +1,52 @@
+import threading
+
+import pandas as pd
+
+from functions.core.compare import CompareRun, compare_responses, overlap_frame, ranked_frame, shared_skill_ids
+from functions.core.jobs import JobQueue
+
+
+def _resp(*ids):
+    return {"payload": {"recommended_skills": [{"skill_id": i, "skill_name": f"name {i}"} for i in ids]}}
+
+
+def test_overlap_and_jaccard_from_membership():
+    cmp = compare_responses({"ds": _resp("a", "b", "c"), "mle": _resp("b", "c", "d"), "pm": _resp("x")})
+    assert cmp.skill_ids == ["a", "b", "c", "d", "x"]
+    assert cmp.overlap().tolist() == [[3, 2, 0], [2, 3, 0], [0, 0, 1]]
+    assert overlap_frame(cmp).loc["ds", "mle"] == 0.5
+    assert overlap_frame(cmp, metric="count").loc["pm", "pm"] == 1
+
+
+def test_ranked_frame_puts_shared_skills_first():
+    cmp = compare_responses({"ds": _resp("a", "b", "a", "c"), "mle": _resp("c", "b")})
+    df = ranked_frame(cmp)
+    assert list(df["skill_id"]) == ["b", "c", "a"]  # b: ranks 2 and 2, c: ranks 3 and 1 (mean 2), then name
+    assert df.loc[df["skill_id"] == "c", "ds"].item() == 3  # duplicate "a" does not take a rank
+    assert df.loc[df["skill_id"] == "a", "mle"].item() is pd.NA
+    assert list(ranked_frame(cmp, min_queries=2)["skill_id"]) == ["b", "c"]
+    assert shared_skill_ids(cmp) == ["b", "c"]
+    assert shared_skill_ids(cmp, ["ds"]) == ["a", "b", "c"]
+
+
+def test_compare_run_collects_concurrent_jobs():
+    q = JobQueue(max_workers=3)
+    started = threading.Barrier(3, timeout=5)  # all three must be running at once to get past it
+
+    def work(ids):
+        def _run(job):
+            started.wait()
+            if not ids:
+                raise RuntimeError("backend down")
+            return _resp(*ids)
+
+        return _run
+
+    run = CompareRun(queries=["a", "b", "c"])
+    for query, ids in (("a", ("1", "2")), ("b", ("2",)), ("c", ())):
+        run.jobs[query] = q.submit(work(ids), label=query)
+    for job in list(run.jobs.values()):
+        assert job.wait(5)
+    assert sorted(run.collect()) == ["a", "b"]
+    assert run.done and run.errors == {"c": "backend down"}
+    assert shared_skill_ids(compare_responses(run.responses)) == ["2"]
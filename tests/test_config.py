@@ -0,0 +1,41 @@
+import json
+import subprocess
+import sys
+
+from benchmarks.importtime import parse_importtime
+from functions.utils.config import DEFAULT_CONFIG_PATH, PROJECT_ROOT, compile_config, load_config
+
+
+def test_compiled_json_config_matches_yaml(tmp_path):
+    out = compile_config(str(DEFAULT_CONFIG_PATH), str(tmp_path / "parameters.json"))
+    assert json.loads(out.read_text(encoding="utf-8"))["api"]
+    assert load_config(str(out), environ={}) == load_config(str(DEFAULT_CONFIG_PATH), environ={})
+
+
+def test_env_overrides_and_config_path(tmp_path):
+    out = compile_config(str(DEFAULT_CONFIG_PATH), str(tmp_path / "parameters.json"))
+    env = {
+        "SKILLS_GUI_CONFIG": str(out),
+        "SKILLS_GUI__API__TIMEOUT_SECONDS": "7",
+        "SKILLS_GUI__UI__PAGE_TITLE": "Staging",
+        "SKILLS_GUI__NOT_A_KEY": "ignored",
+    }
+    cfg = load_config(environ=env)
+    assert cfg.api.timeout_seconds == 7
+    assert cfg.ui.page_title == "Staging"
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _io\n"
+        "import time:      2500 |       4000 | app\n"
+    )
+    records = parse_importtime(stderr)
+    assert [(r.module, r.self_us, r.cumulative_us, r.depth) for r in records] == [("_io", 120, 120, 1), ("app", 2500, 4000, 0)]
+
+
+def test_core_modules_do_not_import_pandas_eagerly():
+    code = "import sys, functions.core.results, functions.core.export, functions.utils.text; print('pandas' in sys.modules)"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=str(PROJECT_ROOT), capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == "False"
@@ -1,4 +1,25 @@
-from functions.core.export import build_export_rows, export_csv_bytes, export_xlsx_bytes
+import json
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from functions.core.export import (
+    EXPORT_COLUMNS,
+    build_export_frame,
+    build_export_rows,
+    export_csv_bytes,
+    export_csv_file,
+    export_jsonl_bytes,
+    export_jsonl_file,
+    export_parquet_bytes,
+    export_parquet_file,
+    export_xlsx_bytes,
+    export_xlsx_file,
+    iter_csv_chunks,
+    write_csv,
+    write_xlsx,
+)
 
 
 def test_export_bytes():
@@ -23,4 +44,78 @@ def test_export_bytes():
     csv_b = export_csv_bytes(rows)
     xlsx_b = export_xlsx_bytes(rows)
     assert len(csv_b) > 10
-    assert len(xlsx_b) > 1000
\ No newline at end of file
+    assert len(xlsx_b) > 1000
+
+
+def _read_xlsx(b):
+    return pd.read_excel(BytesIO(b), dtype=object)
+
+
+def test_export_frame_matches_row_export():
+    skills = [
+        {"skill_id": "A", "skill_name": "Skill A", "relevance_score": 0.5, "evidence": [" e1 ", "", None, "e2"], "skill_text": "t"},
+        {"skill_id": 7, "skill_name": None, "relevance_score": None, "evidence": "  raw  "},
+        {"skill_name": "only name", "evidence": []},
+    ]
+    for mode in ("pipe", "json"):
+        rows = build_export_rows(skills, query="q", generation_cache_id="cid", evidence_mode=mode)
+        frame = build_export_frame(skills, query="q", generation_cache_id="cid", evidence_mode=mode)
+        assert export_csv_bytes(frame) == export_csv_bytes(rows)
+        # XLSX bytes embed a creation timestamp, so compare the sheet contents
+        assert _read_xlsx(export_xlsx_bytes(frame)).equals(_read_xlsx(export_xlsx_bytes(rows)))
+    assert export_csv_bytes(build_export_frame([], "q", "cid")) == export_csv_bytes(build_export_rows([], "q", "cid"))
+
+
+def test_streaming_writers(tmp_path):
+    skills = [{"skill_id": str(i), "skill_name": f"s{i}", "relevance_score": i / 10, "evidence": ["e"]} for i in range(7)]
+    frame = build_export_frame(skills, query="q", generation_cache_id="cid")
+    assert b"".join(iter_csv_chunks(frame, chunk_rows=3)) == export_csv_bytes(frame)
+
+    csv_path = tmp_path / "out.csv"
+    write_csv(iter([frame.iloc[:2], frame.iloc[2:]]), csv_path, chunk_rows=3)
+    assert csv_path.read_bytes() == export_csv_bytes(frame)
+
+    xlsx_path = tmp_path / "out.xlsx"
+    write_xlsx(frame, xlsx_path)
+    assert _read_xlsx(xlsx_path.read_bytes()).equals(_read_xlsx(export_xlsx_bytes(frame)))
+    assert _read_xlsx(export_xlsx_file(frame)).equals(_read_xlsx(export_xlsx_bytes(frame)))
+
+
+def test_file_exports_are_accepted_by_download_buttons():
+    # the app passes `data=lambda: export_*_file(frame)`: the callable must return bytes
+    skills = [{"skill_id": "A", "skill_name": "a", "relevance_score": 0.5, "evidence": ["e"]}]
+    frame = build_export_frame(skills, query="q", generation_cache_id="cid")
+    list_frame = build_export_frame(skills, query="q", generation_cache_id="cid", evidence_mode="list")
+    downloads = {
+        "csv": (lambda: export_csv_file(frame), export_csv_bytes(frame)),
+        "jsonl": (lambda: export_jsonl_file(list_frame), export_jsonl_bytes(list_frame)),
+        "xlsx": (lambda: export_xlsx_file(frame), None),
+        "parquet": (lambda: export_parquet_file(list_frame), None),
+    }
+    for fmt, (data, expected) in downloads.items():
+        out = data()
+        assert type(out) is bytes and out, fmt
+        if expected is not None:
+            assert out == expected, fmt
+    assert _read_xlsx(downloads["xlsx"][0]()).equals(_read_xlsx(export_xlsx_bytes(frame)))
+    assert pd.read_parquet(BytesIO(downloads["parquet"][0]())).equals(pd.read_parquet(BytesIO(export_parquet_bytes(list_frame))))
+
+
+def test_parquet_and_jsonl_keep_evidence_lists():
+    skills = [
+        {"skill_id": "A", "skill_name": "a", "relevance_score": 0.5, "evidence": [" e1 ", "", "e2"]},
+        {"skill_id": 7, "relevance_score": None, "evidence": "raw"},
+    ]
+    frame = build_export_frame(skills, query="q", generation_cache_id="cid", evidence_mode="list")
+
+    lines = export_jsonl_bytes(frame).decode("utf-8").splitlines()
+    recs = [json.loads(line) for line in lines]
+    assert list(recs[0].keys()) == EXPORT_COLUMNS
+    assert recs[0]["evidence"] == ["e1", "e2"]
+    assert recs[1]["evidence"] == ["raw"] and recs[1]["relevance_score"] is None
+
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pq.read_table(BytesIO(export_parquet_bytes(frame)))
+    assert table.schema.names == EXPORT_COLUMNS
+    assert table.column("evidence").to_pylist() == [["e1", "e2"], ["raw"]]
+    assert table.column("skill_id").to_pylist() == ["A", "7"]
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from functions.core.jobs import CANCELLED, DONE, FAILED, JobCancelled, JobQueue
+
+
+def test_job_reports_progress_and_result():
+    q = JobQueue(max_workers=1)
+
+    def work(job):
+        for i in range(3):
+            job.report(i)
+        return "ok"
+
+    job = q.submit(work, key="k", label="query")
+    assert job.wait(5)
+    assert job.status == DONE and job.result == "ok" and job.partial == [0, 1, 2]
+    assert q.stats()[DONE] == 1
+
+
+def test_job_failure_is_kept_on_the_handle():
+    q = JobQueue(max_workers=1)
+
+    def work(job):
+        raise ValueError("boom")
+
+    job = q.submit(work)
+    assert job.wait(5)
+    assert job.status == FAILED and isinstance(job.error, ValueError)
+
+
+def test_cancel_detaches_running_job_and_skips_queued_one():
+    q = JobQueue(max_workers=1)
+    release = threading.Event()
+    calls = []
+
+    def slow(job):
+        release.wait(5)
+        job.report("late")
+        return "discarded"
+
+    running = q.submit(slow)
+    queued = q.submit(lambda job: calls.append("ran"))
+    assert running.cancel() and queued.cancel()
+    assert running.done and running.status == CANCELLED
+    release.set()
+    q.shutdown(wait=True)
+    assert running.result is None and running.partial == []
+    assert calls == []
+    assert q.stats()[CANCELLED] == 2
+    assert not running.cancel()  # already finished
+
+
+def test_cancelled_job_can_stop_early_and_free_its_worker():
+    q = JobQueue(max_workers=1)
+    started, stopped = threading.Event(), threading.Event()
+
+    def stream(job):
+        started.set()
+        while not job.cancelled:
+            time.sleep(0.005)
+        stopped.set()
+        raise JobCancelled()
+
+    job = q.submit(stream)
+    assert started.wait(5) and job.cancel()
+    assert stopped.wait(5)
+    assert q.submit(lambda job: "next").wait(5)  # the worker was freed
+    assert job.status == CANCELLED and job.error is None
+
+
+def test_on_cancel_callbacks_run_once_on_cancel():
+    q = JobQueue(max_workers=1)
+    release, seen = threading.Event(), []
+    job = q.submit(lambda job: release.wait(5))
+    job.on_cancel(lambda: seen.append("before"))
+    assert job.cancel() and not job.cancel()
+    job.on_cancel(lambda: seen.append("after"))  # already cancelled: called at once
+    release.set()
+    q.shutdown(wait=True)
+    assert seen == ["before", "after"]
@@ -0,0 +1,44 @@
+import pytest
+
+from functions.core.json_view import PathError, page_view, parse_path, preview, select
+
+
+DOC = {
+    "payload": {
+        "query": "q",
+        "recommended_skills": [{"skill_id": f"S{i}", "skill_name": f"n{i}", "evidence": ["a", "b"]} for i in range(45)],
+    },
+    "meta": {"generation_cache_id": "g", "debug": {"scores": list(range(1000))}},
+}
+
+
+def test_select_paths():
+    assert select(DOC, "$.meta.generation_cache_id") == [("$.meta.generation_cache_id", "g")]
+    assert select(DOC, "meta['generation_cache_id']") == [("$.meta.generation_cache_id", "g")]
+    names = select(DOC, "$.payload.recommended_skills[1:3].skill_name")
+    assert names == [("$.payload.recommended_skills[1].skill_name", "n1"), ("$.payload.recommended_skills[2].skill_name", "n2")]
+    assert select(DOC, "$.payload.recommended_skills[-1].skill_id")[0][1] == "S44"
+    assert len(select(DOC, "$..evidence")) == 45
+    assert len(select(DOC, "$.payload.recommended_skills[*]")) == 45
+    assert select(DOC, "$.missing.key") == []
+    with pytest.raises(PathError):
+        parse_path("$.payload[")
+
+
+def test_preview_collapses_large_values():
+    out = preview({"xs": list(range(100)), "s": "x" * 1000}, max_items=5, max_chars=10)
+    assert out["xs"][:5] == [0, 1, 2, 3, 4]
+    assert out["xs"][5].startswith("… 95 more items")
+    assert out["s"].startswith("x" * 10 + "… (+990")
+
+
+def test_page_view_paginates_arrays_and_matches():
+    page = page_view(DOC, "$.payload.recommended_skills", page=2, page_size=20)
+    assert (page.total, page.page, page.pages, len(page.value)) == (45, 2, 3, 5)
+    assert page.value[0]["skill_id"] == "S40"
+
+    page = page_view(DOC, "$..skill_name", page=99, page_size=10)
+    assert page.page == 4 and list(page.value) == [f"$.payload.recommended_skills[{i}].skill_name" for i in range(40, 45)]
+
+    whole = page_view(DOC, "$", page_size=10)
+    assert whole.total == 1 and len(whole.value["meta"]["debug"]["scores"]) == 11
@@ -0,0 +1,76 @@
+import math
+import urllib.request
+
+from benchmarks.fake_api import FakeApi
+
+from functions.core.api_client import RecommendRequest, _server_timing_ms, recommend_skills
+from functions.core.metrics import REGISTRY, MetricsRegistry, percentile, start_metrics_server
+from functions.utils.config import ApiConfig
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([7.0], 99) == 7.0
+    assert math.isnan(percentile([], 50))
+
+
+def test_registry_summary_and_prometheus_text():
+    reg = MetricsRegistry(reservoir_size=10)
+    for v in (1, 2, 3, 40, 2000):
+        reg.observe("x_ms", v)
+    reg.inc("shed_total", 2)
+    with reg.timer("t_ms"):
+        pass
+
+    snap = reg.snapshot()
+    assert snap["x_ms"]["count"] == 5
+    assert snap["x_ms"]["p50"] == 3
+    assert snap["t_ms"]["count"] == 1
+
+    text = reg.render_prometheus()
+    assert 'skills_gui_x_ms_bucket{le="1"} 1' in text
+    assert 'skills_gui_x_ms_bucket{le="50"} 4' in text
+    assert 'skills_gui_x_ms_bucket{le="+Inf"} 5' in text
+    assert "skills_gui_x_ms_count 5" in text
+    assert 'skills_gui_x_ms_recent{quantile="0.99"} 2000.000' in text
+    assert "skills_gui_shed_total 2" in text
+
+
+def test_metrics_endpoint_serves_registry():
+    reg = MetricsRegistry()
+    reg.observe("y_ms", 5)
+    server = start_metrics_server(0, registry=reg, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as r:
+            assert "skills_gui_y_ms_count 1" in r.read().decode("utf-8")
+    finally:
+        server.shutdown()
+
+
+def test_server_timing_header():
+    assert _server_timing_ms("app;dur=812.5, db;dur=40") == 812.5
+    assert _server_timing_ms('cache;desc="hit"') is None
+    assert _server_timing_ms("") is None
+
+
+def test_recommend_records_stage_latencies():
+    REGISTRY.reset()
+    with FakeApi() as fake:
+        api = ApiConfig(base_url=fake.base_url, endpoint_recommend="/v1/recommend-skills", endpoint_health="/healthz")
+        req = RecommendRequest(
+            query="q",
+            top_k=3,
+            debug=False,
+            require_judge_pass=True,
+            top_k_vector=20,
+            top_k_bm25=20,
+            require_all_meta=False,
+        )
+        recommend_skills(api, req)
+    snap = REGISTRY.snapshot()
+    for name in ("api_connect_ms", "api_ttfb_ms", "api_download_ms", "api_decode_ms", "api_recommend_ms"):
+        assert snap[name]["count"] >= 1, name
@@ -0,0 +1,63 @@
+import time
+from datetime import datetime
+
+from benchmarks.fake_api import FakeApi
+
+from functions.core.prober import HealthProber, in_business_hours
+from functions.utils.config import ApiConfig, ProberConfig
+
+
+def _api(base_url="http://backend"):
+    return ApiConfig(base_url=base_url, endpoint_recommend="/v1/recommend-skills", endpoint_health="/healthz")
+
+
+def test_business_hours_window():
+    monday_9 = datetime(2026, 10, 12, 9, 0)
+    assert in_business_hours(monday_9, "08:00-20:00", (0, 1, 2, 3, 4))
+    assert not in_business_hours(monday_9.replace(hour=20), "08:00-20:00", (0, 1, 2, 3, 4))
+    assert not in_business_hours(datetime(2026, 10, 11, 9, 0), "08:00-20:00", (0, 1, 2, 3, 4))  # Sunday
+    # overnight window belongs to the day it starts on
+    assert in_business_hours(datetime(2026, 10, 13, 1, 0), "22:00-02:00", (0,))
+
+
+def test_schedule_and_status():
+    now = [datetime(2026, 10, 12, 9, 0).timestamp()]  # Monday morning (UTC)
+    results = iter([(True, "ok"), (True, "ok"), (False, "refused")])
+    cfg = ProberConfig(interval_seconds=300, timezone="UTC", slow_ms=1e9)
+    prober = HealthProber(_api(), cfg, check=lambda api, url: next(results), clock=lambda: now[0])
+
+    assert prober.status()[0]["state"] == "unknown"
+    assert prober.due()
+    prober.probe_once()
+    assert not prober.due()
+    assert prober.status()[0]["state"] == "warm"
+
+    now[0] += 300
+    assert prober.due()
+    prober.probe_once()
+    assert not prober.request_probe_if_stale()
+
+    now[0] += 300
+    prober.probe_once()
+    status = prober.status()[0]
+    assert status["state"] == "down" and status["message"] == "refused"
+    assert status["probes"] == 3
+
+    now[0] = datetime(2026, 10, 17, 9, 0).timestamp()  # Saturday
+    assert not prober.due()
+    assert prober.request_probe_if_stale()
+
+
+def test_background_thread_probes_real_backend():
+    with FakeApi() as fake:
+        prober = HealthProber(_api(fake.base_url), ProberConfig(off_hours_interval_seconds=1, business_days=()))
+        prober.start()
+        try:
+            prober.request_probe()
+            for _ in range(100):
+                if prober.history():
+                    break
+                time.sleep(0.05)
+            assert prober.status()[0]["state"] == "warm"
+        finally:
+            prober.stop()
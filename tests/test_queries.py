@@ -0,0 +1,60 @@
+from functions.core.api_client import RecommendRequest
+from functions.core.cache import cache_key
+from functions.core.queries import QueryIndex, canonical_query, query_words
+
+
+def _req(query, top_k=5):
+    return RecommendRequest(
+        query=query,
+        top_k=top_k,
+        debug=False,
+        require_judge_pass=True,
+        top_k_vector=20,
+        top_k_bm25=20,
+        require_all_meta=False,
+    )
+
+
+def test_canonical_query_folds_case_punctuation_and_unicode():
+    assert canonical_query("  Data-Scientist ") == "data scientist"
+    assert canonical_query("ＤＡＴＡ　scientist!") == "data scientist"
+    assert canonical_query("C++ / C#") == "c++ c#"
+    assert canonical_query("นักวิทยาศาสตร์ข้อมูล") == "นักวิทยาศาสตร์ข้อมูล"  # Thai vowel marks kept
+    assert cache_key(_req("Data Scientist")) == cache_key(_req("data_scientist"))
+
+
+def test_similar_queries_match_only_with_same_parameters():
+    index = QueryIndex()
+    index.add(_req("Data Scientist"))
+    index.add(_req("account executive"))
+
+    match = index.match(_req("data scientists"), threshold=0.8)
+    assert match is not None and match.request.query == "Data Scientist"
+    assert 0.8 <= match.similarity < 1.0
+
+    assert index.match(_req("data scientists", top_k=10), threshold=0.8) is None
+    assert index.match(_req("data analyst"), threshold=0.8) is None
+    assert index.match(_req("data-scientist"), threshold=0.5) is None  # identical canonical query: the cache key covers it
+
+    index.discard(_req("data scientist"))
+    assert index.match(_req("data scientists"), threshold=0.8) is None
+    assert index.stats()["matches"] == 1
+
+
+def test_different_roles_with_similar_spelling_do_not_match():
+    index = QueryIndex()
+    for q in ("junior data engineer", "software engineer ii", "data analysts", "business analyses"):
+        index.add(_req(q))
+    assert index.match(_req("senior data engineer"), threshold=0.8) is None
+    assert index.match(_req("software engineer iii"), threshold=0.8) is None
+    assert index.match(_req("Data Analyst"), threshold=0.8).request.query == "data analysts"
+    assert index.match(_req("business analysis"), threshold=0.8) is None
+    assert query_words("Engineers, Data") == query_words("data engineer")
+
+
+def test_query_index_is_bounded():
+    index = QueryIndex(max_queries=2)
+    for q in ("alpha role", "beta role", "gamma role"):
+        index.add(_req(q))
+    assert len(index) == 2
+    assert index.match(_req("alpha roles"), threshold=0.8) is None
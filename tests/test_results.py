@@ -0,0 +1,29 @@
+from functions.core.results import results_df, results_view
+from functions.core.state import AppState, set_results
+
+
+def _skills(n):
+    return [
+        {"skill_id": f"S{i}", "skill_name": f"Skill {i}", "relevance_score": 1 - i / 10, "source": "x", "skill_text": "t" * 50}
+        for i in range(n)
+    ]
+
+
+def test_results_df_preview():
+    df = results_df(_skills(2), preview_chars=10)
+    assert list(df["preview"]) == ["ttttttttt…"] * 2
+
+
+def test_results_view_memoized_until_new_results():
+    s = AppState()
+    set_results(s, _skills(3))
+    v1 = results_view(s, preview_chars=20, max_rows=2)
+    assert results_view(s, preview_chars=20, max_rows=2) is v1
+    assert len(v1.df) == 2
+    assert list(v1.options.values()) == ["S0", "S1"]
+    assert v1.by_id["S2"]["skill_name"] == "Skill 2"
+
+    set_results(s, _skills(1))
+    v2 = results_view(s, preview_chars=20, max_rows=2)
+    assert v2 is not v1 and len(v2.df) == 1
+    assert results_view(s, preview_chars=30, max_rows=2) is not v2
@@ -0,0 +1,113 @@
+import random
+import time
+
+from benchmarks.fake_api import FakeApi
+
+from functions.core.api_client import RecommendRequest, health_check, iter_recommend_skills, recommend_skills
+from functions.core.metrics import REGISTRY
+from functions.core.routing import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, Router, backend_status
+from functions.utils.config import ApiConfig, BackendConfig
+
+
+def _api(*urls, weights=None, **kw):
+    kw.setdefault("backoff_base_seconds", 0.0)
+    kw.setdefault("max_retries", 0)
+    weights = weights or [1.0] * len(urls)
+    return ApiConfig(
+        base_url=urls[0],
+        endpoint_recommend="/v1/recommend-skills",
+        endpoint_health="/healthz",
+        backends=tuple(BackendConfig(url=u, weight=w) for u, w in zip(urls, weights)),
+        **kw,
+    )
+
+
+def _req(query="q"):
+    return RecommendRequest(
+        query=query,
+        top_k=3,
+        debug=False,
+        require_judge_pass=True,
+        top_k_vector=20,
+        top_k_bm25=20,
+        require_all_meta=False,
+    )
+
+
+def test_breaker_opens_then_half_opens_and_closes():
+    now = [0.0]
+    b = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: now[0])
+    b.record_failure()
+    assert b.state == CLOSED
+    b.record_failure()
+    assert b.state == OPEN and not b.available()
+    now[0] = 10.0
+    assert b.state == HALF_OPEN and b.available()
+    b.record_failure()  # failed trial re-opens
+    assert b.state == OPEN
+    b.record_success()
+    assert b.state == CLOSED and b.failures == 0
+
+
+def test_weighted_choice_skips_open_backends():
+    router = Router(_api("http://a", "http://b", weights=[3, 1]), rng=random.Random(0))
+    picks = [router.choose().url for _ in range(2000)]
+    assert 0.7 < picks.count("http://a") / len(picks) < 0.8
+
+    for _ in range(3):
+        router.backends[0].breaker.record_failure()
+    assert {router.choose().url for _ in range(50)} == {"http://b"}
+    # all open: still route rather than failing outright
+    for _ in range(3):
+        router.backends[1].breaker.record_failure()
+    assert router.choose() is not None
+
+
+def test_fails_over_to_next_backend():
+    with FakeApi() as bad, FakeApi() as good:
+        bad.script = [500]
+        api = _api(bad.base_url, good.base_url, weights=[1, 0])
+        resp = recommend_skills(api, _req())
+        assert resp["meta"]["generation_cache_id"] == "gen-q"
+        assert len(bad.requests) == 1 and len(good.requests) == 1
+        assert backend_status(api)[0]["consecutive_failures"] == 1
+
+
+def test_hedges_slow_backend():
+    with FakeApi(latency_ms=1500) as slow, FakeApi() as fast:
+        api = _api(slow.base_url, fast.base_url, weights=[1, 0], hedge=True, hedge_initial_delay_ms=100)
+        hedges = REGISTRY.counters().get("api_hedges_total", 0)
+        t0 = time.perf_counter()
+        events = list(iter_recommend_skills(api, _req()))
+        assert time.perf_counter() - t0 < 1.0
+        assert events[-1][0] == "response"
+        assert len(slow.requests) == 1 and len(fast.requests) == 1
+        assert REGISTRY.counters()["api_hedges_total"] == hedges + 1
+
+
+def test_no_hedge_to_a_single_backend():
+    with FakeApi(latency_ms=300) as slow:
+        api = _api(slow.base_url, hedge=True, hedge_initial_delay_ms=50)
+        hedges = REGISTRY.counters().get("api_hedges_total", 0)
+        assert recommend_skills(api, _req())["meta"]["generation_cache_id"] == "gen-q"
+        assert len(slow.requests) == 1
+        assert REGISTRY.counters().get("api_hedges_total", 0) == hedges
+
+
+def test_hedges_are_skipped_while_too_many_losers_run():
+    with FakeApi(latency_ms=300) as slow, FakeApi() as fast:
+        api = _api(slow.base_url, fast.base_url, weights=[1, 0], hedge=True, hedge_initial_delay_ms=50, hedge_max_losers=0)
+        skipped = REGISTRY.counters().get("api_hedges_skipped_total", 0)
+        recommend_skills(api, _req())
+        assert len(slow.requests) == 1 and len(fast.requests) == 0
+        assert REGISTRY.counters()["api_hedges_skipped_total"] == skipped + 1
+
+
+def test_health_checks_feed_the_breaker():
+    with FakeApi() as fake:
+        api = _api(fake.base_url, "http://127.0.0.1:9", breaker_failure_threshold=2, connect_timeout_seconds=0.5)
+        for _ in range(2):
+            ok, _ = health_check(api, "http://127.0.0.1:9")
+            assert not ok
+        assert [s["state"] for s in backend_status(api)] == [CLOSED, OPEN]
+        assert health_check(api) == (True, "ok")
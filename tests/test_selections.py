@@ -0,0 +1,37 @@
+from functions.core.selections import SelectionStore
+
+
+def _skill(i, score):
+    return {"skill_id": f"S{i}", "skill_name": f"Skill {i}", "relevance_score": score, "evidence": ["e"]}
+
+
+def test_save_page_and_bulk_edits(tmp_path):
+    store = SelectionStore(str(tmp_path / "sel.sqlite3"))
+    assert store.save("roles", [_skill(i, i / 10) for i in range(10)]) == 10
+    assert [s["skill_id"] for s in store.page("roles", 0, 3)] == ["S9", "S8", "S7"]
+    assert [s["skill_id"] for s in store.page("roles", 3, 3)] == ["S0"]
+    assert store.load("roles")[0] == _skill(9, 0.9)
+
+    assert store.add("roles", [_skill(0, 1.0), _skill(10, 0.05)]) == 2  # S0 re-scored, S10 new
+    assert store.remove("roles", ["S9", "S9", "missing"]) == 1
+    assert store.count("roles") == 10
+    assert [s["skill_id"] for s in store.page("roles", 0, 2)] == ["S0", "S8"]
+
+    store.save("empty", [])
+    assert [n["name"] for n in store.names()] == ["empty", "roles"]
+    assert store.stats() == {"selections": 2, "skills": 10}
+
+
+def test_selections_are_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "sel.sqlite3")
+    SelectionStore(path).save("shared", [_skill(1, 0.5)])
+    other = SelectionStore(path)  # another session / process on the same volume
+    assert other.exists("shared") and other.count("shared") == 1
+    assert other.delete("shared") and not other.exists("shared")
+    assert other.load("shared") == []
+
+
+def test_non_finite_scores_are_stored_as_zero(tmp_path):
+    store = SelectionStore(str(tmp_path / "sel.sqlite3"))
+    store.save("s", [_skill(1, float("nan")), _skill(2, 0.1), _skill(3, "inf")])
+    assert [s["skill_id"] for s in store.page("s", 0, 3)] == ["S2", "S1", "S3"]
@@ -0,0 +1,36 @@
+import gc
+
+from functions.core.sessions import SessionRegistry
+from functions.core.state import AppState, add_selected, has_raw_response, set_raw_response, set_results
+
+
+def test_idle_sessions_are_compacted():
+    now = [0.0]
+    reg = SessionRegistry(idle_seconds=100, sweep_interval=10, clock=lambda: now[0])
+    idle, active = AppState(), AppState()
+    for s in (idle, active):
+        set_results(s, [{"skill_id": "SS1", "skill_name": "x"}])
+        set_raw_response(s, {"payload": {}})
+        add_selected(s, {"skill_id": "SS2", "skill_name": "kept"})
+        reg.touch(s)
+
+    now[0] = 5
+    assert reg.sweep() == 0  # rate-limited
+
+    now[0] = 150
+    reg.touch(active)
+    assert reg.sweep() == 1
+    assert idle.evicted and not idle.last_results and not has_raw_response(idle)
+    assert list(idle.selected) == ["SS2"]
+    assert active.last_results and not active.evicted
+    assert reg.stats()["evictions"] == 1
+
+
+def test_registry_does_not_keep_sessions_alive():
+    reg = SessionRegistry()
+    s = AppState()
+    reg.touch(s)
+    assert reg.stats()["sessions"] == 1
+    del s
+    gc.collect()
+    assert reg.stats()["sessions"] == 0
@@ -0,0 +1,97 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from functions.core.api_client import ApiError
+from functions.core.jobs import JobCancelled
+from functions.core.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    gate = threading.Event()
+
+    def fn():
+        calls.append(1)
+        gate.wait(2)
+        return {"ok": True}
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        futs = [ex.submit(flight.do, "k", fn) for _ in range(8)]
+        while flight.stats()["coalesced"] < 7:
+            time.sleep(0.01)
+        gate.set()
+        results = [f.result() for f in futs]
+
+    assert len(calls) == 1
+    assert all(r[0] is results[0][0] for r in results)
+    assert sum(1 for _, shared in results if not shared) == 1
+    assert flight.in_flight() == 0
+
+
+def test_waiters_receive_same_error():
+    flight = SingleFlight()
+    gate = threading.Event()
+    err = ApiError("boom", status_code=500)
+
+    def fn():
+        gate.wait(2)
+        raise err
+
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        futs = [ex.submit(flight.do, "k", fn) for _ in range(4)]
+        while flight.stats()["coalesced"] < 3:
+            time.sleep(0.01)
+        gate.set()
+        for f in futs:
+            with pytest.raises(ApiError) as e:
+                f.result()
+            assert e.value is err
+
+    # key is released after completion
+    assert flight.do("k", lambda: 1) == (1, False)
+
+
+def test_waiters_counts_callers_coalesced_onto_a_key():
+    flight = SingleFlight()
+    gate = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        futs = [ex.submit(flight.do, "k", lambda: gate.wait(2)) for _ in range(3)]
+        while flight.stats()["coalesced"] < 2:
+            time.sleep(0.01)
+        assert flight.waiters("k") == 2 and flight.waiters("other") == 0
+        gate.set()
+        for f in futs:
+            f.result()
+
+    assert flight.waiters("k") == 0
+
+
+def test_cancelled_waiter_leaves_so_a_cancelled_leader_can_stop():
+    flight = SingleFlight()
+    leader_cancelled, follower_cancelled = threading.Event(), threading.Event()
+
+    def leader():
+        while not (leader_cancelled.is_set() and flight.waiters("k") == 0):
+            time.sleep(0.005)
+        raise JobCancelled()
+
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        first = ex.submit(flight.do, "k", leader)
+        while flight.in_flight() == 0:
+            time.sleep(0.005)
+        second = ex.submit(flight.do, "k", lambda: None, follower_cancelled.is_set)
+        while flight.waiters("k") == 0:
+            time.sleep(0.005)
+        follower_cancelled.set()
+        with pytest.raises(JobCancelled):
+            second.result(5)
+        assert flight.waiters("k") == 0
+        leader_cancelled.set()
+        with pytest.raises(JobCancelled):
+            first.result(5)
+    assert flight.in_flight() == 0
@@ -0,0 +1,53 @@
+import math
+
+from benchmarks.fake_api import make_skill
+from functions.core.skill_index import LOOKUP_REASONING, SkillIndex, lookup_selection, tokenize
+from functions.core.skillstore import SKILLS
+
+
+def _skill(skill_id, name, text=""):
+    return {"skill_id": skill_id, "skill_name": name, "source": "esco", "skill_text": text, "relevance_score": 0.5}
+
+
+def test_tokenize_drops_stopwords_and_case():
+    assert tokenize("The Data-Science of ML") == ["data", "science", "ml"]
+
+
+def test_bm25_ranks_name_matches_first_and_dedupes_by_id():
+    index = SkillIndex()
+    index.add(_skill("S1", "Machine learning", "Train models on data."))
+    index.add(_skill("S2", "Data visualisation", "Charts that explain machine learning results."))
+    index.add(_skill("S3", "Accounting", "Ledgers."))
+    assert [h.skill["skill_id"] for h in index.search("machine learning")] == ["S1", "S2"]
+
+    assert not index.add(_skill("S1", "Machine learning", "Train models on data."))  # unchanged: no rebuild
+    index.add(_skill("S1", "Deep learning", "Neural networks."))  # changed text replaces old postings
+    assert len(index) == 3
+    assert [h.skill["skill_id"] for h in index.search("machine")] == ["S2"]
+    assert "relevance_score" not in index.get("S1")
+
+
+def test_exact_skill_id_and_eviction():
+    index = SkillIndex(max_skills=3)
+    assert index.add_response({"payload": {"recommended_skills": [make_skill(i) for i in range(4)]}}) == 4
+    assert len(index) == 3 and index.get("S0") is None
+    hits = index.search("S2")
+    assert hits[0].skill["skill_id"] == "S2" and math.isinf(hits[0].score)
+    assert index.stats()["evictions"] == 1
+
+
+def test_indexed_catalog_texts_are_interned_and_lookups_drop_evidence():
+    index = SkillIndex(max_skills=1)
+    raw = dict(_skill("IX1", "Welding", "Joining metal parts."), evidence=["from another query"], reasoning="r")
+    index.add(raw)
+    assert SKILLS.refs("IX1") == 1
+    session_copy = SKILLS.intern(_skill("IX1", "Welding", " ".join(["Joining", "metal", "parts."])))
+    assert session_copy["skill_text"] is index.get("IX1")["skill_text"]  # one shared copy
+
+    picked = lookup_selection(index.search("welding")[0].skill)
+    assert "evidence" not in picked and "relevance_score" not in picked
+    assert picked["reasoning"] == LOOKUP_REASONING and picked["skill_name"] == "Welding"
+
+    index.add(_skill("IX2", "Sewing"))  # evicts IX1 and its reference
+    SKILLS.release("IX1")
+    assert SKILLS.refs("IX1") == 0
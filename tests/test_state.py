@@ -1,4 +1,23 @@
-from functions.core.state import AppState, add_selected, remove_selected, selected_list
+import pytest
+
+import functions.core.state as state_module
+from functions.core.skillstore import SkillStore
+from functions.core.state import (
+    AppState,
+    add_selected,
+    add_selected_many,
+    clear_selected,
+    compact_state,
+    has_raw_response,
+    raw_response,
+    remove_selected,
+    remove_selected_many,
+    selected_list,
+    selected_page,
+    set_raw_response,
+    set_results,
+    skill_score,
+)
 
 
 def test_dedupe_by_skill_id():
@@ -21,4 +40,72 @@ def test_selected_list_sorted():
     add_selected(s, {"skill_id": "1", "skill_name": "b", "relevance_score": 0.2})
     add_selected(s, {"skill_id": "2", "skill_name": "a", "relevance_score": 0.9})
     out = selected_list(s)
-    assert out[0]["skill_id"] == "2"
\ No newline at end of file
+    assert out[0]["skill_id"] == "2"
+
+
+@pytest.fixture
+def skills(monkeypatch):
+    store = SkillStore()  # isolated from the references other tests hold on SKILLS
+    monkeypatch.setattr(state_module, "SKILLS", store)
+    return store
+
+
+def test_catalog_texts_are_shared_and_refcounted(skills):
+    a, b = AppState(), AppState()
+    text = "long catalog text " * 50
+    set_results(a, [{"skill_id": "ST1", "skill_text": text, "reasoning": "for query a"}])
+    set_results(b, [{"skill_id": "ST1", "skill_text": "".join(text), "reasoning": "for query b"}])
+    assert a.last_results[0]["skill_text"] is b.last_results[0]["skill_text"]
+    assert b.last_results[0]["reasoning"] == "for query b"
+
+    add_selected(a, a.last_results[0])
+    assert skills.refs("ST1") == 3
+    set_results(a, [])
+    clear_selected(a)
+    assert skills.refs("ST1") == 1
+    b.release_refs()  # what garbage collection of `b` runs
+    assert skills.refs("ST1") == 0 and len(skills) == 0
+    assert not b.release_refs.alive
+
+
+def test_raw_response_compressed_or_spilled(tmp_path):
+    resp = {"payload": {"query": "q"}, "debug": ["x" * 100 + str(i) for i in range(2000)]}
+    s = AppState()
+    set_raw_response(s, resp, max_bytes=1 << 20, spill_dir=str(tmp_path))
+    assert s.raw_blob is not None and len(s.raw_blob) < s.raw_bytes
+    assert raw_response(s) == resp
+
+    set_raw_response(s, resp, max_bytes=100, spill_dir=str(tmp_path))
+    assert s.raw_blob is None and len(list(tmp_path.iterdir())) == 1
+    assert raw_response(s) == resp
+
+    s.last_results = [{"skill_id": "x"}]
+    compact_state(s)
+    assert not has_raw_response(s) and not s.last_results and s.evicted
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_bulk_add_remove_keep_the_order():
+    s = AppState()
+    add_selected(s, {"skill_id": "1", "skill_name": "b", "relevance_score": 0.2})
+    n = add_selected_many(s, [{"skill_id": str(i), "skill_name": f"n{i}", "relevance_score": i / 10} for i in range(1, 6)] + [{"skill_name": "no id"}])
+    assert n == 5 and len(s.selected) == 5
+    assert [x["skill_id"] for x in selected_list(s)] == ["5", "4", "3", "2", "1"]
+    add_selected(s, {"skill_id": "1", "skill_name": "n1", "relevance_score": 0.9})  # re-scored: moves up
+    assert [x["skill_id"] for x in selected_page(s, 0, 2)] == ["1", "5"]
+    assert [x["skill_id"] for x in selected_page(s, 2, 2)] == ["2"]
+    assert remove_selected_many(s, ["5", "missing", "2"]) == 2
+    assert [x["skill_id"] for x in selected_list(s)] == ["1", "4", "3"]
+    assert len(s.selected_order) == len(s.selected)
+
+
+def test_non_finite_scores_keep_the_order_consistent():
+    s = AppState()
+    add_selected(s, {"skill_id": "a", "skill_name": "x", "relevance_score": float("nan")})
+    add_selected(s, {"skill_id": "b", "skill_name": "y", "relevance_score": "nan"})
+    add_selected(s, {"skill_id": "c", "skill_name": "z", "relevance_score": 0.1})
+    remove_selected(s, "a")
+    add_selected(s, {"skill_id": "b", "skill_name": "y", "relevance_score": float("inf")})
+    assert [x["skill_id"] for x in selected_list(s)] == ["c", "b"]
+    assert len(s.selected_order) == len(s.selected)
+    assert [skill_score({"relevance_score": v}) for v in ("high", None, float("-inf"), "0.5")] == [0.0, 0.0, 0.0, 0.5]
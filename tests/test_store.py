@@ -0,0 +1,66 @@
+from functions.core.api_client import RecommendRequest
+from functions.core.cache import ResponseCache
+from functions.core.store import ResponseStore, through_store, warm_cache
+
+
+def _req(query="data scientist"):
+    return RecommendRequest(
+        query=query,
+        top_k=5,
+        debug=False,
+        require_judge_pass=True,
+        top_k_vector=20,
+        top_k_bm25=20,
+        require_all_meta=False,
+    )
+
+
+def _resp(query):
+    return {"payload": {"query": query, "recommended_skills": [{"skill_id": "A"}]}, "meta": {"generation_cache_id": f"gen-{query}"}}
+
+
+def test_put_get_survives_reopen(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    store = ResponseStore(path)
+    store.put(_req(), _resp("data scientist"))
+    store.close()
+
+    store = ResponseStore(path)
+    assert store.get(_req()) == _resp("data scientist")
+    assert store.get_by_generation_cache_id("gen-data scientist") == _resp("data scientist")
+    assert store.get(_req("nurse")) is None
+    assert store.stats()["hits"] == 2
+
+
+def test_eviction_and_max_age(tmp_path):
+    now = [1000.0]
+    store = ResponseStore(str(tmp_path / "s.sqlite3"), max_entries=2, max_age_seconds=100, clock=lambda: now[0])
+    for q in ["a", "b"]:
+        now[0] += 1
+        store.put(_req(q), _resp(q))
+    now[0] += 1
+    store.get(_req("a"))
+    store.put(_req("c"), _resp("c"))
+    assert store.get(_req("b")) is None
+    assert store.get(_req("a")) is not None
+
+    now[0] += 1000
+    assert store.get(_req("c")) is None
+
+
+def test_through_store_and_warm_cache(tmp_path):
+    store = ResponseStore(str(tmp_path / "s.sqlite3"))
+    calls = []
+
+    def fetch(r):
+        calls.append(r.query)
+        return _resp(r.query)
+
+    fetch_stored = through_store(store, fetch)
+    fetch_stored(_req("a"))
+    fetch_stored(_req("a"))
+    assert calls == ["a"]
+
+    cache = ResponseCache()
+    assert warm_cache(cache, store, limit=10) == 1
+    assert cache.get(_req("a")) == _resp("a")
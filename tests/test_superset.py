@@ -0,0 +1,50 @@
+from dataclasses import replace
+
+from functions.core.api_client import RecommendRequest
+from functions.core.superset import can_derive, derive, superset_request
+
+
+def _req(**kw):
+    d = dict(query="data scientist", top_k=10, debug=False, require_judge_pass=False, top_k_vector=20, top_k_bm25=20, require_all_meta=False)
+    d.update(kw)
+    return RecommendRequest(**d)
+
+
+def _resp(n, annotated=False):
+    skills = [{"skill_id": str(i), "relevance_score": 1 - i / n} for i in range(n)]
+    if annotated:
+        for i, s in enumerate(skills):
+            s["judge_pass"] = i % 2 == 0
+    return {"payload": {"query": "data scientist", "recommended_skills": skills}, "meta": {"generation_cache_id": "g"}}
+
+
+def test_superset_request_and_slicing():
+    sreq = superset_request(_req(top_k=10), 100)
+    assert sreq.top_k == 100
+    sresp = _resp(100)
+    req = _req(query=" data  scientist ", top_k=5)
+    assert can_derive(sreq, sresp, req)
+    out = derive(sreq, sresp, req, min_score=0.97)
+    assert [s["skill_id"] for s in out["payload"]["recommended_skills"]] == ["0", "1", "2", "3"]
+    assert len(sresp["payload"]["recommended_skills"]) == 100  # superset untouched
+
+
+def test_not_derivable_cases():
+    sreq = superset_request(_req(), 50)
+    sresp = _resp(50)
+    assert not can_derive(sreq, sresp, _req(top_k=60))
+    assert not can_derive(sreq, sresp, _req(query="nurse"))
+    assert not can_derive(sreq, sresp, _req(top_k_bm25=5))
+    assert not can_derive(sreq, sresp, _req(debug=True))
+    assert not can_derive(sreq, sresp, _req(require_judge_pass=True))
+    assert not can_derive(replace(sreq, require_judge_pass=True), sresp, _req(require_judge_pass=False))
+    assert not can_derive(None, None, _req())
+
+
+def test_judge_filter_from_annotated_superset():
+    sreq = superset_request(_req(), 10)
+    sresp = _resp(10, annotated=True)
+    req = _req(require_judge_pass=True, top_k=3)
+    assert can_derive(sreq, sresp, req)
+    out = derive(sreq, sresp, req)
+    assert [s["skill_id"] for s in out["payload"]["recommended_skills"]] == ["0", "2", "4"]